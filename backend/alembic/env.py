@@ -19,8 +19,10 @@ load_dotenv()
 # access to the values within the .ini file in use.
 config = context.config
 
-# Override sqlalchemy.url with environment variable
-config.set_main_option("sqlalchemy.url", os.getenv("DATABASE_URL_POSTGRES_ALEMBIC"))
+# Override sqlalchemy.url with environment variable; `python -m app.cli migrate`
+# passes the app's own database URL instead
+DATABASE_URL = config.attributes.get("database_url") or os.getenv("DATABASE_URL_POSTGRES_ALEMBIC")
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
@@ -35,6 +37,13 @@ from app.models.queue import Queue
 from app.models.queue_item import QueueItem
 from app.models.membership import Membership
 from app.models.queue_history import QueueHistory
+from app.models.leaderboard import LeaderboardCounter
+from app.models.queue_history_rollup import QueueHistoryRollup
+from app.models.queue_forecast import QueueForecast
+from app.models.notification_counter import NotificationCounter
+from app.models.email_job import EmailJob
+from app.models.revoked_token import RevokedToken
+from app.models.sync import SyncOutbox, SyncNode
 
 from app.database import Base
 target_metadata = Base.metadata
@@ -45,6 +54,13 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Monthly queue_history partitions are managed by app.utils.partitions, not by models.
+    if type_ == "table" and reflected and compare_to is None and name.startswith("queue_history_"):
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -61,6 +77,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -84,7 +101,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,37 @@
+"""add notification counters
+
+Revision ID: 0c9e5b7a3f41
+Revises: f2c8a4d61b07
+Create Date: 2026-10-19 17:48:10.562317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c9e5b7a3f41'
+down_revision = 'f2c8a4d61b07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('notification_counters',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('unread', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute("""
+        INSERT INTO notification_counters (user_id, unread, updated_at)
+        SELECT user_id, count(*), CURRENT_TIMESTAMP
+        FROM notifications
+        WHERE status = 'PENDING'
+        GROUP BY user_id
+    """)
+
+
+def downgrade():
+    op.drop_table('notification_counters')
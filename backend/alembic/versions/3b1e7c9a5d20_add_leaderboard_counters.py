@@ -0,0 +1,54 @@
+"""add leaderboard counters
+
+Revision ID: 3b1e7c9a5d20
+Revises: 97edb2edc196
+Create Date: 2026-10-19 09:12:41.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b1e7c9a5d20'
+down_revision = '97edb2edc196'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('leaderboard_counters',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(length=10), nullable=False),
+    sa.Column('item_count', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('scope', 'entity_id', 'period', name='uq_leaderboard_counters_entity_period')
+    )
+    op.create_index(op.f('ix_leaderboard_counters_id'), 'leaderboard_counters', ['id'], unique=False)
+    op.create_index('ix_leaderboard_counters_rank', 'leaderboard_counters', ['scope', 'period', 'item_count'], unique=False)
+
+    # Seed the live counters from the current queue contents; daily counters
+    # are filled in by `python -m app.cli rebuild-leaderboard`.
+    op.execute("""
+        INSERT INTO leaderboard_counters (scope, entity_id, period, item_count, updated_at)
+        SELECT 'queue', qi.queue_id, 'live', COUNT(*), CURRENT_TIMESTAMP
+        FROM queue_items qi
+        GROUP BY qi.queue_id
+    """)
+    op.execute("""
+        INSERT INTO leaderboard_counters (scope, entity_id, period, item_count, updated_at)
+        SELECT 'organization', q.organization_id, 'live', COUNT(*), CURRENT_TIMESTAMP
+        FROM queue_items qi
+        JOIN queues q ON q.id = qi.queue_id
+        WHERE q.organization_id IS NOT NULL
+        GROUP BY q.organization_id
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_leaderboard_counters_rank', table_name='leaderboard_counters')
+    op.drop_index(op.f('ix_leaderboard_counters_id'), table_name='leaderboard_counters')
+    op.drop_table('leaderboard_counters')
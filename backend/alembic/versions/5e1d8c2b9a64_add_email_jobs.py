@@ -0,0 +1,41 @@
+"""add email jobs
+
+Revision ID: 5e1d8c2b9a64
+Revises: 0c9e5b7a3f41
+Create Date: 2026-10-19 18:26:41.904215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1d8c2b9a64'
+down_revision = '0c9e5b7a3f41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('email_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('to_address', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('template', sa.String(), nullable=False),
+    sa.Column('context', sa.JSON(), nullable=False),
+    sa.Column('status', sa.String(length=16), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_email_jobs_id'), 'email_jobs', ['id'], unique=False)
+    op.create_index('ix_email_jobs_status_next_attempt_at', 'email_jobs', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_email_jobs_status_next_attempt_at', table_name='email_jobs')
+    op.drop_index(op.f('ix_email_jobs_id'), table_name='email_jobs')
+    op.drop_table('email_jobs')
@@ -4,9 +4,14 @@ Revision ID: 7141fe80d94f
 Revises: 04837bf49a88
 Create Date: 2025-03-31 07:03:40.571681
 
+The table used to be created by the app at startup and this revision was
+empty; it now creates it for new databases. extra_data starts as text and is
+converted to JSONB by b6e2d9a4c173.
+
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -16,13 +21,41 @@ branch_labels = None
 depends_on = None
 
 
+NOTIFICATION_TYPE = postgresql.ENUM('ORGANIZATION_INVITE', 'QUEUE_INVITE', 'SERVICE_INVITE', 'QUEUE_UPDATE',
+                                    'SYSTEM_NOTIFICATION', name='notificationtype', create_type=False)
+NOTIFICATION_STATUS = postgresql.ENUM('PENDING', 'ACCEPTED', 'REJECTED', 'READ',
+                                      name='notificationstatus', create_type=False)
+
+
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    bind = op.get_bind()
+    NOTIFICATION_TYPE.create(bind, checkfirst=True)
+    NOTIFICATION_STATUS.create(bind, checkfirst=True)
+    op.create_table('notifications',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('type', NOTIFICATION_TYPE, nullable=False),
+    sa.Column('status', NOTIFICATION_STATUS, nullable=True),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('message', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('read_at', sa.DateTime(), nullable=True),
+    sa.Column('organization_id', sa.Integer(), nullable=True),
+    sa.Column('queue_id', sa.Integer(), nullable=True),
+    sa.Column('service_id', sa.Integer(), nullable=True),
+    sa.Column('extra_data', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['queue_id'], ['queues.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_notifications_id'), 'notifications', ['id'], unique=False)
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index(op.f('ix_notifications_id'), table_name='notifications')
+    op.drop_table('notifications')
+    bind = op.get_bind()
+    NOTIFICATION_STATUS.drop(bind, checkfirst=True)
+    NOTIFICATION_TYPE.drop(bind, checkfirst=True)
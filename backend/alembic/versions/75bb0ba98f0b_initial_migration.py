@@ -4,9 +4,14 @@ Revision ID: 75bb0ba98f0b
 Revises: 
 Create Date: 2025-03-31 04:14:29.975221
 
+The base schema as it was when migrations were introduced; until then tables
+were created by the app at startup, so this revision used to be empty. It is
+only ever run against a new database: existing ones are already past it.
+
 """
 from alembic import op
 import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
 
 
 # revision identifiers, used by Alembic.
@@ -16,13 +21,110 @@ branch_labels = None
 depends_on = None
 
 
+USER_ROLE = postgresql.ENUM('ADMIN', 'BUSINESS_OWNER', 'USER', name='userrole', create_type=False)
+QUEUE_ITEM_STATUS = postgresql.ENUM('WAITING', 'BEING_SERVE', 'COMPLETED', 'CANCELLED',
+                                    name='queueitemstatus', create_type=False)
+
+
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    bind = op.get_bind()
+    USER_ROLE.create(bind, checkfirst=True)
+    QUEUE_ITEM_STATUS.create(bind, checkfirst=True)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('phone_number', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('role', USER_ROLE, nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('phone_number')
+    )
+    op.create_index(op.f('ix_users_id'), 'users', ['id'], unique=False)
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_table('organizations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_organizations_id'), 'organizations', ['id'], unique=False)
+    op.create_index(op.f('ix_organizations_name'), 'organizations', ['name'], unique=True)
+    op.create_table('services',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_services_id'), 'services', ['id'], unique=False)
+    op.create_table('memberships',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('organization_id', sa.Integer(), nullable=False),
+    sa.Column('role', USER_ROLE, nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_memberships_id'), 'memberships', ['id'], unique=False)
+    op.create_table('queues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('queue_type', sa.String(), nullable=True),
+    sa.Column('max_capacity', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('service_id', sa.Integer(), nullable=True),
+    sa.Column('organization_id', sa.Integer(), nullable=True),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['organization_id'], ['organizations.id'], ),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_queues_id'), 'queues', ['id'], unique=False)
+    op.create_index(op.f('ix_queues_name'), 'queues', ['name'], unique=False)
+    op.create_table('queue_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('token_number', sa.Integer(), nullable=False),
+    sa.Column('status', QUEUE_ITEM_STATUS, nullable=False),
+    sa.Column('joined_at', sa.DateTime(), nullable=True),
+    sa.Column('called_at', sa.DateTime(), nullable=True),
+    sa.Column('served_at', sa.DateTime(), nullable=True),
+    sa.Column('join_hash', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['queue_id'], ['queues.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('join_hash')
+    )
+    op.create_index(op.f('ix_queue_items_id'), 'queue_items', ['id'], unique=False)
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_index(op.f('ix_queue_items_id'), table_name='queue_items')
+    op.drop_table('queue_items')
+    op.drop_index(op.f('ix_queues_name'), table_name='queues')
+    op.drop_index(op.f('ix_queues_id'), table_name='queues')
+    op.drop_table('queues')
+    op.drop_index(op.f('ix_memberships_id'), table_name='memberships')
+    op.drop_table('memberships')
+    op.drop_index(op.f('ix_services_id'), table_name='services')
+    op.drop_table('services')
+    op.drop_index(op.f('ix_organizations_name'), table_name='organizations')
+    op.drop_index(op.f('ix_organizations_id'), table_name='organizations')
+    op.drop_table('organizations')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_index(op.f('ix_users_id'), table_name='users')
+    op.drop_table('users')
+    bind = op.get_bind()
+    QUEUE_ITEM_STATUS.drop(bind, checkfirst=True)
+    USER_ROLE.drop(bind, checkfirst=True)
@@ -0,0 +1,41 @@
+"""add queue history rollups
+
+Revision ID: 8f4d2a61c0be
+Revises: 3b1e7c9a5d20
+Create Date: 2026-10-19 11:40:03.517920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f4d2a61c0be'
+down_revision = '3b1e7c9a5d20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('queue_history_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue_id', sa.Integer(), nullable=False),
+    sa.Column('granularity', sa.String(length=16), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('sum_sq', sa.Float(), nullable=False),
+    sa.Column('min_wait', sa.Float(), nullable=True),
+    sa.Column('max_wait', sa.Float(), nullable=True),
+    sa.Column('histogram', sa.JSON(), nullable=False),
+    sa.ForeignKeyConstraint(['queue_id'], ['queues.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('queue_id', 'granularity', 'bucket_start', name='uq_queue_history_rollups_bucket')
+    )
+    op.create_index(op.f('ix_queue_history_rollups_id'), 'queue_history_rollups', ['id'], unique=False)
+    # Existing history is folded in with `python -m app.cli rebuild-history-rollups`.
+
+
+def downgrade():
+    op.drop_index(op.f('ix_queue_history_rollups_id'), table_name='queue_history_rollups')
+    op.drop_table('queue_history_rollups')
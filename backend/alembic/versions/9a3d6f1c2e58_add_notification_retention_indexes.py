@@ -0,0 +1,47 @@
+"""add notification listing and retention indexes
+
+Revision ID: 9a3d6f1c2e58
+Revises: 5e1d8c2b9a64
+Create Date: 2026-10-19 18:05:42.116930
+
+(user_id, created_at) serves the newest-first notification list without
+sorting a user's whole history; (status, created_at) lets the retention job
+find expired READ/ACCEPTED/REJECTED rows without scanning the table.
+Built concurrently on Postgres, as in the composite access path indexes.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a3d6f1c2e58'
+down_revision = '5e1d8c2b9a64'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_notifications_user_id_created_at', 'notifications', ['user_id', 'created_at']),
+    ('ix_notifications_status_created_at', 'notifications', ['status', 'created_at']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+        return
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        return
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
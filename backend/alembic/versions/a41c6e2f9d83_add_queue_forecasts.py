@@ -0,0 +1,38 @@
+"""add queue forecasts
+
+Revision ID: a41c6e2f9d83
+Revises: d5a9e3f7b214
+Create Date: 2026-10-19 15:12:44.208113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c6e2f9d83'
+down_revision = 'd5a9e3f7b214'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('queue_forecasts',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue_id', sa.Integer(), nullable=False),
+    sa.Column('arrivals', sa.LargeBinary(), nullable=False),
+    sa.Column('departures', sa.LargeBinary(), nullable=False),
+    sa.Column('first_event_at', sa.DateTime(), nullable=True),
+    sa.Column('computed_through', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['queue_id'], ['queues.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('queue_id')
+    )
+    op.create_index(op.f('ix_queue_forecasts_id'), 'queue_forecasts', ['id'], unique=False)
+    # Profiles are built with `python -m app.cli refresh-forecasts --full`.
+
+
+def downgrade():
+    op.drop_index(op.f('ix_queue_forecasts_id'), table_name='queue_forecasts')
+    op.drop_table('queue_forecasts')
@@ -0,0 +1,85 @@
+"""store notification extra_data as json
+
+Revision ID: b6e2d9a4c173
+Revises: 9a3d6f1c2e58
+Create Date: 2026-10-19 18:42:10.508361
+
+extra_data becomes JSONB on Postgres. Values that are not a JSON object are
+cleared first, since the cast would reject them. SQLite keeps the text storage
+that SQLAlchemy's JSON type reads and writes, so only the cleanup runs there.
+Role lookups of organization invites get an expression index and the column
+a GIN index for containment queries. Both are built concurrently.
+The type change rewrites the table under an exclusive lock.
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6e2d9a4c173'
+down_revision = '9a3d6f1c2e58'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+notifications = sa.table(
+    'notifications',
+    sa.column('id', sa.Integer),
+    sa.column('extra_data', sa.Text),
+)
+
+
+def _clear_invalid(bind):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(notifications.c.id, notifications.c.extra_data)
+            .where(notifications.c.id > last_id, notifications.c.extra_data.isnot(None))
+            .order_by(notifications.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        invalid = []
+        for row in rows:
+            try:
+                valid = isinstance(json.loads(row.extra_data), dict)
+            except ValueError:
+                valid = False
+            if not valid:
+                invalid.append(row.id)
+        if invalid:
+            bind.execute(notifications.update().where(notifications.c.id.in_(invalid)).values(extra_data=None))
+        last_id = rows[-1].id
+
+
+def upgrade():
+    bind = op.get_bind()
+    _clear_invalid(bind)
+    if bind.dialect.name != 'postgresql':
+        return
+    op.alter_column('notifications', 'extra_data',
+                    type_=postgresql.JSONB(), existing_type=sa.Text(),
+                    postgresql_using='extra_data::jsonb', existing_nullable=True)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_notifications_organization_id_status_role', 'notifications',
+                        ['organization_id', 'status', sa.text("(extra_data ->> 'role')")],
+                        postgresql_concurrently=True, if_not_exists=True)
+        op.create_index('ix_notifications_extra_data', 'notifications', ['extra_data'],
+                        postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_notifications_extra_data', table_name='notifications',
+                      postgresql_concurrently=True, if_exists=True)
+        op.drop_index('ix_notifications_organization_id_status_role', table_name='notifications',
+                      postgresql_concurrently=True, if_exists=True)
+    op.alter_column('notifications', 'extra_data',
+                    type_=sa.Text(), existing_type=postgresql.JSONB(),
+                    postgresql_using='extra_data::text', existing_nullable=True)
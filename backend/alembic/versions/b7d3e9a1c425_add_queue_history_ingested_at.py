@@ -0,0 +1,39 @@
+"""add queue_history.ingested_at
+
+Revision ID: b7d3e9a1c425
+Revises: d8e4b2a7f610
+Create Date: 2026-10-19 21:08:14.512930
+
+Forecast refreshes pick up history by when it was written, not by removed_at,
+so rows inserted late with an old removed_at (closed queue cleanup, edge sync)
+are still counted. Existing rows get the epoch, except those removed since the
+oldest forecast watermark, which the next refresh would still have read by
+removed_at.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e9a1c425'
+down_revision = 'd8e4b2a7f610'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('queue_history', sa.Column('ingested_at', sa.DateTime(), nullable=False,
+                                             server_default=sa.text("'1970-01-01 00:00:00'")))
+    op.execute("""
+        UPDATE queue_history SET ingested_at = removed_at
+        WHERE removed_at >= (SELECT min(computed_through) FROM queue_forecasts)
+    """)
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("ALTER TABLE queue_history ALTER COLUMN ingested_at SET DEFAULT (now() AT TIME ZONE 'utc')")
+    op.create_index('ix_queue_history_queue_id_ingested_at', 'queue_history', ['queue_id', 'ingested_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_queue_history_queue_id_ingested_at', table_name='queue_history')
+    op.drop_column('queue_history', 'ingested_at')
@@ -0,0 +1,113 @@
+"""partition queue_history by month
+
+Revision ID: d5a9e3f7b214
+Revises: 8f4d2a61c0be
+Create Date: 2026-10-19 14:22:57.031846
+
+Converts queue_history into a table range-partitioned on removed_at with one
+partition per month plus a default partition. Postgres only; on other
+databases this migration does nothing. Further partitions are created by
+`python -m app.cli partitions ensure`.
+
+"""
+from datetime import date, datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd5a9e3f7b214'
+down_revision = '8f4d2a61c0be'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE TABLE queue_history_partitioned (
+            id INTEGER NOT NULL DEFAULT nextval('queue_history_id_seq'),
+            queue_id INTEGER NOT NULL,
+            user_id INTEGER,
+            joined_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            removed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            waiting_time DOUBLE PRECISION NOT NULL,
+            CONSTRAINT queue_history_partitioned_pkey PRIMARY KEY (id, removed_at),
+            CONSTRAINT queue_history_partitioned_queue_id_fkey FOREIGN KEY (queue_id)
+                REFERENCES queues (id) DEFERRABLE INITIALLY DEFERRED,
+            CONSTRAINT queue_history_partitioned_user_id_fkey FOREIGN KEY (user_id)
+                REFERENCES users (id) DEFERRABLE INITIALLY DEFERRED
+        ) PARTITION BY RANGE (removed_at)
+    """)
+
+    oldest = bind.execute(sa.text("SELECT min(removed_at) FROM queue_history")).scalar()
+    today = datetime.utcnow().date()
+    month = date((oldest or today).year, (oldest or today).month, 1)
+    last = date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE queue_history_y{month.year:04d}m{month.month:02d} "
+            f"PARTITION OF queue_history_partitioned "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+    op.execute("CREATE TABLE queue_history_default PARTITION OF queue_history_partitioned DEFAULT")
+
+    op.execute("""
+        INSERT INTO queue_history_partitioned (id, queue_id, user_id, joined_at, removed_at, waiting_time)
+        SELECT id, queue_id, user_id, joined_at, removed_at, waiting_time FROM queue_history
+    """)
+    op.execute("ALTER SEQUENCE queue_history_id_seq OWNED BY queue_history_partitioned.id")
+    op.drop_table('queue_history')
+    op.execute("ALTER TABLE queue_history_partitioned RENAME TO queue_history")
+    op.execute("ALTER TABLE queue_history RENAME CONSTRAINT queue_history_partitioned_pkey TO queue_history_pkey")
+    op.execute("ALTER TABLE queue_history RENAME CONSTRAINT queue_history_partitioned_queue_id_fkey TO queue_history_queue_id_fkey")
+    op.execute("ALTER TABLE queue_history RENAME CONSTRAINT queue_history_partitioned_user_id_fkey TO queue_history_user_id_fkey")
+    op.create_index(op.f('ix_queue_history_id'), 'queue_history', ['id'], unique=False)
+    # Lets lookback filters prune partitions and then use an index inside each one.
+    op.create_index('ix_queue_history_queue_id_removed_at', 'queue_history', ['queue_id', 'removed_at'], unique=False)
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    op.execute("""
+        CREATE TABLE queue_history_heap (
+            id INTEGER NOT NULL DEFAULT nextval('queue_history_id_seq'),
+            queue_id INTEGER NOT NULL,
+            user_id INTEGER,
+            joined_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            removed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            waiting_time DOUBLE PRECISION NOT NULL,
+            CONSTRAINT queue_history_heap_pkey PRIMARY KEY (id),
+            CONSTRAINT queue_history_heap_queue_id_fkey FOREIGN KEY (queue_id)
+                REFERENCES queues (id) DEFERRABLE INITIALLY DEFERRED,
+            CONSTRAINT queue_history_heap_user_id_fkey FOREIGN KEY (user_id)
+                REFERENCES users (id) DEFERRABLE INITIALLY DEFERRED
+        )
+    """)
+    op.execute("""
+        INSERT INTO queue_history_heap (id, queue_id, user_id, joined_at, removed_at, waiting_time)
+        SELECT id, queue_id, user_id, joined_at, removed_at, waiting_time FROM queue_history
+    """)
+    op.execute("ALTER SEQUENCE queue_history_id_seq OWNED BY queue_history_heap.id")
+    # Dropping the parent drops every partition with it.
+    op.execute("DROP TABLE queue_history")
+    op.execute("ALTER TABLE queue_history_heap RENAME TO queue_history")
+    op.execute("ALTER TABLE queue_history RENAME CONSTRAINT queue_history_heap_pkey TO queue_history_pkey")
+    op.execute("ALTER TABLE queue_history RENAME CONSTRAINT queue_history_heap_queue_id_fkey TO queue_history_queue_id_fkey")
+    op.execute("ALTER TABLE queue_history RENAME CONSTRAINT queue_history_heap_user_id_fkey TO queue_history_user_id_fkey")
+    op.create_index(op.f('ix_queue_history_id'), 'queue_history', ['id'], unique=False)
@@ -0,0 +1,43 @@
+"""add edge sync tables
+
+Revision ID: d8e4b2a7f610
+Revises: c3f8a1d5e927
+Create Date: 2026-10-19 19:31:52.640117
+
+sync_outbox is only written on edge nodes (by the triggers installed in edge
+mode), sync_nodes only on the central server. Both are created everywhere so
+one migration history serves both.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd8e4b2a7f610'
+down_revision = 'c3f8a1d5e927'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('sync_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(length=32), nullable=False),
+    sa.Column('op', sa.String(length=16), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sqlite_autoincrement=True
+    )
+    op.create_table('sync_nodes',
+    sa.Column('node_id', sa.String(length=64), nullable=False),
+    sa.Column('last_change_id', sa.Integer(), nullable=False),
+    sa.Column('last_seen_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('node_id')
+    )
+
+
+def downgrade():
+    op.drop_table('sync_nodes')
+    op.drop_table('sync_outbox')
@@ -0,0 +1,61 @@
+"""add composite access path indexes
+
+Revision ID: e7b3f0c5a192
+Revises: a41c6e2f9d83
+Create Date: 2026-10-19 16:31:08.774502
+
+Indexes for the hot filters on queue_items, notifications and memberships,
+and for listing queues and services by organization or service.
+On Postgres they are built with CREATE INDEX CONCURRENTLY outside of the
+migration transaction, so writes are not blocked while they build.
+On Postgres queue_history(queue_id, removed_at) already exists (partition
+migration, which is Postgres-only); other databases get it here.
+queues.access_token is covered by its unique constraint.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7b3f0c5a192'
+down_revision = 'a41c6e2f9d83'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_queue_items_queue_id_status_token_number', 'queue_items', ['queue_id', 'status', 'token_number']),
+    ('ix_queue_items_queue_id_user_id', 'queue_items', ['queue_id', 'user_id']),
+    ('ix_queue_items_queue_id_joined_at', 'queue_items', ['queue_id', 'joined_at']),
+    ('ix_notifications_user_id_status_created_at', 'notifications', ['user_id', 'status', 'created_at']),
+    ('ix_memberships_organization_id_user_id', 'memberships', ['organization_id', 'user_id']),
+    ('ix_queues_organization_id', 'queues', ['organization_id']),
+    ('ix_queues_service_id', 'queues', ['service_id']),
+    ('ix_services_organization_id', 'services', ['organization_id']),
+]
+
+# Created on Postgres by the partition migration.
+NON_POSTGRES_INDEXES = [
+    ('ix_queue_history_queue_id_removed_at', 'queue_history', ['queue_id', 'removed_at']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, columns in INDEXES:
+                op.create_index(name, table, columns, unique=False,
+                                postgresql_concurrently=True, if_not_exists=True)
+        return
+    for name, table, columns in INDEXES + NON_POSTGRES_INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+        return
+    for name, table, _ in reversed(INDEXES + NON_POSTGRES_INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,85 @@
+"""add notification invite token
+
+Revision ID: f2c8a4d61b07
+Revises: e7b3f0c5a192
+Create Date: 2026-10-19 17:05:26.113940
+
+Moves organization invite tokens out of the extra_data JSON blob into a
+unique, indexed column so invite links resolve with a single lookup.
+
+"""
+import json
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2c8a4d61b07'
+down_revision = 'e7b3f0c5a192'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+notifications = sa.table(
+    'notifications',
+    sa.column('id', sa.Integer),
+    sa.column('extra_data', sa.Text),
+    sa.column('invite_token', sa.String),
+)
+
+
+def _rewrite(bind, select, transform):
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            select.where(notifications.c.id > last_id).order_by(notifications.c.id).limit(BATCH_SIZE)
+        ).fetchall()
+        if not rows:
+            return
+        for row in rows:
+            values = transform(row)
+            if values:
+                bind.execute(notifications.update().where(notifications.c.id == row.id).values(**values))
+        last_id = rows[-1].id
+
+
+def upgrade():
+    op.add_column('notifications', sa.Column('invite_token', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_notifications_invite_token'), 'notifications', ['invite_token'], unique=True)
+
+    def move_token(row):
+        try:
+            extra_data = json.loads(row.extra_data or '{}')
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(extra_data, dict) or not extra_data.get('invite_token'):
+            return None
+        token = extra_data.pop('invite_token')
+        return {'invite_token': token, 'extra_data': json.dumps(extra_data)}
+
+    _rewrite(
+        op.get_bind(),
+        sa.select(notifications.c.id, notifications.c.extra_data)
+        .where(notifications.c.extra_data.like('%invite_token%')),
+        move_token,
+    )
+
+
+def downgrade():
+    def restore_token(row):
+        try:
+            extra_data = json.loads(row.extra_data or '{}')
+        except json.JSONDecodeError:
+            extra_data = {}
+        extra_data['invite_token'] = row.invite_token
+        return {'extra_data': json.dumps(extra_data)}
+
+    _rewrite(
+        op.get_bind(),
+        sa.select(notifications.c.id, notifications.c.extra_data, notifications.c.invite_token)
+        .where(notifications.c.invite_token.isnot(None)),
+        restore_token,
+    )
+    op.drop_index(op.f('ix_notifications_invite_token'), table_name='notifications')
+    op.drop_column('notifications', 'invite_token')
@@ -1,15 +1,16 @@
 # backend/app/auth.py
 
-from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from typing import Optional
+from uuid import uuid4
 
 import os
 from dotenv import load_dotenv
 from .schemas.token import TokenData
 
 from .models.user import UserRole
+from .utils import passwords
 
 load_dotenv()
 
@@ -17,14 +18,16 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+REFRESH_TOKEN_TYPE = "refresh"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str):
-    return pwd_context.hash(password)
+# bcrypt runs in the process pool in utils.passwords; see there for sizing and rehashing.
+hash_password = passwords.hash_password
+hash_password_async = passwords.hash_password_async
+verify_password_async = passwords.verify_password_async
 
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    return passwords.verify_password(plain_password, hashed_password)[0]
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -32,11 +35,39 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def create_refresh_token(user_id: int, family: Optional[str] = None) -> str:
+    """
+    A signed refresh token. ``jti`` identifies this token and ``fam`` the chain of
+    tokens rotated from the same login, so a replayed token can revoke the chain.
+    """
+    expire = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    claims = {
+        "sub": str(user_id),
+        "typ": REFRESH_TOKEN_TYPE,
+        "jti": uuid4().hex,
+        "fam": family or uuid4().hex,
+        "exp": expire,
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=ALGORITHM)
+
+def decode_refresh_token(token: str) -> Optional[dict]:
+    """
+    The claims of a valid, unexpired refresh token, or None. Only checks the
+    signature; revocation is checked by the caller.
+    """
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    if payload.get("typ") != REFRESH_TOKEN_TYPE or not all(payload.get(claim) for claim in ("sub", "jti", "fam")):
+        return None
+    return payload
+
 def decode_access_token(token: str) -> Optional[TokenData]:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: Optional[str] = payload.get("sub")
-        if user_id is None:
+        if user_id is None or payload.get("typ") == REFRESH_TOKEN_TYPE:
             return None
         token_data = TokenData(sub=user_id)
         return token_data
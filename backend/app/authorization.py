@@ -0,0 +1,293 @@
+# backend/app/authorization.py
+#
+# Organization-role checks shared by the routers. A queue or service resolves to
+# its effective organization and the caller's role there in one joined query;
+# each user's organization -> role map and each queue's scope are cached per
+# process and dropped when a membership, queue or service changes (ORM events,
+# applied on commit). Caches are only trusted to grant: a check that would fail
+# on cached data is repeated against the database, so a new membership or a
+# moved queue works at once on every process. A revoked grant reaches other
+# processes within AUTHZ_CACHE_SECONDS.
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import Depends, HTTPException
+from sqlalchemy import case, event, select
+from sqlalchemy.orm import Session
+
+from . import models
+from .core.config import settings
+from .dependencies import get_db, get_read_db, get_current_principal, load_user
+from .models.user import UserRole
+from .utils.cache import TTLCache
+from .utils.principal import Principal
+
+MANAGER_ROLES = (UserRole.ADMIN, UserRole.BUSINESS_OWNER)
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class QueueScope:
+    """Who a queue belongs to: its owner, its service and its effective organization."""
+    queue_id: int
+    owner_id: Optional[int]
+    service_id: Optional[int]
+    organization_id: Optional[int]
+
+
+_roles_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTHZ_CACHE_SECONDS)
+_queue_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTHZ_CACHE_SECONDS)
+
+
+def get_organization_roles(db: Session, user_id: int, fresh: bool = False) -> Dict[int, UserRole]:
+    """
+    The user's role in every organization they belong to; ``fresh`` skips the cache.
+    """
+    if fresh:
+        _roles_cache.invalidate(user_id)
+    roles = _roles_cache.get(user_id)
+    if roles is None:
+        memberships = models.Membership.__table__
+        roles = dict(db.execute(
+            select(memberships.c.organization_id, memberships.c.role).where(memberships.c.user_id == user_id)
+        ).all())
+        _roles_cache.set(user_id, roles)
+    return roles
+
+
+def get_organization_role(db: Session, user_id: int, organization_id: int,
+                          fresh: bool = False) -> Optional[UserRole]:
+    """
+    The user's role in the organization, or None. None is never served from the
+    cache: the membership may have been created by another process.
+    """
+    role = get_organization_roles(db, user_id, fresh).get(organization_id)
+    if role is None and not fresh:
+        role = get_organization_roles(db, user_id, fresh=True).get(organization_id)
+    return role
+
+
+def resolve_queue(db: Session, user_id: int, queue_id: int,
+                  fresh: bool = False) -> Tuple[Optional[QueueScope], Dict[int, UserRole]]:
+    """
+    The queue's scope (None if it does not exist) and the user's organization roles.
+    Costs no query when both are cached and one query otherwise: the queue is
+    joined to its service and, when the role map is cold, to the user's memberships.
+    ``fresh`` skips the caches. Missing queues are not cached.
+    """
+    if fresh:
+        _queue_cache.invalidate(queue_id)
+        _roles_cache.invalidate(user_id)
+    scope = _queue_cache.get(queue_id, _MISSING)
+    roles = _roles_cache.get(user_id)
+    if scope is not _MISSING:
+        return scope, roles if roles is not None else get_organization_roles(db, user_id)
+
+    queues = models.Queue.__table__
+    services = models.Service.__table__
+    memberships = models.Membership.__table__
+    organization_id = case(
+        (queues.c.service_id.isnot(None), services.c.organization_id),
+        else_=queues.c.organization_id,
+    )
+    joined = queues.outerjoin(services, services.c.id == queues.c.service_id)
+    columns = [queues.c.user_id, queues.c.service_id, organization_id]
+    if roles is None:
+        joined = joined.outerjoin(memberships, memberships.c.user_id == user_id)
+        columns += [memberships.c.organization_id, memberships.c.role]
+    rows = db.execute(select(*columns).select_from(joined).where(queues.c.id == queue_id)).all()
+
+    if not rows:
+        scope = None
+    else:
+        owner_id, service_id, effective_organization_id = rows[0][:3]
+        scope = QueueScope(queue_id, owner_id, service_id, effective_organization_id)
+        _queue_cache.set(queue_id, scope)
+    if roles is None:
+        if not rows:
+            return scope, get_organization_roles(db, user_id)
+        roles = {row[3]: row[4] for row in rows if row[3] is not None}
+        _roles_cache.set(user_id, roles)
+    return scope, roles
+
+
+def invalidate_user_roles(user_id: int) -> None:
+    _roles_cache.invalidate(user_id)
+
+
+def invalidate_queue(queue_id: int) -> None:
+    _queue_cache.invalidate(queue_id)
+
+
+# Cache invalidation. Changes are collected while flushing and applied after the
+# commit, so a concurrent request can't re-cache the old rows in between.
+
+def _mark(session: Session, kind: str, key) -> None:
+    session.info.setdefault("authorization_changes", set()).add((kind, key))
+
+
+@event.listens_for(models.Membership, "after_insert")
+@event.listens_for(models.Membership, "after_update")
+@event.listens_for(models.Membership, "after_delete")
+def _membership_changed(mapper, connection, target) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        _mark(session, "user", target.user_id)
+
+
+@event.listens_for(models.Queue, "after_insert")
+@event.listens_for(models.Queue, "after_update")
+@event.listens_for(models.Queue, "after_delete")
+def _queue_changed(mapper, connection, target) -> None:
+    session = Session.object_session(target)
+    if session is not None:
+        _mark(session, "queue", target.id)
+
+
+@event.listens_for(models.Service, "after_update")
+@event.listens_for(models.Service, "after_delete")
+def _service_changed(mapper, connection, target) -> None:
+    # A service moving organization moves all of its queues.
+    session = Session.object_session(target)
+    if session is not None:
+        _mark(session, "queues", None)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_changes(session: Session) -> None:
+    for kind, key in session.info.pop("authorization_changes", ()):
+        if kind == "user":
+            invalidate_user_roles(key)
+        elif kind == "queue":
+            invalidate_queue(key)
+        else:
+            _queue_cache.clear()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changes(session: Session) -> None:
+    session.info.pop("authorization_changes", None)
+
+
+# FastAPI dependencies
+
+class OrganizationRole:
+    """
+    Dependency returning the caller's role in the organization named by the
+    ``organization_id`` path or query parameter. Raises 403 unless the caller is a
+    member with one of ``roles`` (any member when no roles are given).
+    """
+
+    def __init__(self, *roles: UserRole, detail: Optional[str] = None):
+        self.roles = roles
+        self.detail = detail or ("Insufficient permissions." if roles else "Not a member of this organization")
+
+    def __call__(
+        self,
+        organization_id: int,
+        principal: Principal = Depends(get_current_principal),
+        db: Session = Depends(get_db),
+    ) -> UserRole:
+        return self.check(db, principal, organization_id)
+
+    def check(self, db: Session, principal: Principal, organization_id: int) -> UserRole:
+        role = get_organization_role(db, principal.id, organization_id)
+        if role is not None and self.roles and role not in self.roles:
+            role = get_organization_role(db, principal.id, organization_id, fresh=True)
+        if role is None or (self.roles and role not in self.roles):
+            raise HTTPException(status_code=403, detail=self.detail)
+        return role
+
+
+class ReadOrganizationRole(OrganizationRole):
+    """OrganizationRole for read-only routes, on the route's get_read_db session."""
+
+    def __call__(
+        self,
+        organization_id: int,
+        principal: Principal = Depends(get_current_principal),
+        db: Session = Depends(get_read_db),
+    ) -> UserRole:
+        return self.check(db, principal, organization_id)
+
+
+class QueueAccess:
+    """
+    Dependency returning the QueueScope of the ``queue_id`` path parameter after
+    checking the caller may act on the queue at ``level``:
+
+    - "view": any member of the queue's organization, or the owner of a personal queue.
+    - "manage": ADMIN/BUSINESS_OWNER for service queues, any member for general
+      organization queues, the owner for personal queues.
+    - "staff": global ADMIN users, ADMIN/BUSINESS_OWNER of the organization, or the
+      owner of a personal queue. The global role is read from the user snapshot
+      (dependencies.load_user), not from the token, so a demotion takes effect
+      before the token expires.
+    """
+
+    def __init__(self, level: str, detail: str = "Insufficient permissions."):
+        if level not in ("view", "manage", "staff"):
+            raise ValueError(f"Unknown queue access level: {level}")
+        self.level = level
+        self.detail = detail
+
+    def __call__(
+        self,
+        queue_id: int,
+        principal: Principal = Depends(get_current_principal),
+        db: Session = Depends(get_db),
+    ) -> QueueScope:
+        scope, allowed = self.resolve(db, principal, queue_id)
+        if scope is None:
+            raise HTTPException(status_code=404, detail="Queue not found.")
+        if not allowed:
+            raise HTTPException(status_code=403, detail=self.detail)
+        return scope
+
+    def resolve(self, db: Session, principal: Principal, queue_id: int) -> Tuple[Optional[QueueScope], bool]:
+        """The queue's scope (None if it does not exist) and whether the caller may act on it."""
+        scope, roles = resolve_queue(db, principal.id, queue_id)
+        if scope is not None and self.allows(db, scope, roles, principal):
+            return scope, True
+        scope, roles = resolve_queue(db, principal.id, queue_id, fresh=True)
+        return scope, scope is not None and self.allows(db, scope, roles, principal)
+
+    def allows(self, db: Session, scope: QueueScope, roles: Dict[int, UserRole], principal: Principal) -> bool:
+        if self.level == "staff":
+            user = load_user(db, principal.id)
+            if user is not None and user.role == UserRole.ADMIN:
+                return True
+        if scope.organization_id is None:
+            return scope.owner_id == principal.id
+        role = roles.get(scope.organization_id)
+        if role is None:
+            return False
+        if self.level == "view":
+            return True
+        if self.level == "manage" and scope.service_id is None:
+            return True
+        return role in MANAGER_ROLES
+
+
+class ReadQueueAccess(QueueAccess):
+    """QueueAccess for read-only routes, on the route's get_read_db session."""
+
+    def __call__(
+        self,
+        queue_id: int,
+        principal: Principal = Depends(get_current_principal),
+        db: Session = Depends(get_read_db),
+    ) -> QueueScope:
+        return super().__call__(queue_id, principal, db)
+
+
+organization_member = OrganizationRole()
+organization_manager = OrganizationRole(*MANAGER_ROLES)
+organization_admin = OrganizationRole(UserRole.ADMIN)
+read_organization_member = ReadOrganizationRole()
+
+view_queue = ReadQueueAccess("view", detail="Not authorized to view this queue.")
+manage_queue = QueueAccess("manage")
+staff_queue = QueueAccess("staff", detail="Insufficient permissions to remove items from this queue.")
@@ -0,0 +1,329 @@
+# backend/app/cli.py
+#
+# Maintenance commands. Run from the backend directory:
+#   python -m app.cli rebuild-leaderboard
+
+import argparse
+import asyncio
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from .core.config import settings
+from .database import Base, SessionLocal, engine
+from . import crud
+from .crud.queue_history import EXPORT_COLUMNS
+from .utils.export import ndjson_chunks, csv_chunks, write_parquet
+from .utils.archive import archive_queue_history, archive_horizon
+from .utils.sync_agent import SyncAgent
+from .utils.partitions import ensure_history_partitions, apply_history_retention
+from .utils import revocation
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Databases deployed before migrations were run were built by
+# Base.metadata.create_all() at this revision; they have these tables and no
+# alembic_version.
+BASELINE_REVISION = "97edb2edc196"
+BASELINE_TABLES = {
+    "users", "organizations", "services", "memberships", "queues", "queue_items",
+    "queue_history", "notifications",
+}
+
+
+def _is_baseline_schema(inspector, tables) -> bool:
+    later_tables = set(Base.metadata.tables) - BASELINE_TABLES
+    return (BASELINE_TABLES <= tables and not tables & later_tables
+            and "user_id" in {column["name"] for column in inspector.get_columns("services")})
+
+
+def migrate(args) -> None:
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import inspect
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    config.attributes["database_url"] = settings.DATABASE_URL
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    if "alembic_version" in tables:
+        command.upgrade(config, "head")
+    elif _is_baseline_schema(inspector, tables):
+        print(f"Database has the schema of revision {BASELINE_REVISION} but no migration history; stamping it.")
+        command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, "head")
+    elif engine.dialect.name == "sqlite" and not tables:
+        # The early migrations are Postgres-only. A new SQLite database (edge
+        # nodes, development) gets the current schema and is stamped instead.
+        Base.metadata.create_all(bind=engine)
+        command.stamp(config, "head")
+    elif tables:
+        raise SystemExit("The database has tables but no migration history. Find the revision its schema "
+                         f"matches (databases built by create_all before migrations were used match "
+                         f"{BASELINE_REVISION}), run `alembic stamp <revision>`, then migrate again.")
+    else:
+        command.upgrade(config, "head")
+    print("Database schema is up to date.")
+
+
+def startup_profile(args) -> None:
+    # In a fresh interpreter, so that the modules this command imported are counted.
+    subprocess.run(
+        [sys.executable, "-c", "from app.utils.startup import profile_app; profile_app()"],
+        cwd=BACKEND_DIR, check=True,
+    )
+
+
+def email_worker(args) -> None:
+    from .utils.email_worker import EmailWorker
+    worker = EmailWorker(connections=args.connections, batch_size=args.batch_size)
+    try:
+        asyncio.run(worker.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+
+
+def sync_agent(args) -> None:
+    try:
+        agent = SyncAgent(batch_size=args.batch_size)
+    except ValueError as exc:
+        raise SystemExit(str(exc))
+    try:
+        asyncio.run(agent.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+
+
+def rebuild_leaderboard(args) -> None:
+    db = SessionLocal()
+    try:
+        crud.rebuild_leaderboard(db, days=args.days)
+    finally:
+        db.close()
+    print("Leaderboard counters rebuilt.")
+
+
+def rebuild_notification_counters(args) -> None:
+    db = SessionLocal()
+    try:
+        crud.rebuild_notification_counters(db)
+    finally:
+        db.close()
+    print("Notification counters rebuilt.")
+
+
+def rebuild_history_rollups(args) -> None:
+    db = SessionLocal()
+    try:
+        if args.hour_of_week_only:
+            read = crud.rebuild_hour_of_week_rollups(db, queue_id=args.queue_id)
+            print(f"Hour-of-week rollups rebuilt from {read} hour buckets.")
+            return
+        # Archived rows are gone from queue_history; keep the rollups that cover them.
+        folded = crud.rebuild_queue_history_rollups(db, queue_id=args.queue_id, since=archive_horizon())
+    finally:
+        db.close()
+    print(f"Queue history rollups rebuilt from {folded} rows.")
+
+
+def refresh_forecasts(args) -> None:
+    while True:
+        db = SessionLocal()
+        try:
+            refreshed = crud.refresh_queue_forecasts(db, queue_id=args.queue_id, full=args.full)
+        finally:
+            db.close()
+        print(f"Refreshed forecasts of {refreshed} queues.", flush=True)
+        if not args.every:
+            return
+        try:
+            time.sleep(args.every)
+        except KeyboardInterrupt:
+            return
+
+
+def export_history(args) -> None:
+    scopes = [args.queue_id, args.service_id, args.organization_id]
+    if sum(scope is not None for scope in scopes) != 1:
+        raise SystemExit("Specify exactly one of --queue-id, --service-id or --organization-id")
+
+    db = SessionLocal()
+    try:
+        rows = crud.iter_queue_history(
+            db,
+            queue_id=args.queue_id,
+            service_id=args.service_id,
+            organization_id=args.organization_id,
+            start=args.start,
+            end=args.end,
+            batch_size=args.batch_size,
+        )
+        if args.format == "parquet":
+            if args.output == "-":
+                raise SystemExit("Parquet export needs --output")
+            written = write_parquet(rows, EXPORT_COLUMNS, args.output)
+            print(f"Wrote {written} rows to {args.output}", file=sys.stderr)
+            return
+
+        encoder = ndjson_chunks if args.format == "ndjson" else csv_chunks
+        out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+        try:
+            for chunk in encoder(rows, EXPORT_COLUMNS):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout.buffer:
+                out.close()
+    finally:
+        db.close()
+
+
+def archive_history(args) -> None:
+    db = SessionLocal()
+    try:
+        archived = archive_queue_history(db, older_than_days=args.older_than_days, archive_dir=args.archive_dir)
+    finally:
+        db.close()
+    print(f"Archived {archived} queue history rows.")
+
+
+def partitions(args) -> None:
+    db = SessionLocal()
+    try:
+        created = ensure_history_partitions(db, months_ahead=args.months_ahead)
+    finally:
+        db.close()
+    print(f"Created {len(created)} queue_history partitions: {', '.join(created) or '-'}")
+
+
+def retention(args) -> None:
+    db = SessionLocal()
+    try:
+        if args.history_days is not None:
+            if args.archive:
+                archived = archive_queue_history(db, older_than_days=args.history_days)
+                print(f"Archived {archived} queue history rows.")
+            print(apply_history_retention(db, keep_days=args.history_days))
+        if args.notifications_days is not None:
+            purged = crud.purge_notifications(db, older_than_days=args.notifications_days)
+            print(f"Purged {purged} read or answered notifications.")
+        if args.minute_rollups_days is not None:
+            pruned = crud.prune_minute_rollups(db, keep_days=args.minute_rollups_days)
+            print(f"Pruned {pruned} minute rollup buckets.")
+        if args.closed_queue_items_days is not None:
+            removed = crud.archive_closed_queue_items(db, older_than_days=args.closed_queue_items_days)
+            print(f"Removed {removed} items from closed queues.")
+        if args.revoked_tokens:
+            purged = revocation.purge_expired(db)
+            print(f"Purged {purged} expired refresh token revocations.")
+    finally:
+        db.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="TimeWait maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migration = subparsers.add_parser("migrate", help="Create or upgrade the database schema")
+    migration.set_defaults(func=migrate)
+
+    profile = subparsers.add_parser("startup-profile", help="Time each phase of starting the API")
+    profile.set_defaults(func=startup_profile)
+
+    worker = subparsers.add_parser("email-worker", help="Deliver queued emails")
+    worker.add_argument("--once", action="store_true", help="Exit once the queue is empty")
+    worker.add_argument("--connections", type=int, default=None,
+                        help="Parallel SMTP connections (default: EMAIL_WORKER_CONNECTIONS)")
+    worker.add_argument("--batch-size", type=int, default=None,
+                        help="Jobs claimed per batch (default: EMAIL_WORKER_BATCH_SIZE)")
+    worker.set_defaults(func=email_worker)
+
+    agent = subparsers.add_parser("sync-agent", help="Ship this edge node's changes to the central server")
+    agent.add_argument("--once", action="store_true",
+                       help="Exit once the outbox is empty (fails if the central server is unreachable)")
+    agent.add_argument("--batch-size", type=int, default=None,
+                       help="Changes sent per request (default: SYNC_BATCH_SIZE)")
+    agent.set_defaults(func=sync_agent)
+
+    leaderboard = subparsers.add_parser("rebuild-leaderboard", help="Recompute /stats leaderboard counters")
+    leaderboard.add_argument("--days", type=int, default=crud.leaderboard.DAILY_RETENTION_DAYS,
+                             help="Number of daily counters to rebuild and keep")
+    leaderboard.set_defaults(func=rebuild_leaderboard)
+
+    counters = subparsers.add_parser("rebuild-notification-counters",
+                                     help="Recompute unread notification counters")
+    counters.set_defaults(func=rebuild_notification_counters)
+
+    rollups = subparsers.add_parser("rebuild-history-rollups",
+                                    help="Recompute queue history rollups from raw queue_history rows")
+    rollups.add_argument("--queue-id", type=int, default=None, help="Only rebuild this queue")
+    rollups.add_argument("--hour-of-week-only", action="store_true",
+                         help="Only derive the hour-of-week buckets from the existing hour buckets")
+    rollups.set_defaults(func=rebuild_history_rollups)
+
+    export = subparsers.add_parser("export-history", help="Stream queue history to NDJSON, CSV or Parquet")
+    export.add_argument("--queue-id", type=int, default=None)
+    export.add_argument("--service-id", type=int, default=None)
+    export.add_argument("--organization-id", type=int, default=None)
+    export.add_argument("--start", type=datetime.fromisoformat, default=None,
+                        help="Only rows removed at or after this ISO timestamp (UTC)")
+    export.add_argument("--end", type=datetime.fromisoformat, default=None,
+                        help="Only rows removed before this ISO timestamp (UTC)")
+    export.add_argument("--format", choices=["ndjson", "csv", "parquet"], default="ndjson")
+    export.add_argument("--output", default="-", help="Output file, '-' for stdout (not for parquet)")
+    export.add_argument("--batch-size", type=int, default=5000, help="Rows fetched per cursor round trip")
+    export.set_defaults(func=export_history)
+
+    archive = subparsers.add_parser("archive-history",
+                                    help="Move old queue history into the columnar archive")
+    archive.add_argument("--older-than-days", type=int, default=None,
+                         help="Archive rows removed more than this many days ago (default: HISTORY_ARCHIVE_AFTER_DAYS)")
+    archive.add_argument("--archive-dir", default=None, help="Archive root (default: HISTORY_ARCHIVE_DIR)")
+    archive.set_defaults(func=archive_history)
+
+    forecasts = subparsers.add_parser("refresh-forecasts",
+                                      help="Fold new queue history into the hour-of-week forecasts")
+    forecasts.add_argument("--queue-id", type=int, default=None)
+    forecasts.add_argument("--full", action="store_true",
+                           help="Recompute from the whole history, archive included")
+    forecasts.add_argument("--every", type=int, default=None, metavar="SECONDS",
+                           help="Keep running, refreshing again every SECONDS")
+    forecasts.set_defaults(func=refresh_forecasts)
+
+    partition = subparsers.add_parser("partitions", help="Create upcoming monthly queue_history partitions")
+    partition.add_argument("--months-ahead", type=int, default=3)
+    partition.set_defaults(func=partitions)
+
+    retain = subparsers.add_parser("retention", help="Drop expired queue history, stale queue items, old notifications, minute rollups and token revocations")
+    retain.add_argument("--history-days", type=int, default=None,
+                        help="Keep this many days of queue_history (whole partitions are dropped on Postgres)")
+    retain.add_argument("--archive", action="store_true",
+                        help="Archive the expiring history into the columnar archive before dropping it")
+    retain.add_argument("--closed-queue-items-days", type=int, default=None,
+                        help="Clear items of CLOSED queues that joined more than this many days ago")
+    retain.add_argument("--notifications-days", type=int, nargs="?", default=None,
+                        const=settings.NOTIFICATION_RETENTION_DAYS,
+                        help="Purge read or answered notifications older than this many days "
+                             "(NOTIFICATION_RETENTION_DAYS when given without a value)")
+    retain.add_argument("--minute-rollups-days", type=int, nargs="?", default=None,
+                        const=settings.HISTORY_MINUTE_ROLLUP_DAYS,
+                        help="Prune minute rollup buckets older than this many days "
+                             "(HISTORY_MINUTE_ROLLUP_DAYS when given without a value)")
+    retain.add_argument("--revoked-tokens", action="store_true",
+                        help="Purge revocations of refresh tokens that have expired")
+    retain.set_defaults(func=retention)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,9 +3,11 @@
 from .user import (
     get_user,
     get_user_by_email,
+    get_users_by_emails,
     create_user,
     get_users,
     update_user,
+    set_password_hash,
     delete_user
 )
 
@@ -15,7 +17,8 @@ from .organization import (
     get_organization_by_name,
     get_organizations,
     update_organization,
-    delete_organization
+    delete_organization,
+    get_organization_live
 )
 
 from .service import (
@@ -44,12 +47,14 @@ from .queue_item import (
     delete_queue_item,
     estimate_waiting_time,
     calculate_average_service_time,
-    calculate_average_waiting_time
+    calculate_average_waiting_time,
+    archive_closed_queue_items
 )
 
 from .membership import (
     create_membership,
     get_membership,
+    get_member_user_ids,
     get_memberships_by_organization,
     update_membership,
     delete_membership
@@ -59,25 +64,70 @@ from .queue_history import (
     create_queue_history,
     get_queue_history,
     get_average_wait_time,
-    get_queue_history_stats
+    get_queue_history_stats,
+    iter_queue_history
 )
 
 from .notification import (
     create_notification,
     get_notification,
+    get_notification_by_invite_token,
     get_user_notifications,
     update_notification,
     mark_as_read,
     delete_notification,
-    get_unread_count
+    get_unread_count,
+    get_pending_invite_user_ids,
+    create_organization_invites,
+    push_unread_counts,
+    notify_queue_waiters,
+    mark_all_as_read,
+    get_organization_invites,
+    purge_notifications,
+    rebuild_notification_counters,
+    forget_pending_notifications
 )
 
+from .leaderboard import (
+    record_item_added,
+    record_item_removed,
+    get_top_queues,
+    get_top_organizations,
+    rebuild_leaderboard
+)
+
+from .queue_history_rollup import (
+    record_history_rollups,
+    aggregate_history,
+    rebuild_queue_history_rollups,
+    prune_minute_rollups,
+    rebuild_hour_of_week_rollups,
+    get_wait_heatmap
+)
+
+from .queue_forecast import (
+    get_queue_forecast,
+    refresh_queue_forecast,
+    refresh_queue_forecasts,
+    summarize_forecast
+)
+
+from .email_job import (
+    enqueue_email,
+    claim_email_jobs,
+    complete_email_jobs
+)
+
+from .sync import apply_sync_batch
+
 __all__ = [
     "get_user",
     "get_user_by_email",
+    "get_users_by_emails",
     "create_user",
     "get_users",
     "update_user",
+    "set_password_hash",
     "delete_user",
     "create_organization",
     "get_organization",
@@ -85,6 +135,7 @@ __all__ = [
     "get_organizations",
     "update_organization",
     "delete_organization",
+    "get_organization_live",
     "create_service",
     "get_service",
     "get_services",
@@ -105,8 +156,10 @@ __all__ = [
     "estimate_waiting_time",
     "calculate_average_service_time",
     "calculate_average_waiting_time",
+    "archive_closed_queue_items",
     "create_membership",
     "get_membership",
+    "get_member_user_ids",
     "get_memberships_by_organization",
     "update_membership",
     "delete_membership",
@@ -114,11 +167,41 @@ __all__ = [
     "get_queue_history",
     "get_average_wait_time",
     "get_queue_history_stats",
+    "iter_queue_history",
     "create_notification",
     "get_notification",
+    "get_notification_by_invite_token",
     "get_user_notifications",
     "update_notification",
     "mark_as_read",
     "delete_notification",
     "get_unread_count",
+    "get_pending_invite_user_ids",
+    "create_organization_invites",
+    "push_unread_counts",
+    "notify_queue_waiters",
+    "mark_all_as_read",
+    "get_organization_invites",
+    "purge_notifications",
+    "rebuild_notification_counters",
+    "forget_pending_notifications",
+    "record_item_added",
+    "record_item_removed",
+    "get_top_queues",
+    "get_top_organizations",
+    "rebuild_leaderboard",
+    "record_history_rollups",
+    "aggregate_history",
+    "rebuild_queue_history_rollups",
+    "prune_minute_rollups",
+    "rebuild_hour_of_week_rollups",
+    "get_wait_heatmap",
+    "get_queue_forecast",
+    "refresh_queue_forecast",
+    "refresh_queue_forecasts",
+    "summarize_forecast",
+    "enqueue_email",
+    "claim_email_jobs",
+    "complete_email_jobs",
+    "apply_sync_batch",
 ]
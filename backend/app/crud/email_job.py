@@ -0,0 +1,103 @@
+# backend/app/crud/email_job.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_
+from typing import Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta
+import random
+from ..core.config import settings
+from ..models.email_job import EmailJob, EmailJobStatus
+
+def enqueue_email(db: Session, to_address: str, subject: str, template: str, context: Dict,
+                  commit: bool = True) -> EmailJob:
+    """
+    Queue an email for the delivery worker.
+    """
+    job = EmailJob(
+        to_address=to_address,
+        subject=subject,
+        template=template,
+        context=context,
+        status=EmailJobStatus.PENDING,
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.add(job)
+    if commit:
+        db.commit()
+        db.refresh(job)
+    return job
+
+def claim_email_jobs(db: Session, limit: int, lease_seconds: Optional[int] = None) -> List[Dict]:
+    """
+    Take up to ``limit`` due jobs, including SENDING jobs whose lease expired, and lease
+    them to the caller. Expired leases that already used EMAIL_MAX_ATTEMPTS (the worker
+    died mid-send every time) are failed instead. Rows locked by other workers are
+    skipped. Commits; returns plain dicts so the caller can work without the session.
+    """
+    lease_seconds = settings.EMAIL_WORKER_LEASE_SECONDS if lease_seconds is None else lease_seconds
+    now = datetime.utcnow()
+    expired = and_(EmailJob.status == EmailJobStatus.SENDING, EmailJob.next_attempt_at <= now)
+    db.query(EmailJob)\
+        .filter(expired, EmailJob.attempts >= settings.EMAIL_MAX_ATTEMPTS)\
+        .update({"status": EmailJobStatus.FAILED, "last_error": "Lease expired on the last attempt"},
+                synchronize_session=False)
+    jobs = db.query(EmailJob)\
+        .filter(
+            or_(
+                and_(EmailJob.status == EmailJobStatus.PENDING, EmailJob.next_attempt_at <= now),
+                and_(expired, EmailJob.attempts < settings.EMAIL_MAX_ATTEMPTS)
+            )
+        )\
+        .order_by(EmailJob.next_attempt_at)\
+        .limit(limit)\
+        .with_for_update(skip_locked=True)\
+        .all()
+    claimed = []
+    for job in jobs:
+        job.status = EmailJobStatus.SENDING
+        job.attempts += 1
+        job.next_attempt_at = now + timedelta(seconds=lease_seconds)
+        claimed.append({
+            "id": job.id,
+            "to_address": job.to_address,
+            "subject": job.subject,
+            "template": job.template,
+            "context": job.context,
+            "attempts": job.attempts,
+        })
+    db.commit()
+    return claimed
+
+def retry_delay(attempts: int) -> timedelta:
+    """
+    Exponential backoff with jitter, capped at EMAIL_RETRY_MAX_SECONDS.
+    """
+    delay = min(settings.EMAIL_RETRY_BASE_SECONDS * 2 ** max(attempts - 1, 0), settings.EMAIL_RETRY_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(0.5, 1.0))
+
+def complete_email_jobs(db: Session, sent_ids: Iterable[int],
+                        failures: Iterable[Tuple[int, str, bool]] = ()) -> None:
+    """
+    Record a worker batch: ``sent_ids`` were delivered, ``failures`` are
+    (job_id, error, permanent) tuples. Temporary failures are retried with backoff
+    until EMAIL_MAX_ATTEMPTS is reached. Commits.
+    """
+    now = datetime.utcnow()
+    sent_ids = list(sent_ids)
+    if sent_ids:
+        db.query(EmailJob).filter(EmailJob.id.in_(sent_ids)).update(
+            {"status": EmailJobStatus.SENT, "sent_at": now, "last_error": None},
+            synchronize_session=False
+        )
+    for job_id, error, permanent in failures:
+        job = db.get(EmailJob, job_id)
+        if not job:
+            continue
+        job.last_error = error
+        if permanent or job.attempts >= settings.EMAIL_MAX_ATTEMPTS:
+            job.status = EmailJobStatus.FAILED
+        else:
+            job.status = EmailJobStatus.PENDING
+            job.next_attempt_at = now + retry_delay(job.attempts)
+    db.commit()
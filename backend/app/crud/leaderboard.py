@@ -0,0 +1,200 @@
+# backend/app/crud/leaderboard.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import func, desc
+from typing import List, Optional, Tuple
+from datetime import datetime, date, timedelta
+from .. import models
+from ..models.leaderboard import LeaderboardCounter, LeaderboardScope, LIVE_PERIOD
+from ..utils.db import upsert
+
+# Daily counters older than this are dropped by rebuild_leaderboard.
+DAILY_RETENTION_DAYS = 90
+
+def _day_period(day: date) -> str:
+    return day.isoformat()
+
+def _bump(db: Session, scope: str, entity_id: int, period: str, delta: int) -> None:
+    upsert(
+        db,
+        LeaderboardCounter,
+        values={
+            "scope": scope,
+            "entity_id": entity_id,
+            "period": period,
+            "item_count": max(delta, 0),
+            "updated_at": datetime.utcnow(),
+        },
+        index_elements=["scope", "entity_id", "period"],
+        set_={
+            "item_count": LeaderboardCounter.item_count + delta,
+            "updated_at": datetime.utcnow(),
+        },
+    )
+
+def _queue_organization_id(db: Session, queue_id: int) -> Optional[int]:
+    return db.query(models.Queue.organization_id).filter(models.Queue.id == queue_id).scalar()
+
+def record_item_added(db: Session, queue_id: int, joined_at: Optional[datetime] = None,
+                      organization_id: Optional[int] = None) -> None:
+    """
+    Account for a new queue item. Does not commit; callers commit together with the item.
+    """
+    if organization_id is None:
+        organization_id = _queue_organization_id(db, queue_id)
+    day = _day_period((joined_at or datetime.utcnow()).date())
+
+    _bump(db, LeaderboardScope.QUEUE, queue_id, LIVE_PERIOD, 1)
+    _bump(db, LeaderboardScope.QUEUE, queue_id, day, 1)
+    if organization_id:
+        _bump(db, LeaderboardScope.ORGANIZATION, organization_id, LIVE_PERIOD, 1)
+        _bump(db, LeaderboardScope.ORGANIZATION, organization_id, day, 1)
+
+def record_item_removed(db: Session, queue_id: int, organization_id: Optional[int] = None) -> None:
+    """
+    Account for a queue item leaving its queue. Daily counters are left untouched,
+    they count joins. Does not commit.
+    """
+    if organization_id is None:
+        organization_id = _queue_organization_id(db, queue_id)
+
+    _bump(db, LeaderboardScope.QUEUE, queue_id, LIVE_PERIOD, -1)
+    if organization_id:
+        _bump(db, LeaderboardScope.ORGANIZATION, organization_id, LIVE_PERIOD, -1)
+
+def record_queue_moved(db: Session, queue_id: int, old_organization_id: Optional[int],
+                       new_organization_id: Optional[int]) -> None:
+    """
+    Move a queue's live item count from one organization to another. Does not commit.
+    """
+    live = db.query(LeaderboardCounter.item_count).filter(
+        LeaderboardCounter.scope == LeaderboardScope.QUEUE,
+        LeaderboardCounter.entity_id == queue_id,
+        LeaderboardCounter.period == LIVE_PERIOD
+    ).scalar() or 0
+    if not live:
+        return
+    if old_organization_id:
+        _bump(db, LeaderboardScope.ORGANIZATION, old_organization_id, LIVE_PERIOD, -live)
+    if new_organization_id:
+        _bump(db, LeaderboardScope.ORGANIZATION, new_organization_id, LIVE_PERIOD, live)
+
+def forget_queue(db: Session, queue_id: int, organization_id: Optional[int] = None) -> None:
+    """
+    Drop a deleted queue's counters and its live share of the organization total. Does not commit.
+    """
+    record_queue_moved(db, queue_id, organization_id, None)
+    db.query(LeaderboardCounter).filter(
+        LeaderboardCounter.scope == LeaderboardScope.QUEUE,
+        LeaderboardCounter.entity_id == queue_id
+    ).delete(synchronize_session=False)
+
+def forget_organization(db: Session, organization_id: int) -> None:
+    """
+    Drop a deleted organization's counters, including those of its queues. Does not commit.
+    """
+    queue_ids = db.query(models.Queue.id).filter(models.Queue.organization_id == organization_id)
+    db.query(LeaderboardCounter).filter(
+        LeaderboardCounter.scope == LeaderboardScope.QUEUE,
+        LeaderboardCounter.entity_id.in_(queue_ids.scalar_subquery())
+    ).delete(synchronize_session=False)
+    db.query(LeaderboardCounter).filter(
+        LeaderboardCounter.scope == LeaderboardScope.ORGANIZATION,
+        LeaderboardCounter.entity_id == organization_id
+    ).delete(synchronize_session=False)
+
+def get_top_entities(db: Session, scope: str, limit: int = 5,
+                     window_days: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Return (entity_id, count) pairs ordered by count. Without a window this reads the
+    live counters; with one it sums the daily join counters of the last ``window_days`` days.
+    """
+    if window_days is None:
+        rows = db.query(LeaderboardCounter.entity_id, LeaderboardCounter.item_count)\
+            .filter(
+                LeaderboardCounter.scope == scope,
+                LeaderboardCounter.period == LIVE_PERIOD
+            )\
+            .order_by(desc(LeaderboardCounter.item_count))\
+            .limit(limit)\
+            .all()
+        return [(r[0], r[1]) for r in rows]
+
+    today = datetime.utcnow().date()
+    periods = [_day_period(today - timedelta(days=offset)) for offset in range(window_days)]
+    total = func.sum(LeaderboardCounter.item_count).label("total")
+    rows = db.query(LeaderboardCounter.entity_id, total)\
+        .filter(
+            LeaderboardCounter.scope == scope,
+            LeaderboardCounter.period.in_(periods)
+        )\
+        .group_by(LeaderboardCounter.entity_id)\
+        .order_by(desc("total"))\
+        .limit(limit)\
+        .all()
+    return [(r[0], int(r[1])) for r in rows]
+
+def get_top_queues(db: Session, limit: int = 5, window_days: Optional[int] = None):
+    top = get_top_entities(db, LeaderboardScope.QUEUE, limit=limit, window_days=window_days)
+    names = dict(db.query(models.Queue.id, models.Queue.name)
+                 .filter(models.Queue.id.in_([entity_id for entity_id, _ in top])).all()) if top else {}
+    return [
+        {"queue_id": entity_id, "queue_name": names.get(entity_id), "count": count}
+        for entity_id, count in top if entity_id in names
+    ]
+
+def get_top_organizations(db: Session, limit: int = 5, window_days: Optional[int] = None):
+    top = get_top_entities(db, LeaderboardScope.ORGANIZATION, limit=limit, window_days=window_days)
+    names = dict(db.query(models.Organization.id, models.Organization.name)
+                 .filter(models.Organization.id.in_([entity_id for entity_id, _ in top])).all()) if top else {}
+    return [
+        {"org_id": entity_id, "org_name": names.get(entity_id), "count": count}
+        for entity_id, count in top if entity_id in names
+    ]
+
+def rebuild_leaderboard(db: Session, days: int = DAILY_RETENTION_DAYS) -> None:
+    """
+    Recompute every counter from queue_items and queue_history and prune expired
+    daily counters. Meant to run periodically to reconcile drift; commits.
+    """
+    since = datetime.utcnow().date() - timedelta(days=days - 1)
+    since_dt = datetime.combine(since, datetime.min.time())
+    db.query(LeaderboardCounter).delete(synchronize_session=False)
+
+    counters = {}
+
+    def add(scope, entity_id, period, count):
+        key = (scope, entity_id, period)
+        counters[key] = counters.get(key, 0) + count
+
+    live = db.query(
+        models.QueueItem.queue_id,
+        models.Queue.organization_id,
+        func.count(models.QueueItem.id)
+    ).join(models.Queue, models.Queue.id == models.QueueItem.queue_id)\
+        .group_by(models.QueueItem.queue_id, models.Queue.organization_id)\
+        .all()
+    for queue_id, organization_id, count in live:
+        add(LeaderboardScope.QUEUE, queue_id, LIVE_PERIOD, count)
+        if organization_id:
+            add(LeaderboardScope.ORGANIZATION, organization_id, LIVE_PERIOD, count)
+
+    for model in (models.QueueItem, models.QueueHistory):
+        day = func.date(model.joined_at)
+        joins = db.query(model.queue_id, models.Queue.organization_id, day, func.count(model.id))\
+            .join(models.Queue, models.Queue.id == model.queue_id)\
+            .filter(model.joined_at >= since_dt)\
+            .group_by(model.queue_id, models.Queue.organization_id, day)\
+            .all()
+        for queue_id, organization_id, joined_day, count in joins:
+            period = joined_day if isinstance(joined_day, str) else _day_period(joined_day)
+            add(LeaderboardScope.QUEUE, queue_id, period, count)
+            if organization_id:
+                add(LeaderboardScope.ORGANIZATION, organization_id, period, count)
+
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(LeaderboardCounter, [
+        {"scope": scope, "entity_id": entity_id, "period": period, "item_count": count, "updated_at": now}
+        for (scope, entity_id, period), count in counters.items()
+    ])
+    db.commit()
@@ -1,7 +1,7 @@
 # backend/app/crud/membership.py
 
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Iterable, List, Optional, Set
 from .. import models, schemas
 from ..models.user import UserRole
 
@@ -22,6 +22,19 @@ def get_membership(db: Session, organization_id: int, user_id: int) -> Optional[
         models.Membership.user_id == user_id
     ).first()
 
+def get_member_user_ids(db: Session, organization_id: int, user_ids: Iterable[int]) -> Set[int]:
+    """
+    Return which of ``user_ids`` are already members of the organization.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return set()
+    rows = db.query(models.Membership.user_id).filter(
+        models.Membership.organization_id == organization_id,
+        models.Membership.user_id.in_(user_ids)
+    ).all()
+    return {row[0] for row in rows}
+
 def get_memberships_by_organization(db: Session, organization_id: int) -> List[models.Membership]:
     return db.query(models.Membership).filter(models.Membership.organization_id == organization_id).all()
 
@@ -1,10 +1,66 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
-from typing import List, Optional
-from datetime import datetime
+from sqlalchemy import String, case, exists, func, insert, literal, literal_column, or_, select, update
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
+import secrets
 from .. import models, schemas
+from ..core.config import settings
+from ..models.notification_counter import NotificationCounter
+from ..utils.db import upsert
+from ..utils.notifications import push_queue_update, push_unread_count
 
-def create_notification(db: Session, notification: schemas.NotificationCreate) -> models.Notification:
+_INVITE_TYPES = [
+    models.NotificationType.ORGANIZATION_INVITE,
+    models.NotificationType.QUEUE_INVITE,
+    models.NotificationType.SERVICE_INVITE,
+]
+_SETTLED_STATUSES = [
+    models.NotificationStatus.READ,
+    models.NotificationStatus.ACCEPTED,
+    models.NotificationStatus.REJECTED,
+]
+
+def extra_data_key(db: Session, key: str):
+    """
+    SQL expression for a top-level extra_data key as text. The key is rendered inline,
+    not as a parameter, so it matches the expression indexes on Postgres.
+    """
+    if not key.isidentifier():
+        raise ValueError(f"Invalid extra_data key: {key!r}")
+    column = models.Notification.extra_data
+    if db.get_bind().dialect.name == "postgresql":
+        return column.op("->>", return_type=String)(literal_column(f"'{key}'"))
+    return func.json_extract(column, literal_column(f"'$.{key}'"))
+
+def _adjust_unread(db: Session, user_id: int, delta: int) -> None:
+    """
+    Move a user's unread counter by ``delta``. Does not commit.
+    """
+    upsert(
+        db,
+        NotificationCounter,
+        values={"user_id": user_id, "unread": max(delta, 0), "updated_at": datetime.utcnow()},
+        index_elements=["user_id"],
+        set_={"unread": NotificationCounter.unread + delta, "updated_at": datetime.utcnow()},
+    )
+
+def _unread_delta(old_status, new_status) -> int:
+    pending = models.NotificationStatus.PENDING
+    return (new_status == pending) - (old_status == pending)
+
+def _get_for_update(db: Session, notification_id: int) -> Optional[models.Notification]:
+    # Locked so concurrent status changes can't both adjust the counter.
+    return db.query(models.Notification)\
+        .filter(models.Notification.id == notification_id)\
+        .with_for_update()\
+        .populate_existing()\
+        .first()
+
+def _push(db: Session, user_id: int) -> None:
+    push_unread_count(user_id, get_unread_count(db, user_id))
+
+def create_notification(db: Session, notification: schemas.NotificationCreate,
+                        invite_token: Optional[str] = None) -> models.Notification:
     """
     Create a new notification.
     """
@@ -17,11 +73,14 @@ def create_notification(db: Session, notification: schemas.NotificationCreate) -
         queue_id=notification.queue_id,
         service_id=notification.service_id,
         extra_data=notification.extra_data,
+        invite_token=invite_token,
         status=models.NotificationStatus.PENDING
     )
     db.add(db_notification)
+    _adjust_unread(db, notification.user_id, 1)
     db.commit()
     db.refresh(db_notification)
+    _push(db, db_notification.user_id)
     return db_notification
 
 def get_notification(db: Session, notification_id: int) -> Optional[models.Notification]:
@@ -30,6 +89,219 @@ def get_notification(db: Session, notification_id: int) -> Optional[models.Notif
     """
     return db.query(models.Notification).filter(models.Notification.id == notification_id).first()
 
+def get_pending_invite_user_ids(db: Session, organization_id: int, user_ids: Iterable[int]) -> Set[int]:
+    """
+    Return which of ``user_ids`` already hold a pending invite to the organization.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return set()
+    rows = db.query(models.Notification.user_id).filter(
+        models.Notification.organization_id == organization_id,
+        models.Notification.type == models.NotificationType.ORGANIZATION_INVITE,
+        models.Notification.status == models.NotificationStatus.PENDING,
+        models.Notification.user_id.in_(user_ids)
+    ).all()
+    return {row[0] for row in rows}
+
+def create_organization_invites(
+    db: Session,
+    organization_id: int,
+    invites: List[Tuple[int, str]],
+    title: str = "Organization Invitation"
+) -> List[models.Notification]:
+    """
+    Create pending invites for (user_id, role) pairs, each with its own invite token,
+    in one batched insert, and raise the invitees' unread counters in one upsert.
+    User ids must be distinct. Does not commit.
+    """
+    now = datetime.utcnow()
+    notifications = [
+        models.Notification(
+            user_id=user_id,
+            type=models.NotificationType.ORGANIZATION_INVITE,
+            status=models.NotificationStatus.PENDING,
+            title=title,
+            message=f"You have been invited to join an organization as {role}",
+            organization_id=organization_id,
+            extra_data={"role": role},
+            invite_token=secrets.token_urlsafe(32),
+            created_at=now
+        )
+        for user_id, role in invites
+    ]
+    if not notifications:
+        return notifications
+    db.add_all(notifications)
+    db.flush()
+    upsert(
+        db,
+        NotificationCounter,
+        values=[{"user_id": user_id, "unread": 1, "updated_at": now} for user_id, _ in invites],
+        index_elements=["user_id"],
+        set_={"unread": NotificationCounter.unread + 1, "updated_at": now},
+    )
+    return notifications
+
+def push_unread_counts(db: Session, user_ids: Iterable[int]) -> None:
+    """
+    Push the current unread counters of many users, read with one query.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+    counts = dict(db.query(NotificationCounter.user_id, NotificationCounter.unread)
+                  .filter(NotificationCounter.user_id.in_(user_ids)).all())
+    for user_id in user_ids:
+        push_unread_count(user_id, max(counts.get(user_id) or 0, 0))
+
+def forget_pending_notifications(db: Session, *conditions) -> List[int]:
+    """
+    Lower the unread counters for pending notifications matching any of ``conditions``
+    before they are cascade-deleted with their queue, service or organization: one
+    grouped count and one upsert. Returns the affected user ids, whose counts should
+    be pushed (push_unread_counts) after the commit. Does not commit.
+    """
+    counts = db.query(models.Notification.user_id, func.count(models.Notification.id)).filter(
+        models.Notification.status == models.NotificationStatus.PENDING,
+        or_(*conditions)
+    ).group_by(models.Notification.user_id).all()
+    if not counts:
+        return []
+    now = datetime.utcnow()
+    upsert(
+        db,
+        NotificationCounter,
+        values=[{"user_id": user_id, "unread": 0, "updated_at": now} for user_id, _ in counts],
+        index_elements=["user_id"],
+        set_={"unread": NotificationCounter.unread - case(dict(counts), value=NotificationCounter.user_id, else_=0),
+              "updated_at": now},
+    )
+    return [user_id for user_id, _ in counts]
+
+def notify_queue_waiters(
+    db: Session,
+    queue_id: int,
+    title: str,
+    message: str,
+    extra_data: Optional[Dict[str, Any]] = None,
+    digest_seconds: Optional[int] = None
+) -> int:
+    """
+    Send a QUEUE_UPDATE notification to every user waiting in a queue. The rows are
+    created by one INSERT ... SELECT over queue_items and the unread counters are
+    raised by one upsert; the users are then pushed in batches.
+
+    With a digest window (``digest_seconds``, NOTIFICATION_DIGEST_SECONDS by default)
+    a user's still-unread update for this queue from within the window is extended
+    with the new message instead, so bursts collapse into one row per interval.
+    Commits; returns the number of users notified.
+    """
+    notifications = models.Notification.__table__
+    items = models.QueueItem.__table__
+    now = datetime.utcnow()
+    digest_seconds = settings.NOTIFICATION_DIGEST_SECONDS if digest_seconds is None else digest_seconds
+    waiting = (
+        items.c.queue_id == queue_id,
+        items.c.status == models.QueueItemStatus.WAITING,
+        items.c.user_id.isnot(None)
+    )
+
+    merged = []
+    digest_filter = []
+    if digest_seconds > 0:
+        recent = (
+            notifications.c.type == models.NotificationType.QUEUE_UPDATE,
+            notifications.c.queue_id == queue_id,
+            notifications.c.status == models.NotificationStatus.PENDING,
+            notifications.c.created_at >= now - timedelta(seconds=digest_seconds)
+        )
+        merged = db.execute(
+            update(notifications)
+            .where(*recent, notifications.c.user_id.in_(select(items.c.user_id).where(*waiting)))
+            .values(title=title, message=notifications.c.message + "\n" + message)
+            .returning(notifications.c.id, notifications.c.user_id)
+        ).all()
+        digest_filter = [~exists().where(*recent, notifications.c.user_id == items.c.user_id)]
+
+    waiters = select(
+        items.c.user_id,
+        literal(models.NotificationType.QUEUE_UPDATE, notifications.c.type.type),
+        literal(models.NotificationStatus.PENDING, notifications.c.status.type),
+        literal(title, notifications.c.title.type),
+        literal(message, notifications.c.message.type),
+        literal(queue_id, notifications.c.queue_id.type),
+        literal(extra_data, notifications.c.extra_data.type),
+        literal(now, notifications.c.created_at.type),
+    ).where(*waiting, *digest_filter).distinct()
+    created = db.execute(
+        insert(notifications).from_select(
+            ["user_id", "type", "status", "title", "message", "queue_id", "extra_data", "created_at"],
+            waiters
+        ).returning(notifications.c.id, notifications.c.user_id)
+    ).all()
+    if not created and not merged:
+        db.commit()
+        return 0
+
+    unread = {}
+    if created:
+        unread.update(upsert(
+            db,
+            NotificationCounter,
+            values=[{"user_id": user_id, "unread": 1, "updated_at": now} for _, user_id in created],
+            index_elements=["user_id"],
+            set_={"unread": NotificationCounter.unread + 1, "updated_at": now},
+            returning=[NotificationCounter.user_id, NotificationCounter.unread],
+        ))
+    if merged:
+        unread.update(db.query(NotificationCounter.user_id, NotificationCounter.unread)
+                      .filter(NotificationCounter.user_id.in_([user_id for _, user_id in merged])).all())
+    db.commit()
+
+    push_queue_update(queue_id, title, message, [
+        {"user_id": user_id, "notification_id": notification_id, "unread_count": unread.get(user_id, 0)}
+        for notification_id, user_id in [*created, *merged]
+    ])
+    return len(created) + len(merged)
+
+def get_notification_by_invite_token(
+    db: Session,
+    token: str,
+    status: Optional[models.NotificationStatus] = models.NotificationStatus.PENDING
+) -> Optional[models.Notification]:
+    """
+    Get the organization invite carrying ``token``, by default only while it is pending.
+    """
+    query = db.query(models.Notification).filter(
+        models.Notification.invite_token == token,
+        models.Notification.type == models.NotificationType.ORGANIZATION_INVITE
+    )
+    if status:
+        query = query.filter(models.Notification.status == status)
+    return query.first()
+
+def get_organization_invites(
+    db: Session,
+    organization_id: int,
+    status: Optional[models.NotificationStatus] = models.NotificationStatus.PENDING,
+    role: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100
+) -> List[models.Notification]:
+    """
+    Invitations sent for an organization, optionally only those for ``role``.
+    """
+    query = db.query(models.Notification).filter(
+        models.Notification.organization_id == organization_id,
+        models.Notification.type == models.NotificationType.ORGANIZATION_INVITE
+    )
+    if status:
+        query = query.filter(models.Notification.status == status)
+    if role:
+        query = query.filter(extra_data_key(db, "role") == role)
+    return query.order_by(models.Notification.created_at.desc()).offset(skip).limit(limit).all()
+
 def get_user_notifications(
     db: Session,
     user_id: int,
@@ -57,53 +329,126 @@ def update_notification(
     """
     Update a notification's status.
     """
-    db_notification = get_notification(db, notification_id)
+    db_notification = _get_for_update(db, notification_id)
     if not db_notification:
         return None
     
+    old_status = db_notification.status
     for key, value in notification_update.dict(exclude_unset=True).items():
         setattr(db_notification, key, value)
+    delta = _unread_delta(old_status, db_notification.status)
+    if delta:
+        _adjust_unread(db, db_notification.user_id, delta)
     
     db.commit()
     db.refresh(db_notification)
+    if delta:
+        _push(db, db_notification.user_id)
     return db_notification
 
 def mark_as_read(db: Session, notification_id: int) -> Optional[models.Notification]:
     """
     Mark a notification as read.
     """
-    db_notification = get_notification(db, notification_id)
+    db_notification = _get_for_update(db, notification_id)
     if not db_notification:
         return None
     
+    delta = _unread_delta(db_notification.status, models.NotificationStatus.READ)
     db_notification.status = models.NotificationStatus.READ
     db_notification.read_at = datetime.utcnow()
+    if delta:
+        _adjust_unread(db, db_notification.user_id, delta)
     db.commit()
     db.refresh(db_notification)
+    if delta:
+        _push(db, db_notification.user_id)
     return db_notification
 
 def delete_notification(db: Session, notification_id: int) -> bool:
     """
     Delete a notification.
     """
-    db_notification = get_notification(db, notification_id)
+    db_notification = _get_for_update(db, notification_id)
     if not db_notification:
         return False
     
+    user_id = db_notification.user_id
+    delta = _unread_delta(db_notification.status, None)
     db.delete(db_notification)
+    if delta:
+        _adjust_unread(db, user_id, delta)
     db.commit()
+    if delta:
+        _push(db, user_id)
     return True
 
+def mark_all_as_read(db: Session, user_id: int) -> int:
+    """
+    Mark every pending notification of a user as read with one UPDATE. Invitations
+    are left pending so they can still be accepted or rejected. Commits; returns
+    the number of notifications marked.
+    """
+    marked = db.query(models.Notification).filter(
+        models.Notification.user_id == user_id,
+        models.Notification.status == models.NotificationStatus.PENDING,
+        models.Notification.type.notin_(_INVITE_TYPES)
+    ).update(
+        {models.Notification.status: models.NotificationStatus.READ,
+         models.Notification.read_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+    if marked:
+        _adjust_unread(db, user_id, -marked)
+    db.commit()
+    if marked:
+        _push(db, user_id)
+    return marked
+
+def purge_notifications(db: Session, older_than_days: Optional[int] = None, batch_size: int = 10000) -> int:
+    """
+    Delete READ, ACCEPTED and REJECTED notifications created more than
+    ``older_than_days`` ago (NOTIFICATION_RETENTION_DAYS by default), in batches
+    so no single transaction grows unbounded. Pending rows are kept, so unread
+    counters are unaffected. Returns the rows deleted.
+    """
+    older_than_days = settings.NOTIFICATION_RETENTION_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    notification = models.Notification
+    deleted = 0
+    while True:
+        ids = db.query(notification.id).filter(
+            notification.status.in_(_SETTLED_STATUSES),
+            notification.created_at < cutoff
+        ).limit(batch_size).subquery()
+        count = db.query(notification).filter(notification.id.in_(db.query(ids.c.id)))\
+            .delete(synchronize_session=False)
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
 def get_unread_count(db: Session, user_id: int) -> int:
     """
-    Get the count of unread notifications for a user.
+    Get the count of unread notifications for a user, read from the maintained counter.
     """
-    return db.query(models.Notification).filter(
-        and_(
-            models.Notification.user_id == user_id,
-            models.Notification.status == models.NotificationStatus.PENDING
-        )
-    ).count()
+    unread = db.query(NotificationCounter.unread).filter(NotificationCounter.user_id == user_id).scalar()
+    return max(unread or 0, 0)
+
+def rebuild_notification_counters(db: Session) -> None:
+    """
+    Recompute every unread counter from the notifications table to reconcile drift. Commits.
+    """
+    db.query(NotificationCounter).delete(synchronize_session=False)
+    counts = db.query(models.Notification.user_id, func.count(models.Notification.id))\
+        .filter(models.Notification.status == models.NotificationStatus.PENDING)\
+        .group_by(models.Notification.user_id)\
+        .all()
+    now = datetime.utcnow()
+    db.bulk_insert_mappings(NotificationCounter, [
+        {"user_id": user_id, "unread": count, "updated_at": now} for user_id, count in counts
+    ])
+    db.commit()
 
 def get_notifications_by_type(
     db: Session,
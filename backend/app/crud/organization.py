@@ -3,9 +3,15 @@
 # backend/app/crud/organization.py
 
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from sqlalchemy import func, case
+from typing import Dict, List, Optional
+from datetime import datetime, timedelta
 from .. import models, schemas
 from .membership import create_membership
+from .leaderboard import forget_organization
+from .notification import forget_pending_notifications, push_unread_counts
+from .queue_history_rollup import empty_histogram, histogram_quantile
+from ..models.queue_history_rollup import QueueHistoryRollup, RollupGranularity
 from ..models.user import UserRole
 
 # Rest of the code remains the same
@@ -45,6 +51,119 @@ def delete_organization(db: Session, organization_id: int) -> bool:
     org = get_organization(db, organization_id)
     if not org:
         return False
+    forget_organization(db, organization_id)
+    # Notifications of the organization, its services and its queues are cascade-deleted.
+    service_ids = db.query(models.Service.id).filter(models.Service.organization_id == organization_id)
+    queue_ids = db.query(models.Queue.id).filter(
+        (models.Queue.organization_id == organization_id) | models.Queue.service_id.in_(service_ids)
+    )
+    notified = forget_pending_notifications(
+        db,
+        models.Notification.organization_id == organization_id,
+        models.Notification.service_id.in_(service_ids),
+        models.Notification.queue_id.in_(queue_ids)
+    )
     db.delete(org)
     db.commit()
+    push_unread_counts(db, notified)
     return True
+
+def get_organization_live(db: Session, organization_id: int, eta_window_hours: int = 24) -> Dict:
+    """
+    Live state of every service and queue of an organization: waiting and in-service
+    counts, the token now being served, throughput over the last hour and P50/P90
+    waits over the last ``eta_window_hours`` hours. Item counts come from one grouped
+    query over queue_items; throughput and waits come from the history rollups.
+    """
+    now = datetime.utcnow()
+    waiting = models.QueueItem.status == models.QueueItemStatus.WAITING
+    serving = models.QueueItem.status == models.QueueItemStatus.BEING_SERVE
+    queues = db.query(
+        models.Queue.id,
+        models.Queue.name,
+        models.Queue.service_id,
+        models.Queue.status,
+        func.count(case((waiting, models.QueueItem.id))),
+        func.count(case((serving, models.QueueItem.id))),
+        func.max(case((serving, models.QueueItem.token_number))),
+        func.min(case((waiting, models.QueueItem.token_number)))
+    ).outerjoin(models.QueueItem, models.QueueItem.queue_id == models.Queue.id)\
+        .filter(models.Queue.organization_id == organization_id)\
+        .group_by(models.Queue.id, models.Queue.name, models.Queue.service_id, models.Queue.status)\
+        .order_by(models.Queue.id)\
+        .all()
+    queue_ids = [row[0] for row in queues]
+
+    throughput: Dict[int, int] = {}
+    histograms: Dict[int, List[int]] = {}
+    if queue_ids:
+        throughput = dict(db.query(QueueHistoryRollup.queue_id, func.sum(QueueHistoryRollup.count))
+                          .filter(
+                              QueueHistoryRollup.queue_id.in_(queue_ids),
+                              QueueHistoryRollup.granularity == RollupGranularity.MINUTE,
+                              QueueHistoryRollup.bucket_start >= now - timedelta(hours=1)
+                          )
+                          .group_by(QueueHistoryRollup.queue_id)
+                          .all())
+        hours = db.query(QueueHistoryRollup.queue_id, QueueHistoryRollup.histogram).filter(
+            QueueHistoryRollup.queue_id.in_(queue_ids),
+            QueueHistoryRollup.granularity == RollupGranularity.HOUR,
+            QueueHistoryRollup.bucket_start >= now - timedelta(hours=eta_window_hours)
+        ).all()
+        for queue_id, histogram in hours:
+            merged = histograms.setdefault(queue_id, empty_histogram())
+            for index, count in enumerate(histogram or []):
+                merged[index] += count
+
+    services = {
+        service_id: {
+            'id': service_id,
+            'name': name,
+            'waiting': 0,
+            'being_served': 0,
+            'served_last_hour': 0,
+            'histogram': empty_histogram(),
+        }
+        for service_id, name in db.query(models.Service.id, models.Service.name)
+        .filter(models.Service.organization_id == organization_id)
+        .order_by(models.Service.id)
+        .all()
+    }
+
+    queue_rows = []
+    for queue_id, name, service_id, status, waiting_count, serving_count, now_serving, next_token in queues:
+        served = int(throughput.get(queue_id) or 0)
+        histogram = histograms.get(queue_id, empty_histogram())
+        queue_rows.append({
+            'id': queue_id,
+            'name': name,
+            'service_id': service_id,
+            'status': status,
+            'waiting': waiting_count,
+            'being_served': serving_count,
+            'now_serving': now_serving,
+            'next_token': next_token,
+            'served_last_hour': served,
+            'p50_wait_time': histogram_quantile(histogram, 0.5),
+            'p90_wait_time': histogram_quantile(histogram, 0.9),
+        })
+        service = services.get(service_id)
+        if service:
+            service['waiting'] += waiting_count
+            service['being_served'] += serving_count
+            service['served_last_hour'] += served
+            service['histogram'] = [a + b for a, b in zip(service['histogram'], histogram)]
+
+    service_rows = []
+    for service in services.values():
+        histogram = service.pop('histogram')
+        service['p50_wait_time'] = histogram_quantile(histogram, 0.5)
+        service['p90_wait_time'] = histogram_quantile(histogram, 0.9)
+        service_rows.append(service)
+
+    return {
+        'organization_id': organization_id,
+        'generated_at': now,
+        'services': service_rows,
+        'queues': queue_rows,
+    }
@@ -4,6 +4,8 @@ from sqlalchemy.orm import Session
 from .. import models, schemas
 from ..utils.token import generate_access_token, generate_qr_code_url, validate_access_token
 from fastapi import HTTPException
+from .leaderboard import forget_queue, record_queue_moved
+from .notification import forget_pending_notifications, push_unread_counts
 
 def create_queue(db: Session, queue: schemas.QueueCreate, user_id: int, service_id: Optional[int] = None,
                 organization_id: Optional[int] = None):
@@ -68,8 +70,11 @@ def update_queue(db: Session, queue_id: int, updates: schemas.QueueUpdate):
         updates.access_token = None
         updates.qr_code_url = None
 
+    old_organization_id = db_queue.organization_id
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(db_queue, field, value)
+    if db_queue.organization_id != old_organization_id:
+        record_queue_moved(db, queue_id, old_organization_id, db_queue.organization_id)
 
     db.commit()
     db.refresh(db_queue)
@@ -79,8 +84,11 @@ def delete_queue(db: Session, queue_id: int):
     db_queue = get_queue(db, queue_id)
     if not db_queue:
         return False
+    forget_queue(db, queue_id, db_queue.organization_id)
+    notified = forget_pending_notifications(db, models.Notification.queue_id == queue_id)
     db.delete(db_queue)
     db.commit()
+    push_unread_counts(db, notified)
     return True
 
 def validate_queue_access(db: Session, queue_id: int, token: Optional[str] = None) -> bool:
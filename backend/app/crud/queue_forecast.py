@@ -0,0 +1,125 @@
+# backend/app/crud/queue_forecast.py
+
+from sqlalchemy.orm import Session
+from sqlalchemy import select
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+from .. import models
+from ..models.queue_forecast import QueueForecast, HOURS_PER_WEEK
+from ..utils import forecast as profile
+
+REFRESH_LAG_SECONDS = 300
+
+def get_queue_forecast(db: Session, queue_id: int) -> Optional[QueueForecast]:
+    return db.query(QueueForecast).filter(QueueForecast.queue_id == queue_id).first()
+
+def _history_batches(db: Session, queue_id: int, start: Optional[datetime], end: datetime, batch_size: int):
+    """
+    Yield (joined_at, removed_at) datetime64 arrays for rows ingested in [start, end).
+    Without ``start`` that is the whole history: the archive first, then queue_history.
+    """
+    # Imported here: the archive module builds on the crud package.
+    from ..utils.archive import archive_horizon, scan_archive
+
+    horizon = archive_horizon()
+    if start is None and horizon is not None:
+        for table in scan_archive([queue_id], end=horizon, columns=["joined_at", "removed_at"]):
+            yield (table["joined_at"].to_numpy().astype("datetime64[us]"),
+                   table["removed_at"].to_numpy().astype("datetime64[us]"))
+
+    history = models.QueueHistory.__table__
+    query = select(history.c.joined_at, history.c.removed_at)\
+        .where(history.c.queue_id == queue_id, history.c.ingested_at < end)
+    if start is not None:
+        query = query.where(history.c.ingested_at >= start)
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    for rows in result.partitions():
+        yield (profile.to_datetime64(row[0] for row in rows),
+               profile.to_datetime64(row[1] for row in rows))
+
+def refresh_queue_forecast(db: Session, queue_id: int, full: bool = False,
+                           batch_size: int = 50000) -> QueueForecast:
+    """
+    Fold history written since the last refresh into the queue's hour-of-week profiles.
+    The watermark is ingested_at, so rows inserted late with an old removed_at are
+    counted too. With ``full`` the profiles are recomputed from the whole history,
+    archive included. Commits.
+    """
+    # Stay a little behind the clock so rows still being committed are not skipped;
+    # ingested_at is set when the row is written, before its transaction commits.
+    through = datetime.utcnow() - timedelta(seconds=REFRESH_LAG_SECONDS)
+    forecast = get_queue_forecast(db, queue_id)
+    if forecast is None:
+        forecast = QueueForecast(queue_id=queue_id)
+        db.add(forecast)
+        full = True
+
+    if full:
+        arrivals = profile.unpack(None)
+        departures = profile.unpack(None)
+        first_event_at = None
+        start = None
+    else:
+        arrivals = profile.unpack(forecast.arrivals)
+        departures = profile.unpack(forecast.departures)
+        first_event_at = forecast.first_event_at
+        start = forecast.computed_through
+
+    for joined, removed in _history_batches(db, queue_id, start, through, batch_size):
+        if not joined.size:
+            continue
+        arrivals += profile.count_by_hour_of_week(joined)
+        departures += profile.count_by_hour_of_week(removed)
+        earliest = joined.min().astype(datetime)
+        first_event_at = earliest if first_event_at is None else min(first_event_at, earliest)
+
+    forecast.arrivals = profile.pack(arrivals)
+    forecast.departures = profile.pack(departures)
+    forecast.first_event_at = first_event_at
+    forecast.computed_through = through
+    db.commit()
+    db.refresh(forecast)
+    return forecast
+
+def refresh_queue_forecasts(db: Session, queue_id: Optional[int] = None, full: bool = False) -> int:
+    """
+    Refresh the forecasts of one queue or of every queue. Returns the number refreshed.
+    """
+    if queue_id is not None:
+        queue_ids = [queue_id]
+    else:
+        queue_ids = [row[0] for row in db.query(models.Queue.id).order_by(models.Queue.id).all()]
+    for current in queue_ids:
+        refresh_queue_forecast(db, current, full=full)
+    return len(queue_ids)
+
+def summarize_forecast(forecast: QueueForecast, hours: int = 24, now: Optional[datetime] = None) -> Dict:
+    """
+    Turn the stored counts into average hourly rates: a 7x24 weekly grid (Monday first,
+    UTC) and the expected load of the next ``hours`` hours.
+    """
+    now = now or datetime.utcnow()
+    arrival_rates = profile.rates(profile.unpack(forecast.arrivals), forecast.first_event_at, forecast.computed_through)
+    departure_rates = profile.rates(profile.unpack(forecast.departures), forecast.first_event_at, forecast.computed_through)
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    upcoming_arrivals = profile.upcoming(arrival_rates, hour_start, hours)
+    upcoming_departures = profile.upcoming(departure_rates, hour_start, hours)
+    observed_hours = 0
+    if forecast.first_event_at and forecast.computed_through:
+        observed_hours = (forecast.computed_through - forecast.first_event_at).total_seconds() / 3600
+
+    return {
+        'queue_id': forecast.queue_id,
+        'computed_through': forecast.computed_through,
+        'weeks_observed': round(observed_hours / HOURS_PER_WEEK, 2),
+        'arrivals_per_hour': profile.as_week_matrix(arrival_rates),
+        'departures_per_hour': profile.as_week_matrix(departure_rates),
+        'upcoming': [
+            {
+                'hour_start': hour_start + timedelta(hours=offset),
+                'expected_arrivals': upcoming_arrivals[offset],
+                'expected_departures': upcoming_departures[offset],
+            }
+            for offset in range(hours)
+        ],
+    }
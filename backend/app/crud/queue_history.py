@@ -1,19 +1,27 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from sqlalchemy import select
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
 from .. import models, schemas
+from .queue_history_rollup import record_history_rollups, aggregate_history, summarize
 
 def create_queue_history(db: Session, queue_history: schemas.QueueHistoryCreate) -> models.QueueHistory:
     db_history = models.QueueHistory(**queue_history.model_dump())
     db.add(db_history)
+    record_history_rollups(db, db_history.queue_id, db_history.removed_at, db_history.waiting_time)
     db.commit()
     db.refresh(db_history)
     return db_history
 
-def get_queue_history(db: Session, queue_id: int, skip: int = 0, limit: int = 100) -> List[models.QueueHistory]:
-    return db.query(models.QueueHistory)\
-        .filter(models.QueueHistory.queue_id == queue_id)\
+def get_queue_history(db: Session, queue_id: int, skip: int = 0, limit: int = 100,
+                      since: Optional[datetime] = None) -> List[models.QueueHistory]:
+    query = db.query(models.QueueHistory)\
+        .filter(models.QueueHistory.queue_id == queue_id)
+    if since is not None:
+        # Bounds removed_at so partitioned tables only scan the matching months.
+        query = query.filter(models.QueueHistory.removed_at >= since)
+    return query\
+        .order_by(models.QueueHistory.removed_at.desc())\
         .offset(skip)\
         .limit(limit)\
         .all()
@@ -24,35 +32,68 @@ def get_average_wait_time(db: Session, queue_id: int, lookback_hours: int = 24)
     within the last specified hours.
     """
     lookback_time = datetime.utcnow() - timedelta(hours=lookback_hours)
-    
-    result = db.query(func.avg(models.QueueHistory.waiting_time))\
-        .filter(
-            models.QueueHistory.queue_id == queue_id,
-            models.QueueHistory.removed_at >= lookback_time
-        )\
-        .scalar()
-    
-    return float(result) if result is not None else None
+    return summarize(aggregate_history(db, queue_id, lookback_time))['average_wait_time']
 
 def get_queue_history_stats(db: Session, queue_id: int, lookback_hours: int = 24):
     """
     Get comprehensive statistics about queue waiting times.
+    Served from the minute/hour/day rollups, so the cost does not grow with lookback_hours.
     """
     lookback_time = datetime.utcnow() - timedelta(hours=lookback_hours)
-    
-    stats = db.query(
-        func.avg(models.QueueHistory.waiting_time).label('avg_wait'),
-        func.min(models.QueueHistory.waiting_time).label('min_wait'),
-        func.max(models.QueueHistory.waiting_time).label('max_wait'),
-        func.count(models.QueueHistory.id).label('total_served')
-    ).filter(
-        models.QueueHistory.queue_id == queue_id,
-        models.QueueHistory.removed_at >= lookback_time
-    ).first()
-    
-    return {
-        'average_wait_time': float(stats.avg_wait) if stats.avg_wait is not None else None,
-        'min_wait_time': float(stats.min_wait) if stats.min_wait is not None else None,
-        'max_wait_time': float(stats.max_wait) if stats.max_wait is not None else None,
-        'total_served': stats.total_served
-    } 
\ No newline at end of file
+    return summarize(aggregate_history(db, queue_id, lookback_time))
+
+EXPORT_COLUMNS = ["id", "queue_id", "user_id", "joined_at", "removed_at", "waiting_time"]
+
+def iter_queue_history(
+    db: Session,
+    queue_id: Optional[int] = None,
+    service_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    batch_size: int = 5000
+) -> Iterator[Tuple]:
+    """
+    Stream queue_history rows for a queue, service or organization as plain tuples
+    ordered like EXPORT_COLUMNS. Uses a server-side cursor, so memory stays bounded
+    by ``batch_size`` regardless of how many rows match. When the range reaches past
+    the archive horizon, the archived rows of the scope's queues come first, sorted
+    by removed_at within each month (see utils.archive.iter_archived_rows).
+    """
+    # Imported here: the archive module builds on this one.
+    from ..utils.archive import archive_horizon, iter_archived_rows
+
+    history = models.QueueHistory.__table__
+    queues = models.Queue.__table__
+    horizon = archive_horizon()
+    if horizon is not None and (start is None or start < horizon):
+        if queue_id is not None:
+            queue_ids = [queue_id]
+        else:
+            scope = queues.c.service_id == service_id if service_id is not None \
+                else queues.c.organization_id == organization_id
+            queue_ids = list(db.execute(select(queues.c.id).where(scope)).scalars())
+        archive_end = min(end, horizon) if end is not None else horizon
+        yield from iter_archived_rows(queue_ids, start=start, end=archive_end)
+
+    query = select(*[history.c[name] for name in EXPORT_COLUMNS])
+    if service_id is not None or organization_id is not None:
+        query = query.join(queues, queues.c.id == history.c.queue_id)
+        if service_id is not None:
+            query = query.where(queues.c.service_id == service_id)
+        if organization_id is not None:
+            query = query.where(queues.c.organization_id == organization_id)
+    if queue_id is not None:
+        query = query.where(history.c.queue_id == queue_id)
+    if start is not None:
+        query = query.where(history.c.removed_at >= start)
+    if end is not None:
+        query = query.where(history.c.removed_at < end)
+    query = query.order_by(history.c.removed_at, history.c.id)
+
+    result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+    try:
+        for row in result:
+            yield tuple(row)
+    finally:
+        result.close()
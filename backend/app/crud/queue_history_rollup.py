@@ -0,0 +1,432 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import JSON, and_, cast, func, or_
+from sqlalchemy.dialects.postgresql import JSONB, array
+from typing import Dict, Iterable, List, Optional, Tuple
+from bisect import bisect_right
+from datetime import datetime, timedelta
+import math
+from .. import models
+from ..models.queue_history_rollup import QueueHistoryRollup, RollupGranularity, HISTOGRAM_EDGES, HOUR_OF_WEEK_EPOCH
+from ..core.config import settings
+from ..utils.db import upsert
+
+_STEPS = {
+    RollupGranularity.DAY: timedelta(days=1),
+    RollupGranularity.HOUR: timedelta(hours=1),
+    RollupGranularity.MINUTE: timedelta(minutes=1),
+}
+# Coarsest first; stitching always tries the largest bucket that fits.
+_GRANULARITIES = [RollupGranularity.DAY, RollupGranularity.HOUR, RollupGranularity.MINUTE]
+# Everything record_history_rollups maintains per history row.
+_MAINTAINED = _GRANULARITIES + [RollupGranularity.HOUR_OF_WEEK]
+
+def hour_of_week_bucket(moment: datetime) -> datetime:
+    return HOUR_OF_WEEK_EPOCH + timedelta(days=moment.weekday(), hours=moment.hour)
+
+def truncate(moment: datetime, granularity: str) -> datetime:
+    if granularity == RollupGranularity.HOUR_OF_WEEK:
+        return hour_of_week_bucket(moment)
+    if granularity == RollupGranularity.DAY:
+        return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if granularity == RollupGranularity.HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(second=0, microsecond=0)
+
+def histogram_bin(waiting_time: float) -> int:
+    return bisect_right(HISTOGRAM_EDGES, waiting_time)
+
+def empty_histogram() -> List[int]:
+    return [0] * (len(HISTOGRAM_EDGES) + 1)
+
+def histogram_quantile(histogram: List[int], q: float) -> Optional[float]:
+    """
+    Estimate the q-quantile from histogram counts by linear interpolation inside the
+    matching bin. The open-ended last bin reports its lower edge.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            lower = HISTOGRAM_EDGES[index - 1] if index > 0 else 0.0
+            if index >= len(HISTOGRAM_EDGES):
+                return float(lower)
+            upper = HISTOGRAM_EDGES[index]
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+    return float(HISTOGRAM_EDGES[-1])
+
+def _histogram_increment(db: Session, bin_index: int):
+    # The existing row's histogram with one bin incremented, computed in SQL.
+    column = QueueHistoryRollup.histogram
+    bumped = column[bin_index].as_integer() + 1
+    if db.get_bind().dialect.name == "postgresql":
+        return cast(func.jsonb_set(cast(column, JSONB), array([str(bin_index)]), func.to_jsonb(bumped)), JSON)
+    return func.json_set(column, f"$[{bin_index}]", bumped)
+
+def record_history_rollups(db: Session, queue_id: int, removed_at: datetime, waiting_time: float) -> None:
+    """
+    Fold one queue_history row into its minute, hour, day and hour-of-week buckets
+    with a single upsert. The increments are computed from the existing row inside
+    the statement, so concurrent writers don't lose them. Does not commit.
+    """
+    bin_index = histogram_bin(waiting_time)
+    histogram = empty_histogram()
+    histogram[bin_index] = 1
+    if db.get_bind().dialect.name == "postgresql":
+        least, greatest = func.least, func.greatest
+    else:
+        least, greatest = func.min, func.max
+    upsert(
+        db,
+        QueueHistoryRollup,
+        values=[
+            {
+                "queue_id": queue_id,
+                "granularity": granularity,
+                "bucket_start": truncate(removed_at, granularity),
+                "count": 1,
+                "total": waiting_time,
+                "sum_sq": waiting_time * waiting_time,
+                "min_wait": waiting_time,
+                "max_wait": waiting_time,
+                "histogram": histogram,
+            }
+            for granularity in _MAINTAINED
+        ],
+        index_elements=["queue_id", "granularity", "bucket_start"],
+        set_={
+            "count": QueueHistoryRollup.count + 1,
+            "total": QueueHistoryRollup.total + waiting_time,
+            "sum_sq": QueueHistoryRollup.sum_sq + waiting_time * waiting_time,
+            "min_wait": least(func.coalesce(QueueHistoryRollup.min_wait, waiting_time), waiting_time),
+            "max_wait": greatest(func.coalesce(QueueHistoryRollup.max_wait, waiting_time), waiting_time),
+            "histogram": _histogram_increment(db, bin_index),
+        },
+    )
+
+def prune_minute_rollups(db: Session, keep_days: Optional[int] = None) -> int:
+    """
+    Delete minute buckets older than ``keep_days`` (HISTORY_MINUTE_ROLLUP_DAYS).
+    Stitching reads raw rows for minutes past that horizon, see aggregate_history.
+    Commits; returns the number of buckets deleted.
+    """
+    horizon = minute_rollup_horizon(keep_days)
+    deleted = db.query(QueueHistoryRollup).filter(
+        QueueHistoryRollup.granularity == RollupGranularity.MINUTE,
+        QueueHistoryRollup.bucket_start < horizon
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
+
+def minute_rollup_horizon(keep_days: Optional[int] = None) -> datetime:
+    if keep_days is None:
+        keep_days = settings.HISTORY_MINUTE_ROLLUP_DAYS
+    return truncate(datetime.utcnow() - timedelta(days=keep_days), RollupGranularity.MINUTE)
+
+Span = Tuple[datetime, datetime]
+
+def plan_buckets(start: datetime, end: datetime) -> Tuple[Optional[Span], List[Tuple[str, datetime, datetime]], Optional[Span]]:
+    """
+    Split [start, end] into a raw head, aligned rollup buckets and a raw tail.
+    Returns the head [start, first_bucket), the (granularity, first_bucket,
+    last_bucket_exclusive) runs and the tail [last_bucket_exclusive, end]; head and
+    tail are None when empty. Without a whole minute in the range, it is all tail.
+    """
+    aligned_start = truncate(start, RollupGranularity.MINUTE)
+    if aligned_start < start:
+        aligned_start += _STEPS[RollupGranularity.MINUTE]
+    aligned_end = truncate(end, RollupGranularity.MINUTE)
+
+    if aligned_start >= aligned_end:
+        return None, [], (start, end)
+
+    head = (start, aligned_start) if start < aligned_start else None
+    runs: List[Tuple[str, datetime, datetime]] = []
+    cursor = aligned_start
+    while cursor < aligned_end:
+        for granularity in _GRANULARITIES:
+            step = _STEPS[granularity]
+            if truncate(cursor, granularity) == cursor and cursor + step <= aligned_end:
+                break
+        if runs and runs[-1][0] == granularity and runs[-1][2] == cursor:
+            runs[-1] = (granularity, runs[-1][1], cursor + step)
+        else:
+            runs.append((granularity, cursor, cursor + step))
+        cursor += step
+    return head, runs, (aligned_end, end)
+
+def _merge(accumulator: Dict, count: int, total: float, sum_sq: float,
+           min_wait: Optional[float], max_wait: Optional[float], histogram: Iterable[int]) -> None:
+    if not count:
+        return
+    accumulator["count"] += count
+    accumulator["total"] += total
+    accumulator["sum_sq"] += sum_sq
+    if min_wait is not None:
+        accumulator["min"] = min_wait if accumulator["min"] is None else min(accumulator["min"], min_wait)
+    if max_wait is not None:
+        accumulator["max"] = max_wait if accumulator["max"] is None else max(accumulator["max"], max_wait)
+    accumulator["histogram"] = [a + b for a, b in zip(accumulator["histogram"], histogram)]
+
+def _raw_span(db: Session, queue_id: int, start: datetime, end: datetime, include_end: bool) -> Dict:
+    # Imported here: the archive module builds on this one.
+    from ..utils.archive import archive_horizon, aggregate_history_span
+
+    horizon = archive_horizon()
+    if horizon is not None and start < horizon:
+        return aggregate_history_span(db, queue_id, start, end, include_end=include_end)
+
+    upper = models.QueueHistory.removed_at <= end if include_end else models.QueueHistory.removed_at < end
+    rows = db.query(models.QueueHistory.waiting_time).filter(
+        models.QueueHistory.queue_id == queue_id,
+        models.QueueHistory.removed_at >= start,
+        upper
+    ).all()
+    waits = [row[0] for row in rows]
+    histogram = empty_histogram()
+    for wait in waits:
+        histogram[histogram_bin(wait)] += 1
+    return {"count": len(waits), "total": sum(waits), "sum_sq": sum(w * w for w in waits),
+            "min": min(waits, default=None), "max": max(waits, default=None), "histogram": histogram}
+
+def aggregate_history(db: Session, queue_id: int, start: datetime, end: Optional[datetime] = None) -> Dict:
+    """
+    Aggregate waiting times of rows removed in [start, end] by stitching rollup buckets
+    with the raw rows of the partial minutes at either end. Minute buckets past the
+    minute rollup horizon have been pruned, so those minutes are read raw as well;
+    they only occur at the edges of the range. Cost is independent of the lookback
+    length. Rollups outlive archiving, so only the raw spans may need the archive.
+    """
+    end = end or datetime.utcnow()
+    accumulator = {"count": 0, "total": 0.0, "sum_sq": 0.0, "min": None, "max": None,
+                   "histogram": empty_histogram()}
+    head, runs, tail = plan_buckets(start, end)
+
+    raw_spans: List[Tuple[datetime, datetime, bool]] = []
+    if head:
+        raw_spans.append((head[0], head[1], False))
+    minute_horizon = minute_rollup_horizon()
+    bucket_runs = []
+    for granularity, first, last in runs:
+        if granularity == RollupGranularity.MINUTE and first < minute_horizon:
+            raw_spans.append((first, min(last, minute_horizon), False))
+            if last <= minute_horizon:
+                continue
+            first = minute_horizon
+        bucket_runs.append((granularity, first, last))
+    if tail:
+        raw_spans.append((tail[0], tail[1], True))
+
+    for span_start, span_end, include_end in raw_spans:
+        raw = _raw_span(db, queue_id, span_start, span_end, include_end=include_end)
+        _merge(accumulator, raw["count"], raw["total"], raw["sum_sq"],
+               raw["min"], raw["max"], raw["histogram"])
+
+    if bucket_runs:
+        rollups = db.query(QueueHistoryRollup).filter(
+            QueueHistoryRollup.queue_id == queue_id,
+            or_(*[
+                and_(
+                    QueueHistoryRollup.granularity == granularity,
+                    QueueHistoryRollup.bucket_start >= first,
+                    QueueHistoryRollup.bucket_start < last
+                )
+                for granularity, first, last in bucket_runs
+            ])
+        ).all()
+        for rollup in rollups:
+            _merge(accumulator, rollup.count, rollup.total, rollup.sum_sq,
+                   rollup.min_wait, rollup.max_wait, rollup.histogram or empty_histogram())
+    return accumulator
+
+def summarize(accumulator: Dict) -> Dict:
+    count = accumulator["count"]
+    average = accumulator["total"] / count if count else None
+    stddev = None
+    if count:
+        variance = max(accumulator["sum_sq"] / count - average * average, 0.0)
+        stddev = math.sqrt(variance)
+    return {
+        'average_wait_time': average,
+        'min_wait_time': accumulator["min"],
+        'max_wait_time': accumulator["max"],
+        'total_served': count,
+        'stddev_wait_time': stddev,
+        'p50_wait_time': histogram_quantile(accumulator["histogram"], 0.5),
+        'p90_wait_time': histogram_quantile(accumulator["histogram"], 0.9),
+        'histogram': {
+            'edges': HISTOGRAM_EDGES,
+            'counts': accumulator["histogram"],
+        },
+    }
+
+def rebuild_queue_history_rollups(db: Session, queue_id: Optional[int] = None,
+                                  since: Optional[datetime] = None, batch_size: int = 10000) -> int:
+    """
+    Recompute rollups from raw queue_history rows, for one queue or all of them.
+    With ``since`` only buckets from that day on are rebuilt, which keeps the rollups
+    of history that has already been archived. Streams the history ordered by queue
+    so only one queue's buckets are held in memory at a time. Hour-of-week buckets
+    are then derived from the hour buckets.
+    Commits; returns the number of history rows folded in.
+    """
+    delete_query = db.query(QueueHistoryRollup)
+    history_query = db.query(
+        models.QueueHistory.queue_id,
+        models.QueueHistory.removed_at,
+        models.QueueHistory.waiting_time
+    )
+    if queue_id is not None:
+        delete_query = delete_query.filter(QueueHistoryRollup.queue_id == queue_id)
+        history_query = history_query.filter(models.QueueHistory.queue_id == queue_id)
+    if since is not None:
+        since = truncate(since, RollupGranularity.DAY) + _STEPS[RollupGranularity.DAY]
+        delete_query = delete_query.filter(QueueHistoryRollup.bucket_start >= since)
+        history_query = history_query.filter(models.QueueHistory.removed_at >= since)
+    delete_query.filter(QueueHistoryRollup.granularity.in_(_GRANULARITIES)).delete(synchronize_session=False)
+
+    buckets: Dict[Tuple[str, datetime], Dict] = {}
+    current_queue = None
+    folded = 0
+
+    def flush(for_queue):
+        db.bulk_insert_mappings(QueueHistoryRollup, [
+            {
+                "queue_id": for_queue,
+                "granularity": granularity,
+                "bucket_start": bucket_start,
+                "count": acc["count"],
+                "total": acc["total"],
+                "sum_sq": acc["sum_sq"],
+                "min_wait": acc["min"],
+                "max_wait": acc["max"],
+                "histogram": acc["histogram"],
+            }
+            for (granularity, bucket_start), acc in buckets.items()
+        ])
+        buckets.clear()
+
+    rows = history_query.order_by(models.QueueHistory.queue_id)\
+        .execution_options(stream_results=True, yield_per=batch_size)
+    for row_queue_id, removed_at, waiting_time in rows:
+        if row_queue_id != current_queue:
+            if buckets:
+                flush(current_queue)
+            current_queue = row_queue_id
+        bin_index = histogram_bin(waiting_time)
+        for granularity in _GRANULARITIES:
+            key = (granularity, truncate(removed_at, granularity))
+            acc = buckets.get(key)
+            if acc is None:
+                acc = buckets[key] = {"count": 0, "total": 0.0, "sum_sq": 0.0, "min": None, "max": None,
+                                      "histogram": empty_histogram()}
+            acc["count"] += 1
+            acc["total"] += waiting_time
+            acc["sum_sq"] += waiting_time * waiting_time
+            acc["min"] = waiting_time if acc["min"] is None else min(acc["min"], waiting_time)
+            acc["max"] = waiting_time if acc["max"] is None else max(acc["max"], waiting_time)
+            acc["histogram"][bin_index] += 1
+        folded += 1
+    if buckets:
+        flush(current_queue)
+    db.flush()
+    rebuild_hour_of_week_rollups(db, queue_id=queue_id, commit=False)
+    db.commit()
+    return folded
+
+def rebuild_hour_of_week_rollups(db: Session, queue_id: Optional[int] = None,
+                                 batch_size: int = 10000, commit: bool = True) -> int:
+    """
+    Recompute hour-of-week buckets by folding the hour buckets of all time, which
+    cover archived history as well. Returns the number of hour buckets read.
+    """
+    delete_query = db.query(QueueHistoryRollup)\
+        .filter(QueueHistoryRollup.granularity == RollupGranularity.HOUR_OF_WEEK)
+    hour_query = db.query(
+        QueueHistoryRollup.queue_id,
+        QueueHistoryRollup.bucket_start,
+        QueueHistoryRollup.count,
+        QueueHistoryRollup.total,
+        QueueHistoryRollup.sum_sq,
+        QueueHistoryRollup.min_wait,
+        QueueHistoryRollup.max_wait,
+        QueueHistoryRollup.histogram
+    ).filter(QueueHistoryRollup.granularity == RollupGranularity.HOUR)
+    if queue_id is not None:
+        delete_query = delete_query.filter(QueueHistoryRollup.queue_id == queue_id)
+        hour_query = hour_query.filter(QueueHistoryRollup.queue_id == queue_id)
+    delete_query.delete(synchronize_session=False)
+
+    slots: Dict[datetime, Dict] = {}
+    current_queue = None
+    read = 0
+
+    def flush(for_queue):
+        db.bulk_insert_mappings(QueueHistoryRollup, [
+            {
+                "queue_id": for_queue,
+                "granularity": RollupGranularity.HOUR_OF_WEEK,
+                "bucket_start": bucket_start,
+                "count": acc["count"],
+                "total": acc["total"],
+                "sum_sq": acc["sum_sq"],
+                "min_wait": acc["min"],
+                "max_wait": acc["max"],
+                "histogram": acc["histogram"],
+            }
+            for bucket_start, acc in slots.items()
+        ])
+        slots.clear()
+
+    rows = hour_query.order_by(QueueHistoryRollup.queue_id)\
+        .execution_options(stream_results=True, yield_per=batch_size)
+    for row_queue_id, bucket_start, count, total, sum_sq, min_wait, max_wait, histogram in rows:
+        if row_queue_id != current_queue:
+            if slots:
+                flush(current_queue)
+            current_queue = row_queue_id
+        key = hour_of_week_bucket(bucket_start)
+        acc = slots.get(key)
+        if acc is None:
+            acc = slots[key] = {"count": 0, "total": 0.0, "sum_sq": 0.0, "min": None, "max": None,
+                                "histogram": empty_histogram()}
+        _merge(acc, count, total, sum_sq, min_wait, max_wait, histogram or empty_histogram())
+        read += 1
+    if slots:
+        flush(current_queue)
+    if commit:
+        db.commit()
+    return read
+
+def get_wait_heatmap(db: Session, queue_ids: List[int]) -> Dict:
+    """
+    Mean and P90 waiting time per day of week (rows, Monday first) and hour of day
+    (columns, UTC) over all history of the given queues, read from the hour-of-week
+    buckets. Cells without history are None.
+    """
+    cells = [[{"count": 0, "total": 0.0, "sum_sq": 0.0, "min": None, "max": None,
+               "histogram": empty_histogram()} for _ in range(24)] for _ in range(7)]
+    if queue_ids:
+        rollups = db.query(
+            QueueHistoryRollup.bucket_start,
+            QueueHistoryRollup.count,
+            QueueHistoryRollup.total,
+            QueueHistoryRollup.histogram
+        ).filter(
+            QueueHistoryRollup.queue_id.in_(queue_ids),
+            QueueHistoryRollup.granularity == RollupGranularity.HOUR_OF_WEEK
+        ).all()
+        for bucket_start, count, total, histogram in rollups:
+            _merge(cells[bucket_start.weekday()][bucket_start.hour], count, total, 0.0,
+                   None, None, histogram or empty_histogram())
+
+    return {
+        'days': ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'],
+        'count': [[cell["count"] for cell in row] for row in cells],
+        'mean_wait_time': [[cell["total"] / cell["count"] if cell["count"] else None for cell in row]
+                           for row in cells],
+        'p90_wait_time': [[histogram_quantile(cell["histogram"], 0.9) for cell in row] for row in cells],
+    }
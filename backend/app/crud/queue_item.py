@@ -5,6 +5,8 @@ from typing import List, Optional, Tuple
 from datetime import datetime, timedelta
 from sqlalchemy import func, and_
 from .. import models, schemas
+from .leaderboard import record_item_added, record_item_removed
+from .queue_history_rollup import record_history_rollups
 
 def create_queue_item(db: Session, queue_item: schemas.QueueItemCreate) -> models.QueueItem:
     db_queue_item = models.QueueItem(
@@ -18,6 +20,7 @@ def create_queue_item(db: Session, queue_item: schemas.QueueItemCreate) -> model
         join_hash=queue_item.join_hash
     )
     db.add(db_queue_item)
+    record_item_added(db, db_queue_item.queue_id, joined_at=db_queue_item.joined_at)
     db.commit()
     db.refresh(db_queue_item)
     return db_queue_item
@@ -145,5 +148,43 @@ def delete_queue_item(db: Session, queue_item_id: int) -> bool:
     if not queue_item:
         return False
     db.delete(queue_item)
+    record_item_removed(db, queue_item.queue_id)
     db.commit()
     return True
+
+def archive_closed_queue_items(db: Session, older_than_days: int = 30, batch_size: int = 1000) -> int:
+    """
+    Clear out items left behind in CLOSED queues that joined more than ``older_than_days`` ago.
+    Completed items are moved to queue_history like a regular removal; items that were never
+    served are dropped without a history row so they don't skew waiting time statistics.
+    Commits per batch; returns the number of items removed.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    removed = 0
+    while True:
+        rows = db.query(models.QueueItem, models.Queue.organization_id)\
+            .join(models.Queue, models.Queue.id == models.QueueItem.queue_id)\
+            .filter(
+                models.Queue.status == models.QueueStatus.CLOSED,
+                models.QueueItem.joined_at < cutoff
+            )\
+            .limit(batch_size)\
+            .all()
+        if not rows:
+            return removed
+        now = datetime.utcnow()
+        for item, organization_id in rows:
+            if item.status == models.QueueItemStatus.COMPLETED and item.waiting_time is not None:
+                removed_at = item.served_at or now
+                db.add(models.QueueHistory(
+                    queue_id=item.queue_id,
+                    user_id=item.user_id,
+                    joined_at=item.joined_at,
+                    removed_at=removed_at,
+                    waiting_time=item.waiting_time
+                ))
+                record_history_rollups(db, item.queue_id, removed_at, item.waiting_time)
+            db.delete(item)
+            record_item_removed(db, item.queue_id, organization_id=organization_id)
+        db.commit()
+        removed += len(rows)
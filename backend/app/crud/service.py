@@ -3,6 +3,8 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from .. import models, schemas
+from .leaderboard import forget_queue
+from .notification import forget_pending_notifications, push_unread_counts
 
 def create_service(db: Session, service: schemas.ServiceCreate, organization_id: int, user_id: int) -> models.Service:
     db_service = models.Service(
@@ -37,6 +39,17 @@ def delete_service(db: Session, service_id: int) -> bool:
     service = get_service(db, service_id)
     if not service:
         return False
+    # The service's queues and notifications go with it (ORM cascade); drop their counters first.
+    queues = db.query(models.Queue.id, models.Queue.organization_id)\
+        .filter(models.Queue.service_id == service_id).all()
+    for queue_id, organization_id in queues:
+        forget_queue(db, queue_id, organization_id)
+    notified = forget_pending_notifications(
+        db,
+        models.Notification.service_id == service_id,
+        models.Notification.queue_id.in_([queue_id for queue_id, _ in queues])
+    )
     db.delete(service)
     db.commit()
+    push_unread_counts(db, notified)
     return True
@@ -0,0 +1,112 @@
+# backend/app/crud/sync.py
+#
+# Central side of edge sync: applies changes captured on edge nodes (see
+# utils/change_capture.py). Queues are matched by id, since edge nodes are
+# provisioned from the central database; users by email. Changes to queues this
+# server does not know are skipped.
+
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from .. import models, schemas
+from ..models.queue_item import QueueItemStatus
+from ..utils.db import upsert, insert_ignore
+from .user import get_users_by_emails
+from .leaderboard import record_item_added, record_item_removed
+from .queue_history_rollup import record_history_rollups
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FIELDS = ("name", "description", "status", "max_capacity")
+
+
+def _timestamp(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _queue_id(change: schemas.SyncChange) -> Optional[int]:
+    return change.payload.get("id" if change.entity == "queue" else "queue_id")
+
+
+def apply_sync_batch(db: Session, node_id: str, changes: List[schemas.SyncChange]) -> Tuple[int, int]:
+    """
+    Apply a node's changes in id order, in one transaction. Changes at or below
+    the node's last acknowledged id were applied before and are skipped, so a
+    batch re-sent after a lost response is harmless.
+    Returns (acknowledged id, number of changes applied).
+    """
+    insert_ignore(db, models.SyncNode, {"node_id": node_id, "last_change_id": 0}, ["node_id"])
+    node = db.query(models.SyncNode).filter(models.SyncNode.node_id == node_id).with_for_update().one()
+
+    pending = sorted((change for change in changes if change.id > node.last_change_id), key=lambda c: c.id)
+    emails = list({change.payload["user_email"] for change in pending if change.payload.get("user_email")})
+    user_ids = {user.email: user.id for user in get_users_by_emails(db, emails)}
+    queue_ids = {_queue_id(change) for change in pending} - {None}
+    known_queues = {
+        queue_id for (queue_id,) in db.query(models.Queue.id).filter(models.Queue.id.in_(queue_ids))
+    } if queue_ids else set()
+
+    applied = 0
+    for change in pending:
+        queue_id = _queue_id(change)
+        if queue_id not in known_queues:
+            logger.warning("Skipping sync change %s from %s for unknown queue %s", change.id, node_id, queue_id)
+            continue
+        if change.entity == "queue":
+            _apply_queue(db, change.payload)
+        elif change.entity == "queue_item":
+            _apply_queue_item(db, change.op, change.payload, user_ids)
+        else:
+            _apply_queue_history(db, change.payload, user_ids)
+        applied += 1
+
+    if pending:
+        node.last_change_id = pending[-1].id
+    node.last_seen_at = datetime.utcnow()
+    db.commit()
+    return node.last_change_id, applied
+
+
+def _apply_queue(db: Session, payload: Dict[str, Any]) -> None:
+    values = {field: payload[field] for field in QUEUE_FIELDS if field in payload}
+    db.query(models.Queue).filter(models.Queue.id == payload["id"]).update(values, synchronize_session=False)
+
+
+def _apply_queue_item(db: Session, op: str, payload: Dict[str, Any], user_ids: Dict[str, int]) -> None:
+    existing = db.query(models.QueueItem.id).filter(models.QueueItem.join_hash == payload["join_hash"]).first()
+    if op == "delete":
+        if existing:
+            db.query(models.QueueItem).filter(models.QueueItem.id == existing.id).delete(synchronize_session=False)
+            record_item_removed(db, payload["queue_id"])
+        return
+
+    values = {
+        "join_hash": payload["join_hash"],
+        "queue_id": payload["queue_id"],
+        "user_id": user_ids.get(payload.get("user_email")),
+        "token_number": payload["token_number"],
+        "status": QueueItemStatus[payload["status"]],
+        "joined_at": _timestamp(payload.get("joined_at")),
+        "called_at": _timestamp(payload.get("called_at")),
+        "served_at": _timestamp(payload.get("served_at")),
+        "waiting_time": payload.get("waiting_time"),
+    }
+    upsert(db, models.QueueItem, values, ["join_hash"],
+           {key: value for key, value in values.items() if key != "join_hash"})
+    if not existing:
+        record_item_added(db, payload["queue_id"], values["joined_at"])
+
+
+def _apply_queue_history(db: Session, payload: Dict[str, Any], user_ids: Dict[str, int]) -> None:
+    history = models.QueueHistory(
+        queue_id=payload["queue_id"],
+        user_id=user_ids.get(payload.get("user_email")),
+        joined_at=_timestamp(payload["joined_at"]),
+        removed_at=_timestamp(payload["removed_at"]),
+        waiting_time=payload["waiting_time"],
+    )
+    db.add(history)
+    record_history_rollups(db, history.queue_id, history.removed_at, history.waiting_time)
@@ -5,6 +5,7 @@ from sqlalchemy import or_
 from typing import Optional, List
 from .. import models, schemas
 from ..auth import hash_password
+from ..utils.principal import invalidate_user
 
 def get_user(db: Session, user_id: int) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.id == user_id).first()
@@ -12,12 +13,25 @@ def get_user(db: Session, user_id: int) -> Optional[models.User]:
 def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
     return db.query(models.User).filter(models.User.email == email).first()
 
-def create_user(db: Session, user: schemas.UserCreate) -> models.User:
-    hashed_pw = hash_password(user.password)
+def get_users_by_emails(db: Session, emails: List[str], chunk_size: int = 1000) -> List[models.User]:
+    """
+    Resolve many exact email addresses with one IN query per ``chunk_size`` addresses.
+    """
+    users = []
+    for start in range(0, len(emails), chunk_size):
+        chunk = emails[start:start + chunk_size]
+        users.extend(db.query(models.User).filter(models.User.email.in_(chunk)).all())
+    return users
+
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None) -> models.User:
+    """
+    Pass ``hashed_password`` when the caller has already hashed ``user.password``
+    (e.g. asynchronously); otherwise it is hashed here.
+    """
     db_user = models.User(
         name=user.name,
         email=user.email,
-        hashed_password=hashed_pw,
+        hashed_password=hashed_password or hash_password(user.password),
         phone_number=user.phone_number
     )
     db.add(db_user)
@@ -55,13 +69,24 @@ def update_user(db: Session, user_id: int, updates: schemas.UserUpdate) -> Optio
     for key, value in update_data.items():
         setattr(user, key, value)
     db.commit()
+    invalidate_user(user_id)
     db.refresh(user)
     return user
 
+def set_password_hash(db: Session, user_id: int, hashed_password: str) -> None:
+    """
+    Replace a user's password hash, e.g. after rehashing at a new bcrypt cost.
+    """
+    db.query(models.User).filter(models.User.id == user_id)\
+        .update({models.User.hashed_password: hashed_password}, synchronize_session=False)
+    db.commit()
+    invalidate_user(user_id)
+
 def delete_user(db: Session, user_id: int) -> bool:
     user = get_user(db, user_id)
     if not user:
         return False
     db.delete(user)
     db.commit()
+    invalidate_user(user_id, deleted=True)
     return True
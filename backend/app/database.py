@@ -1,16 +1,40 @@
 # backend/app/database.py
 
-import os
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .core.config import settings
+from .database_sqlite import configure_sqlite
+from .utils.pool import engine_options, register_pool_metrics
+from .utils.replicas import ReadRouter, Replica
 
-# We're using PostgreSQL in Docker
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://youruser:yourpassword@db:5432/queuetracker")
+# PostgreSQL in Docker; SQLite on edge nodes (DEPLOYMENT_PROFILE=edge)
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+def _create_engine(url: str, name: str):
+    created = create_engine(url, **engine_options(url, name))
+    if created.dialect.name == "sqlite":
+        configure_sqlite(created)
+    register_pool_metrics(created, name)
+    return created
+
+engine = _create_engine(SQLALCHEMY_DATABASE_URL, "primary")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+def _replica(index: int, url: str) -> Replica:
+    name = f"replica{index}"
+    return Replica(name, _create_engine(url, name))
+
+# Read-only sessions (dependencies.get_read_db) go to DATABASE_REPLICA_URLS when set.
+read_router = ReadRouter(engine, [
+    _replica(index, url.strip())
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS.split(","))
+    if url.strip()
+])
+
+def ReadSessionLocal(user_id=None):
+    return SessionLocal(bind=read_router.engine_for(user_id))
+
 Base = declarative_base()
 
@@ -1,17 +1,31 @@
 # backend/app/database_sqlite.py
+#
+# SQLite connection tuning, applied by database.py to every SQLite engine (edge
+# nodes and local development):
+#
+#   journal_mode=WAL     readers no longer block on the writer and vice versa
+#   synchronous=NORMAL   fsync at checkpoints only; a power cut can lose the last
+#                        commits but never corrupts the file
+#   busy_timeout         concurrent writers wait for the lock instead of failing
+#                        with "database is locked"
+#   mmap_size, cache_size  keep the hot pages of a branch-sized database in memory
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from .database import Base
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 
-DATABASE_URL = "sqlite:///./queuetracker.db"  # SQLite file in current directory
+from .core.config import settings
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
-)
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+def configure_sqlite(engine: Engine) -> None:
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+            cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+            cursor.execute(f"PRAGMA cache_size=-{int(settings.SQLITE_CACHE_SIZE_KB)}")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+        finally:
+            cursor.close()
@@ -3,13 +3,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
 from typing import Optional
 from . import crud, models, schemas
-from .database import SessionLocal
-from .auth import SECRET_KEY, ALGORITHM  # Import the secret key and algorithm
+from .database import ReadSessionLocal, SessionLocal
 from .models.user import User
-from .core.config import settings
+from .utils.principal import Principal, cached_user, decode_principal, user_cache
+
+_MISSING = object()
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=True)
 optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
@@ -21,26 +21,57 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db(token: Optional[str] = Depends(optional_oauth2_scheme)):
+    """
+    A session for endpoints that only read: bound to a replica when one is
+    configured and current enough, to the primary otherwise (see utils.replicas).
+    """
+    principal = decode_principal(token) if token else None
+    db = ReadSessionLocal(principal.id if principal else None)
+    try:
+        yield db
+    finally:
+        db.close()
+
+def load_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    The user as a detached snapshot, read through the principal user cache.
+    Column attributes are loaded; relationships are not available on it.
+    """
+    user = cached_user(user_id, _MISSING)
+    if user is not _MISSING:
+        return user
+    user = crud.get_user(db, user_id=user_id)
+    if user is not None:
+        db.expunge(user)
+        user_cache.set(user_id, user)
+    return user
+
+async def get_current_principal(token: str = Depends(oauth2_scheme)) -> Principal:
+    """
+    The caller's id and role from the access token, without touching the database.
+    Enough for endpoints that only need to know who is calling.
+    """
+    principal = decode_principal(token)
+    if principal is None or cached_user(principal.id, _MISSING) is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
 async def get_current_user(
-    token: str = Depends(oauth2_scheme),
+    principal: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ) -> User:
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
-        raise credentials_exception
-    
-    user = crud.get_user(db, user_id=int(user_id))
+    user = load_user(db, principal.id)
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
     return user
 
 async def get_current_user_optional(
@@ -53,14 +84,7 @@ async def get_current_user_optional(
     """
     if not token:
         return None
-        
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            return None
-            
-        user = crud.get_user(db, user_id=int(user_id))
-        return user
-    except JWTError:
+    principal = decode_principal(token)
+    if principal is None:
         return None
+    return load_user(db, principal.id)
@@ -0,0 +1,71 @@
+# backend/app/limits.py
+#
+# Rate limit and load shedding dependencies for the endpoints a misbehaving
+# client can hammer: login and joining a queue. They run before the endpoint
+# touches the database. Over a limit the answer is 429, while the process is
+# overloaded it is 503; both carry Retry-After.
+
+import math
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import OAuth2PasswordRequestForm
+
+from .core.config import settings
+from .dependencies import get_current_principal
+from .utils import metrics
+from .utils.load_shedding import shedder
+from .utils.principal import Principal
+from .utils.ratelimit import Rate, limiter
+
+LOGIN_PER_IP = Rate.parse(settings.RATE_LIMIT_LOGIN_PER_IP)
+LOGIN_PER_ACCOUNT = Rate.parse(settings.RATE_LIMIT_LOGIN_PER_ACCOUNT)
+JOIN_PER_USER = Rate.parse(settings.RATE_LIMIT_JOIN_PER_USER)
+JOIN_PER_IP = Rate.parse(settings.RATE_LIMIT_JOIN_PER_IP)
+JOIN_PER_QUEUE = Rate.parse(settings.RATE_LIMIT_JOIN_PER_QUEUE)
+
+_limited = metrics.counter("rate_limited_total", "Requests rejected with 429 by rate limiting.")
+
+
+def _shed_if_overloaded() -> None:
+    retry_after = shedder.retry_after()
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=503,
+            detail="The service is busy, please retry shortly.",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+def _enforce(*checks) -> None:
+    """Each check is (bucket name, key, Rate); raises 429 if any bucket is empty."""
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    wait = max(limiter.hit(name, key, rate) for name, key, rate in checks)
+    if wait > 0:
+        _limited.inc()
+        raise HTTPException(
+            status_code=429,
+            detail="Too many requests, please retry later.",
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+
+
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else "unknown"
+
+
+def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()) -> None:
+    _shed_if_overloaded()
+    _enforce(
+        ("login-ip", _client_ip(request), LOGIN_PER_IP),
+        ("login-account", form_data.username.strip().lower(), LOGIN_PER_ACCOUNT),
+    )
+
+
+def limit_join(queue_id: int, request: Request, principal: Principal = Depends(get_current_principal)) -> None:
+    _shed_if_overloaded()
+    _enforce(
+        ("join-user", principal.id, JOIN_PER_USER),
+        ("join-ip", _client_ip(request), JOIN_PER_IP),
+        ("join-queue", queue_id, JOIN_PER_QUEUE),
+    )
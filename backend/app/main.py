@@ -1,10 +1,22 @@
-from fastapi import FastAPI
-from .database import Base, engine
-from .routers import auth, users, organizations, services, queues, memberships, stats, ws, queue_history, notifications
-from .utils.kafka import init_kafka_producer, shutdown_kafka_producer
+import time
+from .utils import startup
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+startup.mark("import framework")
+from .core.config import settings
+from .database import engine, read_router
+startup.mark("import database")
+from .routers import auth, users, organizations, services, queues, memberships, stats, ws, queue_history, notifications, exports, forecast, metrics, sync, health
+from .utils.passwords import PasswordHasherBusy, shutdown_pool
+from .utils.load_shedding import shedder
+from .utils import metrics as metrics_registry
+from .utils import events
+from .utils.principal import decode_principal
+from .utils.change_capture import install_change_capture
+startup.mark("import routers")
 
-Base.metadata.create_all(bind=engine)
+# The schema is managed by migrations only: `python -m app.cli migrate`.
 
 app = FastAPI(
     title="TimeWait",
@@ -19,6 +31,34 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+_request_seconds = metrics_registry.histogram(
+    "http_request_duration_seconds", "Time to produce a response, per request.",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    started = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        elapsed = time.perf_counter() - started
+        shedder.record_latency(elapsed)
+        _request_seconds.observe(elapsed)
+
+_READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    # After a successful write, keep the caller's reads on the primary for a while.
+    response = await call_next(request)
+    if request.method not in _READ_METHODS and response.status_code < 400:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        principal = decode_principal(token) if scheme.lower() == "bearer" and token else None
+        if principal is not None:
+            read_router.note_write(principal.id)
+    return response
+
 app.include_router(auth.router)
 app.include_router(users.router)
 app.include_router(organizations.router)
@@ -29,11 +69,32 @@ app.include_router(stats.router)
 app.include_router(ws.router)
 app.include_router(queue_history.router)
 app.include_router(notifications.router)
+app.include_router(exports.router)
+app.include_router(forecast.router)
+app.include_router(metrics.router)
+app.include_router(sync.router)
+app.include_router(health.router)
+startup.mark("build app")
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many sign-in attempts in progress, please retry."},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 @app.on_event("startup")
 async def on_startup():
-    await init_kafka_producer()
+    if settings.DEPLOYMENT_PROFILE == "edge":
+        install_change_capture(engine)
+        startup.mark("change capture")
+    # Kafka connects in the background; see utils/events.py.
+    events.start()
+    startup.mark("startup")
+    startup.log_report()
 
 @app.on_event("shutdown")
 async def on_shutdown():
-    await shutdown_kafka_producer()
+    await events.stop()
+    shutdown_pool()
@@ -8,6 +8,13 @@ from .queue_item import QueueItem, QueueItemStatus
 from .membership import Membership
 from .queue_history import QueueHistory
 from .notification import Notification, NotificationType, NotificationStatus
+from .leaderboard import LeaderboardCounter, LeaderboardScope, LIVE_PERIOD
+from .queue_history_rollup import QueueHistoryRollup, RollupGranularity, HISTOGRAM_EDGES, HOUR_OF_WEEK_EPOCH
+from .queue_forecast import QueueForecast, HOURS_PER_WEEK
+from .notification_counter import NotificationCounter
+from .email_job import EmailJob, EmailJobStatus
+from .revoked_token import RevokedToken
+from .sync import SyncOutbox, SyncNode
 
 __all__ = [
     "User",
@@ -23,5 +30,20 @@ __all__ = [
     "QueueHistory",
     "Notification",
     "NotificationType",
-    "NotificationStatus"
+    "NotificationStatus",
+    "LeaderboardCounter",
+    "LeaderboardScope",
+    "LIVE_PERIOD",
+    "QueueHistoryRollup",
+    "RollupGranularity",
+    "HISTOGRAM_EDGES",
+    "HOUR_OF_WEEK_EPOCH",
+    "QueueForecast",
+    "HOURS_PER_WEEK",
+    "NotificationCounter",
+    "EmailJob",
+    "EmailJobStatus",
+    "RevokedToken",
+    "SyncOutbox",
+    "SyncNode",
 ]
@@ -0,0 +1,37 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index
+from datetime import datetime
+from ..database import Base
+
+class EmailJobStatus:
+    PENDING = "pending"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+
+class EmailJob(Base):
+    """
+    An outgoing email waiting for the delivery worker. While a worker holds a job
+    it is SENDING and next_attempt_at is the end of its lease; jobs whose lease ran
+    out are picked up again.
+    """
+    __tablename__ = "email_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    to_address = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    template = Column(String, nullable=False)
+    context = Column(JSON, nullable=False)
+    status = Column(String(16), nullable=False, default=EmailJobStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index("ix_email_jobs_status_next_attempt_at", "status", "next_attempt_at"),
+        {'extend_existing': True},
+    )
+
+    def __repr__(self):
+        return f"<EmailJob {self.id} {self.template} -> {self.to_address}: {self.status}>"
@@ -0,0 +1,36 @@
+# backend/app/models/leaderboard.py
+
+from sqlalchemy import Column, Integer, String, DateTime, Index, UniqueConstraint
+from datetime import datetime
+from ..database import Base
+
+# Period value for the counter that tracks items currently in a queue.
+LIVE_PERIOD = "live"
+
+class LeaderboardScope:
+    QUEUE = "queue"
+    ORGANIZATION = "organization"
+
+class LeaderboardCounter(Base):
+    """
+    Pre-aggregated item volume per queue or organization, used by /stats.
+    ``period`` is either "live" (items currently queued) or an ISO day
+    ("2025-04-01") counting the items that joined on that day.
+    """
+    __tablename__ = "leaderboard_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    scope = Column(String, nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    period = Column(String(10), nullable=False)
+    item_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("scope", "entity_id", "period", name="uq_leaderboard_counters_entity_period"),
+        Index("ix_leaderboard_counters_rank", "scope", "period", "item_count"),
+        {'extend_existing': True},
+    )
+
+    def __repr__(self):
+        return f"<LeaderboardCounter {self.scope}:{self.entity_id} {self.period}={self.item_count}>"
@@ -1,6 +1,6 @@
 # backend/app/models/membership.py
 from datetime import datetime
-from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 from .user import UserRole
@@ -10,7 +10,10 @@ class Membership(Base):
     Represents a user's membership within an organization.
     """
     __tablename__ = "memberships"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_memberships_organization_id_user_id", "organization_id", "user_id"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=False)
@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Boolean, Text
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Enum, Boolean, Text, Index, JSON, text
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -37,11 +38,30 @@ class Notification(Base):
     queue_id = Column(Integer, ForeignKey("queues.id"), nullable=True)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=True)
     
-    # Additional data stored as JSON
-    extra_data = Column(Text, nullable=True)  # JSON string for additional data
+    # Secret of organization invites, looked up by the invite links
+    invite_token = Column(String(64), unique=True, index=True, nullable=True)
+
+    # Additional data, validated per type by schemas.notification (JSONB on Postgres)
+    extra_data = Column(
+        JSON(none_as_null=True).with_variant(JSONB(none_as_null=True), "postgresql"),
+        nullable=True
+    )
 
     # Relationships
     user = relationship("User", back_populates="notifications")
     organization = relationship("Organization", back_populates="notifications")
     queue = relationship("Queue", back_populates="notifications")
-    service = relationship("Service", back_populates="notifications") 
\ No newline at end of file
+    service = relationship("Service", back_populates="notifications")
+
+    __table_args__ = (
+        Index("ix_notifications_user_id_status_created_at", "user_id", "status", "created_at"),
+        Index("ix_notifications_user_id_created_at", "user_id", "created_at"),
+        Index("ix_notifications_status_created_at", "status", "created_at"),
+        # Spelled exactly like crud.notification.extra_data_key so the planner can match them
+        Index(
+            "ix_notifications_organization_id_status_role",
+            "organization_id", "status", text("(extra_data ->> 'role')")
+        ).ddl_if(dialect="postgresql"),
+        Index("ix_notifications_extra_data", "extra_data", postgresql_using="gin").ddl_if(dialect="postgresql"),
+        {'extend_existing': True},
+    ) 
\ No newline at end of file
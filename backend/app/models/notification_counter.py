@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from datetime import datetime
+from ..database import Base
+
+class NotificationCounter(Base):
+    """
+    Number of unread (pending) notifications per user, maintained by the
+    notification CRUD functions so reads don't have to count rows.
+    """
+    __tablename__ = "notification_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    unread = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = {'extend_existing': True}
+
+    def __repr__(self):
+        return f"<NotificationCounter {self.user_id}: {self.unread}>"
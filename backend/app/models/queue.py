@@ -30,8 +30,8 @@ class Queue(Base):
     qr_code_url = Column(String, nullable=True)
 
     # Foreign keys
-    service_id = Column(Integer, ForeignKey("services.id"), nullable=True)
-    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=True, index=True)
+    organization_id = Column(Integer, ForeignKey("organizations.id"), nullable=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Relationships
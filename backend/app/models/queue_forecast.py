@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, LargeBinary
+from datetime import datetime
+from ..database import Base
+
+# One slot per hour of the week, Monday 00:00 UTC first.
+HOURS_PER_WEEK = 168
+
+class QueueForecast(Base):
+    """
+    Hour-of-week arrival and departure profiles of a queue, stored as packed
+    little-endian float64 arrays of HOURS_PER_WEEK event counts.
+    """
+    __tablename__ = "queue_forecasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue_id = Column(Integer, ForeignKey("queues.id", ondelete="CASCADE"), unique=True, nullable=False)
+    arrivals = Column(LargeBinary, nullable=False)
+    departures = Column(LargeBinary, nullable=False)
+    # Events are counted from first_event_at on; computed_through is the ingested_at
+    # watermark of the history folded in so far.
+    first_event_at = Column(DateTime, nullable=True)
+    computed_through = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = {'extend_existing': True}
+
+    def __repr__(self):
+        return f"<QueueForecast {self.queue_id} through {self.computed_through}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -15,12 +15,21 @@ class QueueHistory(Base):
     joined_at = Column(DateTime, nullable=False)
     removed_at = Column(DateTime, nullable=False, default=datetime.utcnow)
     waiting_time = Column(Float, nullable=False)  # Waiting time in minutes
+    # When the row was written; removed_at can be far older (closed queue cleanup, edge sync)
+    ingested_at = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     # Relationships
     queue = relationship("Queue", back_populates="history_items")
     user = relationship("User", back_populates="queue_history")
 
-    __table_args__ = {'extend_existing': True}
+    # On Postgres the table is range-partitioned by month on removed_at (see the
+    # "partition queue_history by month" migration); filter on removed_at to prune.
+    __table_args__ = (
+        Index("ix_queue_history_queue_id_removed_at", "queue_id", "removed_at"),
+        # Incremental forecast refreshes, see crud.queue_forecast
+        Index("ix_queue_history_queue_id_ingested_at", "queue_id", "ingested_at"),
+        {'extend_existing': True},
+    )
 
     def __repr__(self):
         return f"<QueueHistory {self.id} - Wait: {self.waiting_time} mins>" 
\ No newline at end of file
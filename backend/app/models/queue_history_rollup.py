@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Float, JSON, UniqueConstraint
+from datetime import datetime
+from ..database import Base
+
+# Upper bounds (in minutes) of the waiting time histogram bins. A final
+# open-ended bin collects everything at or above the last edge.
+HISTOGRAM_EDGES = [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240]
+
+class RollupGranularity:
+    MINUTE = "minute"
+    HOUR = "hour"
+    DAY = "day"
+    # All-time buckets per hour of the week, placed in the week of HOUR_OF_WEEK_EPOCH.
+    HOUR_OF_WEEK = "hour_of_week"
+
+# A Monday; hour-of-week buckets start at EPOCH + weekday days + hour hours.
+HOUR_OF_WEEK_EPOCH = datetime(2001, 1, 1)
+
+class QueueHistoryRollup(Base):
+    """
+    Pre-aggregated waiting times of queue_history rows, bucketed by removed_at.
+    One row per queue, granularity and bucket start.
+    """
+    __tablename__ = "queue_history_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    queue_id = Column(Integer, ForeignKey("queues.id", ondelete="CASCADE"), nullable=False)
+    granularity = Column(String(16), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    total = Column(Float, nullable=False, default=0.0)
+    sum_sq = Column(Float, nullable=False, default=0.0)
+    min_wait = Column(Float, nullable=True)
+    max_wait = Column(Float, nullable=True)
+    histogram = Column(JSON, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("queue_id", "granularity", "bucket_start", name="uq_queue_history_rollups_bucket"),
+        {'extend_existing': True},
+    )
+
+    def __repr__(self):
+        return f"<QueueHistoryRollup {self.queue_id} {self.granularity} {self.bucket_start}: {self.count}>"
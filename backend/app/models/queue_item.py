@@ -1,6 +1,6 @@
 # backend/app/models/queue_item.py
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, String, Float
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Enum, String, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -17,7 +17,13 @@ class QueueItem(Base):
     Represents an individual item within a queue.
     """
     __tablename__ = "queue_items"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Position and "people ahead" lookups filter on queue and status, ordered by token.
+        Index("ix_queue_items_queue_id_status_token_number", "queue_id", "status", "token_number"),
+        Index("ix_queue_items_queue_id_user_id", "queue_id", "user_id"),
+        Index("ix_queue_items_queue_id_joined_at", "queue_id", "joined_at"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     queue_id = Column(Integer, ForeignKey("queues.id"), nullable=False)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Nullable for anonymous
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from datetime import datetime
+from ..database import Base
+
+class RevokedToken(Base):
+    """
+    A revoked refresh token id or refresh token family id. Rows are only needed
+    until ``expires_at``, when every token they could match has expired anyway.
+    The id column is increasing so processes can pick up new revocations
+    incrementally.
+    """
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_id = Column(String(32), nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = {'extend_existing': True}
+
+    def __repr__(self):
+        return f"<RevokedToken {self.token_id} until {self.expires_at}>"
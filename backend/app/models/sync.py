@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from datetime import datetime
+from ..database import Base
+
+class SyncOutbox(Base):
+    """
+    Edge nodes only: a change to a queue, queue item or queue history row,
+    written by SQLite triggers in the same transaction as the change and removed
+    once the central server has acknowledged it. See utils/change_capture.py.
+    """
+    __tablename__ = "sync_outbox"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(32), nullable=False)
+    op = Column(String(16), nullable=False)
+    payload = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    # AUTOINCREMENT: ids must never be reused once acknowledged rows are deleted,
+    # or the central server would skip new changes as already applied.
+    __table_args__ = {'extend_existing': True, 'sqlite_autoincrement': True}
+
+    def __repr__(self):
+        return f"<SyncOutbox {self.id} {self.op} {self.entity}>"
+
+class SyncNode(Base):
+    """
+    Central server only: the last outbox id applied from each edge node, which
+    makes re-sent batches idempotent.
+    """
+    __tablename__ = "sync_nodes"
+
+    node_id = Column(String(64), primary_key=True)
+    last_change_id = Column(Integer, nullable=False, default=0)
+    last_seen_at = Column(DateTime, nullable=True)
+
+    __table_args__ = {'extend_existing': True}
+
+    def __repr__(self):
+        return f"<SyncNode {self.node_id} at {self.last_change_id}>"
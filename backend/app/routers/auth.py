@@ -1,11 +1,17 @@
 # backend/app/routers/auth.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from .. import schemas, crud
 from ..dependencies import get_db
-from ..auth import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
-from datetime import timedelta
+from ..limits import limit_login
+from ..auth import (
+    hash_password_async, verify_password_async, create_access_token, create_refresh_token,
+    decode_refresh_token, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_DAYS,
+)
+from ..utils import revocation
+from datetime import datetime, timedelta
 from fastapi.security import OAuth2PasswordRequestForm
 
 router = APIRouter(
@@ -13,23 +19,31 @@ router = APIRouter(
     tags=["auth"],
 )
 
+# Both endpoints are async so that bcrypt, which runs in the hashing process pool,
+# is awaited without holding one of the request threads; database calls still
+# go through the thread pool.
+
 @router.post("/register", response_model=schemas.UserRead)
-def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    db_user = crud.get_user_by_email(db, email=user.email)
+async def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(crud.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db=db, user=user)
+    hashed_password = await hash_password_async(user.password)
+    return await run_in_threadpool(crud.create_user, db=db, user=user, hashed_password=hashed_password)
 
-@router.post("/login", response_model=schemas.Token)
-def login_for_access_token(
+@router.post("/login", response_model=schemas.Token, dependencies=[Depends(limit_login)])
+async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db)
 ):
     """
     Authenticates a user and returns a JWT token.
     """
-    user = crud.get_user_by_email(db, email=form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    user = await run_in_threadpool(crud.get_user_by_email, db, email=form_data.username)
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await verify_password_async(form_data.password, user.hashed_password)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -40,4 +54,66 @@ def login_for_access_token(
         data={"sub": str(user.id), "role": user.role.value},
         expires_delta=access_token_expires
     )
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = create_refresh_token(user.id)
+    if new_hash:
+        # The password was hashed at a different BCRYPT_ROUNDS; store it at the current cost.
+        await run_in_threadpool(crud.set_password_hash, db, user.id, new_hash)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid or expired refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+def _family_expires_at() -> datetime:
+    # No token of a family outlives the newest one, issued at most now.
+    return datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh_access_token(body: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Exchanges a refresh token for a new access token and a new refresh token.
+    The presented token is revoked; presenting it again revokes every token
+    rotated from the same login.
+    """
+    claims = decode_refresh_token(body.refresh_token)
+    if claims is None:
+        raise _invalid_refresh_token()
+    user_id, token_id, family = int(claims["sub"]), claims["jti"], claims["fam"]
+
+    # A filter lookup: a logout on another process takes up to
+    # REFRESH_REVOCATION_SYNC_SECONDS to reach this one.
+    if revocation.revoked(db, family):
+        raise _invalid_refresh_token()
+    if not revocation.revoke(db, token_id, datetime.utcfromtimestamp(claims["exp"]), user_id=user_id):
+        # Already rotated, by an earlier or a concurrent request: the token was stolen or replayed.
+        revocation.revoke(db, family, _family_expires_at(), user_id=user_id)
+        raise _invalid_refresh_token()
+
+    # Read past the user cache: the new token carries the role for its whole lifetime.
+    user = crud.get_user(db, user_id=user_id)
+    if user is None:
+        raise _invalid_refresh_token()
+    access_token = create_access_token(
+        data={"sub": str(user.id), "role": user.role.value},
+        expires_delta=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "refresh_token": create_refresh_token(user.id, family=family),
+    }
+
+@router.post("/logout", status_code=204)
+def logout(body: schemas.RefreshTokenRequest, db: Session = Depends(get_db)):
+    """
+    Revokes the refresh token and every token rotated from the same login.
+    Other API processes refuse the family within REFRESH_REVOCATION_SYNC_SECONDS.
+    Access tokens already issued stay valid until they expire.
+    """
+    claims = decode_refresh_token(body.refresh_token)
+    if claims is not None:
+        revocation.revoke(db, claims["fam"], _family_expires_at(), user_id=int(claims["sub"]))
+    return
@@ -0,0 +1,84 @@
+# backend/app/routers/exports.py
+
+from enum import Enum
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from .. import crud
+from ..authorization import get_organization_role, view_queue
+from ..crud.queue_history import EXPORT_COLUMNS
+from ..database import ReadSessionLocal
+from ..dependencies import get_read_db, get_current_principal
+from ..utils.export import ndjson_chunks, csv_chunks
+from ..utils.principal import Principal
+
+router = APIRouter(
+    prefix="/exports",
+    tags=["exports"],
+    dependencies=[Depends(get_current_principal)],
+    responses={404: {"description": "Not found"}},
+)
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv",
+}
+
+def _stream_history(encoder, user_id, **filters):
+    # The response outlives the request's dependencies, so the stream owns its session.
+    db = ReadSessionLocal(user_id)
+    try:
+        yield from encoder(crud.iter_queue_history(db, **filters), EXPORT_COLUMNS)
+    finally:
+        db.close()
+
+@router.get("/queue-history")
+def export_queue_history(
+    queue_id: Optional[int] = None,
+    service_id: Optional[int] = None,
+    organization_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    format: ExportFormat = ExportFormat.NDJSON,
+    db: Session = Depends(get_read_db),
+    principal: Principal = Depends(get_current_principal)
+):
+    """
+    Stream queue history for exactly one queue, service or organization, optionally
+    limited to rows removed in [start, end). Rows are sent in chunks as they are read;
+    archived history is included.
+    """
+    if sum(scope is not None for scope in (queue_id, service_id, organization_id)) != 1:
+        raise HTTPException(status_code=400, detail="Specify exactly one of queue_id, service_id or organization_id.")
+
+    if queue_id is not None:
+        scope, allowed = view_queue.resolve(db, principal, queue_id)
+        if scope is None:
+            raise HTTPException(status_code=404, detail="Queue not found")
+        if not allowed:
+            raise HTTPException(status_code=403, detail="Not authorized to export this queue's history")
+    else:
+        if service_id is not None:
+            service = crud.get_service(db, service_id)
+            if not service:
+                raise HTTPException(status_code=404, detail="Service not found")
+            org_id = service.organization_id
+        else:
+            org_id = organization_id
+        if get_organization_role(db, principal.id, org_id) is None:
+            raise HTTPException(status_code=403, detail="Not a member of this organization")
+
+    encoder = ndjson_chunks if format == ExportFormat.NDJSON else csv_chunks
+    filename = f"queue_history.{format.value}"
+    return StreamingResponse(
+        _stream_history(encoder, principal.id, queue_id=queue_id, service_id=service_id,
+                        organization_id=organization_id, start=start, end=end),
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
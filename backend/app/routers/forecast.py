@@ -0,0 +1,32 @@
+# backend/app/routers/forecast.py
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from .. import crud, models
+from ..dependencies import get_read_db, get_current_principal
+from ..authorization import QueueScope, view_queue
+
+router = APIRouter(
+    prefix="/queues/{queue_id}/forecast",
+    tags=["queue forecast"],
+    dependencies=[Depends(get_current_principal)],
+    responses={404: {"description": "Not found"}},
+)
+
+@router.get("/")
+def get_queue_forecast(
+    queue_id: int,
+    hours: int = Query(24, ge=1, le=168),
+    db: Session = Depends(get_read_db),
+    scope: QueueScope = Depends(view_queue)
+):
+    """
+    Get the hour-of-week arrival and departure rates of a queue and the expected
+    load of the next ``hours`` hours. Served from the stored profiles, which are
+    refreshed by `python -m app.cli refresh-forecasts` (every 15 minutes by the
+    forecast-refresher service); 404 until the queue's first refresh.
+    """
+    forecast = crud.get_queue_forecast(db, queue_id)
+    if not forecast:
+        raise HTTPException(status_code=404, detail="No forecast has been computed for this queue yet")
+    return crud.summarize_forecast(forecast, hours=hours)
@@ -0,0 +1,20 @@
+# backend/app/routers/health.py
+
+from fastapi import APIRouter
+from ..utils import events
+
+router = APIRouter(
+    tags=["health"],
+)
+
+@router.get("/health")
+def get_health():
+    """
+    Liveness, and whether optional subsystems are available. "degraded" means
+    the API serves requests but live updates are not delivered (Kafka down).
+    """
+    event_bus = events.status()
+    return {
+        "status": "degraded" if event_bus == "connecting" else "ok",
+        "event_bus": event_bus,
+    }
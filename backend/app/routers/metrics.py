@@ -0,0 +1,16 @@
+# backend/app/routers/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ..utils import metrics
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Process metrics in the Prometheus text exposition format.
+    """
+    return metrics.render()
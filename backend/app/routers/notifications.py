@@ -2,10 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
-import json
+import logging
 import secrets
 from fastapi.responses import RedirectResponse
-from ..dependencies import get_db, get_current_user_optional
+from ..dependencies import get_db, get_current_user_optional, get_current_principal
 from ..models.notification import NotificationStatus, NotificationType
 from ..schemas.notification import NotificationRead, NotificationCreate, NotificationUpdate
 from ..crud import notification as crud_notification, get_user, get_user_by_email
@@ -16,9 +16,12 @@ from ..crud import membership as crud_membership
 from ..crud import user as crud_user
 from ..dependencies import get_current_user
 from ..models.user import User, UserRole
-from ..utils.email import send_organization_invite_email
+from ..utils.principal import Principal
+from ..utils.email import enqueue_organization_invite_email
 from ..core.config import settings
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(
     prefix="/notifications",
     tags=["notifications"]
@@ -27,6 +30,13 @@ router = APIRouter(
 # Constants
 INVITE_EXPIRATION_HOURS = 24
 
+def _invite_role(notification) -> UserRole:
+    """The role an invitation grants; extra_data was validated when the invite was created."""
+    try:
+        return UserRole((notification.extra_data or {}).get('role', UserRole.USER.value))
+    except ValueError:
+        return UserRole.USER
+
 def is_invitation_expired(notification) -> bool:
     """
     Check if an invitation has expired based on its creation time.
@@ -83,25 +93,23 @@ async def create_notification(
         # Generate invite token
         invite_token = secrets.token_urlsafe(32)
         
-        # Add invite token to extra_data
-        extra_data = json.loads(notification.extra_data or '{}')
-        extra_data['invite_token'] = invite_token
-        notification.extra_data = json.dumps(extra_data)
-        
         # Create notification
-        db_notification = crud_notification.create_notification(db=db, notification=notification)
+        db_notification = crud_notification.create_notification(
+            db=db, notification=notification, invite_token=invite_token
+        )
         
-        # Send email invitation
+        # Queue email invitation; the delivery worker sends it
         try:
-            await send_organization_invite_email(
+            enqueue_organization_invite_email(
+                db=db,
                 email_to=target_user.email,
                 organization_name=organization.name,
                 invite_token=invite_token,
-                role=extra_data.get('role', 'user')
+                role=notification.extra_data["role"]
             )
         except Exception as e:
             # Log the error but don't fail the notification creation
-            print(f"Failed to send invitation email: {str(e)}")
+            logger.error(f"Failed to queue invitation email: {e}")
         
         return db_notification
     
@@ -113,7 +121,7 @@ def get_notifications(
     limit: int = 100,
     unread_only: bool = False,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get notifications for the current user.
@@ -129,13 +137,24 @@ def get_notifications(
 @router.get("/unread-count", response_model=int)
 def get_unread_notifications_count(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     """
     Get the count of unread notifications for the current user.
     """
     return crud_notification.get_unread_count(db=db, user_id=current_user.id)
 
+@router.post("/read-all", response_model=int)
+def mark_all_notifications_as_read(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    """
+    Mark all of the current user's notifications as read, except pending invitations.
+    Returns the number of notifications marked.
+    """
+    return crud_notification.mark_all_as_read(db=db, user_id=current_user.id)
+
 @router.post("/{notification_id}/read", response_model=NotificationRead)
 def mark_notification_as_read(
     notification_id: int,
@@ -194,13 +213,7 @@ async def accept_invitation(
             detail="This invitation has already been processed"
         )
     
-    # Get the role from extra_data
-    try:
-        extra_data = json.loads(notification.extra_data or '{}')
-        role_str = extra_data.get('role', 'USER').upper()
-        role = UserRole[role_str]
-    except (json.JSONDecodeError, KeyError):
-        role = UserRole.USER
+    role = _invite_role(notification)
     
     # Create membership
     membership = crud_membership.create_membership(
@@ -269,33 +282,19 @@ async def verify_invite_token(
     Also handles the case where user is not authenticated.
     """
     # Find notification with matching token
-    notifications = crud_notification.get_notifications_by_type(
-        db=db,
-        type=NotificationType.ORGANIZATION_INVITE,
-        status=NotificationStatus.PENDING
-    )
-    
-    target_notification = None
-    for notification in notifications:
-        try:
-            extra_data = json.loads(notification.extra_data or '{}')
-            if extra_data.get('invite_token') == token:
-                if is_invitation_expired(notification):
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail="Invitation has expired"
-                    )
-                target_notification = notification
-                break
-        except json.JSONDecodeError:
-            continue
-    
+    target_notification = crud_notification.get_notification_by_invite_token(db=db, token=token)
     if not target_notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid or expired invitation token"
         )
 
+    if is_invitation_expired(target_notification):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invitation has expired"
+        )
+
     # Get target user's email
     target_user = get_user(db, user_id=target_notification.user_id)
     if not target_user:
@@ -306,19 +305,15 @@ async def verify_invite_token(
 
     # Get entity details based on notification type
     entity_info = {}
-    try:
-        extra_data = json.loads(target_notification.extra_data or '{}')
-        if target_notification.type == NotificationType.ORGANIZATION_INVITE:
-            org = crud_organization.get_organization(db, organization_id=target_notification.organization_id)
-            if org:
-                entity_info = {
-                    "entity_type": "organization",
-                    "entity_id": org.id,
-                    "entity_name": org.name,
-                    "role": extra_data.get('role', 'user')
-                }
-    except Exception:
-        pass
+    if target_notification.type == NotificationType.ORGANIZATION_INVITE:
+        org = crud_organization.get_organization(db, organization_id=target_notification.organization_id)
+        if org:
+            entity_info = {
+                "entity_type": "organization",
+                "entity_id": org.id,
+                "entity_name": org.name,
+                "role": _invite_role(target_notification).value
+            }
 
     # If user is not authenticated, return notification with target email and entity info
     if not current_user:
@@ -351,22 +346,7 @@ async def accept_invite_by_token(
     Accept an invitation using a token.
     """
     # Find notification with matching token
-    notifications = crud_notification.get_notifications_by_type(
-        db=db,
-        type=NotificationType.ORGANIZATION_INVITE,
-        status=NotificationStatus.PENDING
-    )
-    
-    notification = None
-    for n in notifications:
-        try:
-            extra_data = json.loads(n.extra_data or '{}')
-            if extra_data.get('invite_token') == token:
-                notification = n
-                break
-        except json.JSONDecodeError:
-            continue
-    
+    notification = crud_notification.get_notification_by_invite_token(db=db, token=token)
     if not notification:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -395,13 +375,7 @@ async def accept_invite_by_token(
             detail="This invitation was sent to a different email address"
         )
     
-    # Get the role from extra_data
-    try:
-        extra_data = json.loads(notification.extra_data or '{}')
-        role_str = extra_data.get('role', 'USER').upper()
-        role = UserRole[role_str]
-    except (json.JSONDecodeError, KeyError):
-        role = UserRole.USER
+    role = _invite_role(notification)
     
     # Create membership
     membership = crud_membership.create_membership(
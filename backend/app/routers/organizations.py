@@ -2,12 +2,21 @@
 
 # backend/app/routers/organizations.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from .. import schemas, crud, models
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_read_db, get_current_user, get_current_principal
 from ..models.user import UserRole  # Ensure correct import if needed
+from ..core.config import settings
+from ..utils.cache import TTLCache
+from ..authorization import organization_admin, organization_manager, organization_member, read_organization_member
+from ..utils.email import enqueue_organization_invite_email
 
 # Rest of the code remains the same
 
@@ -15,10 +24,15 @@ from ..models.user import UserRole  # Ensure correct import if needed
 router = APIRouter(
     prefix="/organizations",
     tags=["organizations"],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     responses={404: {"description": "Not found"}},
 )
 
+# Organization heatmaps merge the hour-of-week buckets of every queue; cache the result.
+_heatmap_cache = TTLCache(maxsize=256, ttl=settings.HEATMAP_CACHE_SECONDS)
+# Live dashboards are polled by every open browser; serve them from a short-lived cache.
+_live_cache = TTLCache(maxsize=256, ttl=settings.LIVE_CACHE_SECONDS)
+
 @router.post("/", response_model=schemas.OrganizationRead)
 def create_organization(
     organization: schemas.OrganizationCreate,
@@ -37,7 +51,7 @@ def create_organization(
 def read_organizations(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve a list of organizations.
@@ -48,7 +62,7 @@ def read_organizations(
 @router.get("/{organization_id}", response_model=schemas.OrganizationRead)
 def read_organization(
     organization_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Retrieve a specific organization by ID.
@@ -58,39 +72,198 @@ def read_organization(
         raise HTTPException(status_code=404, detail="Organization not found.")
     return organization
 
-@router.put("/{organization_id}", response_model=schemas.OrganizationRead)
+@router.put("/{organization_id}", response_model=schemas.OrganizationRead,
+            dependencies=[Depends(organization_manager)])
 def update_organization(
     organization_id: int,
     updates: schemas.OrganizationUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """
     Update an organization. Only ADMIN and BUSINESS_OWNER members can perform this action.
     """
-    # Check membership and role
-    membership = crud.get_membership(db, organization_id, current_user.id)
-    if not membership or membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
-        raise HTTPException(status_code=403, detail="Insufficient permissions.")
     organization = crud.update_organization(db, organization_id, updates)
     if not organization:
         raise HTTPException(status_code=404, detail="Organization not found.")
     return organization
 
-@router.delete("/{organization_id}", status_code=204)
+@router.delete("/{organization_id}", status_code=204, dependencies=[Depends(organization_admin)])
 def delete_organization(
     organization_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
     """
     Delete an organization. Only ADMIN members can perform this action.
     """
-    # Check membership and role
-    membership = crud.get_membership(db, organization_id, current_user.id)
-    if not membership or membership.role != models.UserRole.ADMIN:
-        raise HTTPException(status_code=403, detail="Insufficient permissions.")
     success = crud.delete_organization(db, organization_id)
     if not success:
         raise HTTPException(status_code=404, detail="Organization not found.")
     return
+
+@router.get("/{organization_id}/history/heatmap", dependencies=[Depends(read_organization_member)])
+def get_organization_heatmap(
+    organization_id: int,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Mean and P90 waiting time by day of week and hour of day (UTC) across all
+    queues of the organization.
+    """
+
+    def load():
+        queue_ids = [row[0] for row in db.query(models.Queue.id)
+                     .filter(models.Queue.organization_id == organization_id).all()]
+        return crud.get_wait_heatmap(db, queue_ids)
+
+    return _heatmap_cache.get_or_set(organization_id, load)
+
+@router.get("/{organization_id}/live", dependencies=[Depends(organization_member)])
+def get_organization_live(
+    organization_id: int,
+    response: Response,
+    db: Session = Depends(get_db)
+):
+    """
+    Live per-service and per-queue counts, now-serving tokens, throughput and
+    P50/P90 waits for an organization dashboard, in a single response.
+    """
+
+    response.headers["Cache-Control"] = f"private, max-age={settings.LIVE_CACHE_SECONDS}"
+    return _live_cache.get_or_set(organization_id, lambda: crud.get_organization_live(db, organization_id))
+
+@router.get("/{organization_id}/invites", response_model=List[schemas.NotificationRead],
+            dependencies=[Depends(organization_manager)])
+def read_organization_invites(
+    organization_id: int,
+    role: Optional[models.UserRole] = None,
+    status: Optional[models.NotificationStatus] = models.NotificationStatus.PENDING,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """
+    List the organization's invitations, pending ones by default, optionally for one role.
+    Only ADMIN and BUSINESS_OWNER members can perform this action.
+    """
+    return crud.get_organization_invites(
+        db, organization_id, status=status, role=role.value if role else None, skip=skip, limit=limit
+    )
+
+async def _bulk_invite_rows(request: Request) -> List[dict]:
+    """
+    Read invite rows from a CSV upload (header ``email,role``) or a JSON list,
+    bare or wrapped as ``{"invites": [...]}``.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "")
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Invite list must be UTF-8 encoded.")
+    if "csv" in content_type or "text/plain" in content_type:
+        reader = csv.DictReader(io.StringIO(text))
+        if not reader.fieldnames or "email" not in [name.strip().lower() for name in reader.fieldnames]:
+            raise HTTPException(status_code=400, detail="CSV must have an 'email' column.")
+        return [{(key or "").strip().lower(): (value or "").strip() for key, value in row.items()}
+                for row in reader]
+    try:
+        rows = json.loads(text)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invite list must be CSV or a JSON list.")
+    if isinstance(rows, dict):
+        rows = rows.get("invites")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Invite list must be CSV or a JSON list.")
+    return rows
+
+@router.post("/{organization_id}/invites/bulk", response_model=schemas.BulkInviteResponse,
+             dependencies=[Depends(organization_manager)])
+def bulk_invite(
+    organization_id: int,
+    rows: List[dict] = Depends(_bulk_invite_rows),
+    db: Session = Depends(get_db)
+):
+    """
+    Invite many users at once from a CSV file or a JSON list of {email, role}.
+    Users are resolved with one query, memberships and pending invites are checked
+    set-wise, and all invites and their emails are written in one transaction.
+    Returns a result for every input row.
+    """
+    organization = crud.get_organization(db, organization_id)
+    if not organization:
+        raise HTTPException(status_code=404, detail="Organization not found.")
+
+    if len(rows) > settings.BULK_INVITE_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {settings.BULK_INVITE_MAX_ROWS} invites can be sent at once."
+        )
+
+    roles = {role.value for role in models.UserRole}
+    results: List[schemas.BulkInviteResult] = []
+    valid = []
+    for index, raw in enumerate(rows, start=1):
+        try:
+            if isinstance(raw, dict) and not raw.get("role"):
+                raw = {**raw, "role": "user"}
+            row = schemas.BulkInviteRow.model_validate(raw)
+        except ValidationError:
+            results.append(schemas.BulkInviteResult(
+                row=index, email=str(raw.get("email", "")) if isinstance(raw, dict) else "",
+                status="invalid", detail="Each row needs an email and an optional role."
+            ))
+            continue
+        email, role = row.email.strip(), row.role.strip().lower()
+        if not email or role not in roles:
+            results.append(schemas.BulkInviteResult(
+                row=index, email=email, status="invalid",
+                detail="Missing email." if not email else f"Unknown role '{row.role}'."
+            ))
+            continue
+        valid.append((index, email, role))
+
+    users = {user.email: user for user in crud.get_users_by_emails(db, list({email for _, email, _ in valid}))}
+    user_ids = [user.id for user in users.values()]
+    members = crud.get_member_user_ids(db, organization_id, user_ids)
+    pending = crud.get_pending_invite_user_ids(db, organization_id, user_ids)
+
+    invites = []
+    seen = set()
+    for index, email, role in valid:
+        user = users.get(email)
+        if not user:
+            results.append(schemas.BulkInviteResult(row=index, email=email, status="user_not_found"))
+        elif user.id in members:
+            results.append(schemas.BulkInviteResult(row=index, email=email, status="already_member"))
+        elif user.id in pending:
+            results.append(schemas.BulkInviteResult(row=index, email=email, status="already_invited"))
+        elif user.id in seen:
+            results.append(schemas.BulkInviteResult(row=index, email=email, status="duplicate"))
+        else:
+            seen.add(user.id)
+            invites.append((index, user, role))
+
+    try:
+        notifications = crud.create_organization_invites(
+            db, organization_id, [(user.id, role) for _, user, role in invites]
+        )
+        for (index, user, role), notification in zip(invites, notifications):
+            enqueue_organization_invite_email(
+                db,
+                email_to=user.email,
+                organization_name=organization.name,
+                invite_token=notification.invite_token,
+                role=role,
+                commit=False
+            )
+            results.append(schemas.BulkInviteResult(
+                row=index, email=user.email, status="invited", notification_id=notification.id
+            ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    crud.push_unread_counts(db, [user.id for _, user, _ in invites])
+
+    results.sort(key=lambda result: result.row)
+    return schemas.BulkInviteResponse(invited=len(invites), results=results)
@@ -2,14 +2,16 @@
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
+from datetime import datetime
 from .. import schemas, crud, models
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_read_db, get_current_principal
+from ..authorization import QueueScope, view_queue
 
 router = APIRouter(
     prefix="/queues/{queue_id}/history",
     tags=["queue history"],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     responses={404: {"description": "Not found"}},
 )
 
@@ -18,46 +20,36 @@ def read_queue_history(
     queue_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    since: Optional[datetime] = None,
+    db: Session = Depends(get_read_db),
+    scope: QueueScope = Depends(view_queue)
 ):
     """
-    Get historical records for a specific queue.
+    Get historical records for a specific queue, newest first.
+    Pass ``since`` to only read history removed after that moment.
     """
-    queue = crud.get_queue(db, queue_id)
-    if not queue:
-        raise HTTPException(status_code=404, detail="Queue not found")
-    
-    # Check permissions
-    if queue.organization_id:
-        membership = crud.get_membership(db, queue.organization_id, current_user.id)
-        if not membership:
-            raise HTTPException(status_code=403, detail="Not a member of this organization")
-    elif queue.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to view this queue's history")
-    
-    return crud.get_queue_history(db, queue_id, skip=skip, limit=limit)
+    return crud.get_queue_history(db, queue_id, skip=skip, limit=limit, since=since)
+
+@router.get("/heatmap")
+def get_queue_heatmap(
+    queue_id: int,
+    db: Session = Depends(get_read_db),
+    scope: QueueScope = Depends(view_queue)
+):
+    """
+    Mean and P90 waiting time by day of week and hour of day (UTC), over the
+    whole history of the queue. Reads at most 168 pre-aggregated buckets.
+    """
+    return crud.get_wait_heatmap(db, [queue_id])
 
 @router.get("/stats")
 def get_queue_stats(
     queue_id: int,
     lookback_hours: int = 24,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: Session = Depends(get_read_db),
+    scope: QueueScope = Depends(view_queue)
 ):
     """
     Get statistics about queue waiting times.
     """
-    queue = crud.get_queue(db, queue_id)
-    if not queue:
-        raise HTTPException(status_code=404, detail="Queue not found")
-    
-    # Check permissions
-    if queue.organization_id:
-        membership = crud.get_membership(db, queue.organization_id, current_user.id)
-        if not membership:
-            raise HTTPException(status_code=403, detail="Not a member of this organization")
-    elif queue.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to view this queue's statistics")
-    
     return crud.get_queue_history_stats(db, queue_id, lookback_hours) 
\ No newline at end of file
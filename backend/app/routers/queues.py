@@ -5,13 +5,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional, Tuple
 from .. import schemas, crud, models
-from ..dependencies import get_db, get_current_user
-from ..utils.kafka import publish_event
+from ..dependencies import get_db, get_read_db, get_current_user, get_current_principal
+from ..limits import limit_join
+from ..authorization import (
+    MANAGER_ROLES, QueueScope, get_organization_role, manage_queue, staff_queue
+)
+from ..utils.events import publish_event
 
 router = APIRouter(
     prefix="/queues",
     tags=["queues"],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     responses={404: {"description": "Not found"}},
 )
 
@@ -35,14 +39,14 @@ def create_queue(queue: schemas.QueueCreate, db: Session = Depends(get_db),
 
     # Check membership if queue is tied to an organization or service
     if service_id or organization_id:
-        membership = crud.get_membership(db, organization_id, current_user.id)
-        if not membership:
+        role = get_organization_role(db, current_user.id, organization_id)
+        if role is None:
             raise HTTPException(status_code=403, detail="Insufficient permissions.")
-        if service_id and membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
+        if service_id and role not in MANAGER_ROLES:
+            role = get_organization_role(db, current_user.id, organization_id, fresh=True)
+        if service_id and role not in MANAGER_ROLES:
             raise HTTPException(status_code=403, detail="Insufficient permissions to create queue for this service.")
         # For general queues, any member can create
-        if organization_id and not service_id and membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER, models.UserRole.USER]:
-            raise HTTPException(status_code=403, detail="Insufficient permissions to create general queue.")
 
     # Create the queue
     new_queue = crud.create_queue(db, queue, current_user.id, service_id=service_id, organization_id=organization_id)
@@ -51,13 +55,13 @@ def create_queue(queue: schemas.QueueCreate, db: Session = Depends(get_db),
 @router.get("/", response_model=List[schemas.QueueRead])
 def read_queues(service_id: Optional[int] = None, organization_id: Optional[int] = None,
                 user_id: Optional[int] = None, skip: int = 0, limit: int = 100,
-                db: Session = Depends(get_db)):
+                db: Session = Depends(get_read_db)):
     queues = crud.get_queues(db, service_id=service_id, organization_id=organization_id,
                               user_id=user_id, skip=skip, limit=limit)
     return queues
 
 @router.get("/{queue_id}", response_model=schemas.QueueRead)
-def read_queue(queue_id: int, db: Session = Depends(get_db)):
+def read_queue(queue_id: int, db: Session = Depends(get_read_db)):
     queue = (
         db.query(models.Queue)
         .options(
@@ -74,62 +78,40 @@ def read_queue(queue_id: int, db: Session = Depends(get_db)):
 @router.put("/{queue_id}", response_model=schemas.QueueRead)
 def update_queue(queue_id: int, updates: schemas.QueueUpdate,
                  db: Session = Depends(get_db),
-                 current_user: models.User = Depends(get_current_user)):
+                 scope: QueueScope = Depends(manage_queue)):
     queue = crud.get_queue(db, queue_id)
     if not queue:
         raise HTTPException(status_code=404, detail="Queue not found.")
 
-    # Determine organization id from the queue (if tied to a service, use its organization)
-    organization_id = queue.organization_id if not queue.service_id else queue.service.organization_id
-
-    if queue.service_id or queue.organization_id:
-        membership = crud.get_membership(db, organization_id, current_user.id)
-        if not membership:
-            raise HTTPException(status_code=403, detail="Insufficient permissions.")
-        if queue.service_id and membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
-            raise HTTPException(status_code=403, detail="Insufficient permissions to update this queue.")
-        if queue.organization_id and membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER, models.UserRole.USER]:
-            raise HTTPException(status_code=403, detail="Insufficient permissions to update this queue.")
-    else:
-        # For queues tied directly to the user
-        if queue.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="You can only update your own queues.")
-
+    was_paused = queue.status == models.QueueStatus.PAUSED
     updated_queue = crud.update_queue(db, queue_id, updates)
+    if updated_queue.status == models.QueueStatus.PAUSED and not was_paused:
+        crud.notify_queue_waiters(
+            db, queue_id,
+            title="Queue paused",
+            message=f"The queue '{updated_queue.name}' has been paused. You keep your place in line."
+        )
     return updated_queue
 
+@router.post("/{queue_id}/notify", response_model=schemas.QueueUpdateNoticeResult)
+def notify_queue(queue_id: int, notice: schemas.QueueUpdateNotice,
+                 db: Session = Depends(get_db),
+                 scope: QueueScope = Depends(manage_queue)):
+    """
+    Send a queue update (e.g. a delay) to everyone currently waiting in the queue.
+    """
+    notified = crud.notify_queue_waiters(db, queue_id, title=notice.title, message=notice.message)
+    return schemas.QueueUpdateNoticeResult(notified=notified)
+
 @router.delete("/{queue_id}/items/{item_id}", status_code=204)
 async def remove_queue_item(queue_id: int, item_id: int,
                             db: Session = Depends(get_db),
-                            current_user: models.User = Depends(get_current_user)):
-    queue = crud.get_queue(db, queue_id)
-    if not queue:
-        raise HTTPException(status_code=404, detail="Queue not found.")
-
+                            scope: QueueScope = Depends(staff_queue)):
     # Get the queue item before deletion to calculate waiting time
     queue_item = crud.get_queue_item(db, item_id)
     if not queue_item:
         raise HTTPException(status_code=404, detail="Queue item not found.")
 
-    # Allow global admins to remove items from any queue
-    if current_user.role == models.UserRole.ADMIN:
-        pass  # Admin can proceed
-    else:
-        # Determine if the queue is organization/service tied or user tied
-        org_id = None
-        if queue.organization_id:
-            org_id = queue.organization_id
-        elif queue.service_id and queue.service:
-            org_id = queue.service.organization_id
-
-        if org_id:
-            membership = crud.get_membership(db, org_id, current_user.id)
-            if not membership or membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
-                raise HTTPException(status_code=403, detail="Insufficient permissions to remove items from this queue.")
-        else:
-            if queue.user_id != current_user.id:
-                raise HTTPException(status_code=403, detail="You are not the owner of this queue.")
-
     # Update the waiting time before deletion
     if queue_item.status != models.QueueItemStatus.COMPLETED:
         queue_item.status = models.QueueItemStatus.COMPLETED
@@ -159,31 +141,13 @@ async def remove_queue_item(queue_id: int, item_id: int,
 
 @router.delete("/{queue_id}", status_code=204)
 def delete_queue(queue_id: int, db: Session = Depends(get_db),
-                 current_user: models.User = Depends(get_current_user)):
-    queue = crud.get_queue(db, queue_id)
-    if not queue:
-        raise HTTPException(status_code=404, detail="Queue not found.")
-
-    organization_id = queue.organization_id if not queue.service_id else queue.service.organization_id
-
-    if queue.service_id or queue.organization_id:
-        membership = crud.get_membership(db, organization_id, current_user.id)
-        if not membership:
-            raise HTTPException(status_code=403, detail="Insufficient permissions.")
-        if queue.service_id and membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
-            raise HTTPException(status_code=403, detail="Insufficient permissions to delete this queue.")
-        if queue.organization_id and membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER, models.UserRole.USER]:
-            raise HTTPException(status_code=403, detail="Insufficient permissions to delete this queue.")
-    else:
-        if queue.user_id != current_user.id:
-            raise HTTPException(status_code=403, detail="You can only delete your own queues.")
-
+                 scope: QueueScope = Depends(manage_queue)):
     success = crud.delete_queue(db, queue_id)
     if not success:
         raise HTTPException(status_code=404, detail="Queue not found.")
     return
 
-@router.post("/{queue_id}/join", response_model=schemas.QueueItemRead)
+@router.post("/{queue_id}/join", response_model=schemas.QueueItemRead, dependencies=[Depends(limit_join)])
 async def join_queue(
     queue_id: int,
     token: Optional[str] = None,
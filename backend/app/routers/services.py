@@ -3,7 +3,8 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session, joinedload
 from typing import List
 from .. import schemas, crud, models
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_read_db, get_current_user, get_current_principal
+from ..authorization import organization_admin, organization_manager
 
 # Set up module-level logger
 logger = logging.getLogger(__name__)
@@ -12,7 +13,7 @@ logger.setLevel(logging.DEBUG)
 router = APIRouter(
     prefix="/services",
     tags=["services"],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     responses={404: {"description": "Not found"}},
 )
 
@@ -20,7 +21,7 @@ router = APIRouter(
 # 1. New Endpoint: Get all services for organizations that the user is a member of.
 @router.get("/all", response_model=List[schemas.ServiceRead])
 def read_services_for_user(
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
         current_user: models.User = Depends(get_current_user)
 ):
     logger.info(f"GET /services/all called by user {current_user.id}")
@@ -53,7 +54,7 @@ def read_services_for_user(
 
 
 # 2. Create a new service (requires organization_id in query)
-@router.post("/", response_model=schemas.ServiceRead)
+@router.post("/", response_model=schemas.ServiceRead, dependencies=[Depends(organization_manager)])
 def create_service(
         organization_id: int,
         service: schemas.ServiceCreate,
@@ -61,10 +62,6 @@ def create_service(
         current_user: models.User = Depends(get_current_user)
 ):
     logger.info(f"POST /services/ called by user {current_user.id} for organization {organization_id}")
-    membership = crud.get_membership(db, organization_id, current_user.id)
-    if not membership or membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
-        logger.warning(f"User {current_user.id} lacks permission to create service in organization {organization_id}")
-        raise HTTPException(status_code=403, detail="Insufficient permissions.")
     try:
         new_service = crud.create_service(db, service, organization_id, current_user.id)
         logger.info(
@@ -81,7 +78,7 @@ def read_services(
         organization_id: int,
         skip: int = 0,
         limit: int = 100,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     logger.info(
         f"GET /services/ called to fetch services for organization {organization_id} (skip={skip}, limit={limit})")
@@ -99,7 +96,7 @@ def read_services(
 def read_service(
         organization_id: int,
         service_id: int,
-        db: Session = Depends(get_db)
+        db: Session = Depends(get_read_db)
 ):
     logger.info(f"GET /services/{service_id} called for organization {organization_id}")
     try:
@@ -115,7 +112,7 @@ def read_service(
 
 
 # 5. Update a service by service_id (requires proper permissions)
-@router.put("/{service_id}", response_model=schemas.ServiceRead)
+@router.put("/{service_id}", response_model=schemas.ServiceRead, dependencies=[Depends(organization_manager)])
 def update_service(
         organization_id: int,
         service_id: int,
@@ -124,11 +121,6 @@ def update_service(
         current_user: models.User = Depends(get_current_user)
 ):
     logger.info(f"PUT /services/{service_id} called by user {current_user.id} for organization {organization_id}")
-    membership = crud.get_membership(db, organization_id, current_user.id)
-    if not membership or membership.role not in [models.UserRole.ADMIN, models.UserRole.BUSINESS_OWNER]:
-        logger.warning(
-            f"User {current_user.id} lacks permission to update service {service_id} in organization {organization_id}")
-        raise HTTPException(status_code=403, detail="Insufficient permissions.")
     try:
         service = crud.get_service(db, service_id)
     except Exception as e:
@@ -147,7 +139,7 @@ def update_service(
 
 
 # 6. Delete a service by service_id (requires ADMIN permission)
-@router.delete("/{service_id}", status_code=204)
+@router.delete("/{service_id}", status_code=204, dependencies=[Depends(organization_admin)])
 def delete_service(
         organization_id: int,
         service_id: int,
@@ -155,11 +147,6 @@ def delete_service(
         current_user: models.User = Depends(get_current_user)
 ):
     logger.info(f"DELETE /services/{service_id} called by user {current_user.id} for organization {organization_id}")
-    membership = crud.get_membership(db, organization_id, current_user.id)
-    if not membership or membership.role != models.UserRole.ADMIN:
-        logger.warning(
-            f"User {current_user.id} lacks permission to delete service {service_id} in organization {organization_id}")
-        raise HTTPException(status_code=403, detail="Insufficient permissions.")
     try:
         service = crud.get_service(db, service_id)
     except Exception as e:
@@ -1,65 +1,36 @@
 # backend/app/routers/stats.py
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from ..dependencies import get_db
-from .. import models
+from typing import Optional
+from ..dependencies import get_read_db
+from .. import crud
+from ..core.config import settings
+from ..utils.cache import TTLCache
 
 router = APIRouter(
     prefix="/stats",
     tags=["stats"],
 )
 
-@router.get("/")
-def get_stats(db: Session = Depends(get_db)):
-    # 1) Top queues by number of queue items
-    # This query counts how many QueueItems are in each Queue, sorts desc
-    top_queues_query = (
-        db.query(
-            models.Queue.id,
-            models.Queue.name,
-            func.count(models.QueueItem.id).label("item_count")
-        )
-        .outerjoin(models.QueueItem, models.Queue.id == models.QueueItem.queue_id)
-        .group_by(models.Queue.id, models.Queue.name)
-        .order_by(desc("item_count"))
-        .limit(5)
-    )
-    top_queues = top_queues_query.all()  # returns a list of (id, name, item_count)
+# Leaderboards are read from pre-aggregated counters and additionally cached
+# per process, so repeated dashboard loads don't touch the database at all.
+_leaderboard_cache = TTLCache(maxsize=128, ttl=settings.LEADERBOARD_CACHE_SECONDS)
 
-    # 2) Top organizations by total queue items across all their queues
-    # We'll join organizations -> queues -> queue_items, then group by org
-    top_orgs_query = (
-        db.query(
-            models.Organization.id,
-            models.Organization.name,
-            func.count(models.QueueItem.id).label("total_items")
-        )
-        .outerjoin(models.Queue, models.Organization.id == models.Queue.organization_id)
-        .outerjoin(models.QueueItem, models.Queue.id == models.QueueItem.queue_id)
-        .group_by(models.Organization.id, models.Organization.name)
-        .order_by(desc("total_items"))
-        .limit(5)
-    )
-    top_orgs = top_orgs_query.all()
+@router.get("/")
+def get_stats(
+    window_days: Optional[int] = Query(default=None, ge=1, le=crud.leaderboard.DAILY_RETENTION_DAYS),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Top queues and organizations by item volume. Without ``window_days`` the counts are
+    the items currently queued; with it, the items that joined during the last N days.
+    """
+    def build():
+        return {
+            "period": "live" if window_days is None else f"{window_days}d",
+            "top_queues": crud.get_top_queues(db, limit=5, window_days=window_days),
+            "top_organizations": crud.get_top_organizations(db, limit=5, window_days=window_days),
+        }
 
-    # Return them as JSON. You can shape it as you like:
-    return {
-        "top_queues": [
-            {
-                "queue_id": q.id,
-                "queue_name": q.name,
-                "count": q.item_count
-            }
-            for q in top_queues
-        ],
-        "top_organizations": [
-            {
-                "org_id": o.id,
-                "org_name": o.name,
-                "count": o.total_items
-            }
-            for o in top_orgs
-        ]
-    }
+    return _leaderboard_cache.get_or_set(window_days, build)
@@ -0,0 +1,29 @@
+# backend/app/routers/sync.py
+
+import hmac
+from fastapi import APIRouter, Depends, Header, HTTPException
+from sqlalchemy.orm import Session
+from typing import Optional
+from .. import schemas, crud
+from ..core.config import settings
+from ..dependencies import get_db
+
+router = APIRouter(
+    prefix="/sync",
+    tags=["sync"],
+)
+
+def verify_sync_token(x_sync_token: Optional[str] = Header(None)):
+    if not settings.SYNC_TOKEN:
+        raise HTTPException(status_code=404, detail="Sync is not enabled on this server")
+    if not x_sync_token or not hmac.compare_digest(x_sync_token, settings.SYNC_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid sync token")
+
+@router.post("/ingest", response_model=schemas.SyncAck, dependencies=[Depends(verify_sync_token)])
+def ingest_changes(batch: schemas.SyncBatch, db: Session = Depends(get_db)):
+    """
+    Apply a batch of changes captured on an edge node. Idempotent: changes the
+    node already had acknowledged are skipped.
+    """
+    acknowledged, applied = crud.apply_sync_batch(db, batch.node_id, batch.changes)
+    return schemas.SyncAck(acknowledged=acknowledged, applied=applied)
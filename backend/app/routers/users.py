@@ -4,13 +4,13 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from .. import schemas, crud
-from ..dependencies import get_db, get_current_user
+from ..dependencies import get_db, get_read_db, get_current_user, get_current_principal
 from ..models.user import UserRole
 
 router = APIRouter(
     prefix="/users",
     tags=["users"],
-    dependencies=[Depends(get_current_user)],
+    dependencies=[Depends(get_current_principal)],
     responses={404: {"description": "Not found"}},
 )
 
@@ -19,7 +19,7 @@ def get_users(
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=100, ge=1, le=100),
     search: Optional[str] = Query(default=None, min_length=1),
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: schemas.UserRead = Depends(get_current_user)
 ):
     """
@@ -35,7 +35,7 @@ def get_users(
     }
 
 @router.get("/{user_id}", response_model=schemas.UserRead)
-def read_user(user_id: int, db: Session = Depends(get_db)):
+def read_user(user_id: int, db: Session = Depends(get_read_db)):
     db_user = crud.get_user(db, user_id=user_id)
     if db_user is None:
         raise HTTPException(status_code=404, detail="User not found")
@@ -1,6 +1,11 @@
 import asyncio
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-from ..utils.kafka import kafka_consumer_loop
+from typing import Dict, Optional, Set
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query, status
+from .. import crud
+from ..database import SessionLocal
+from ..utils.events import consume_events, TOPIC_NOTIFICATIONS
+from ..utils.notifications import UNREAD_COUNT_EVENT
+from ..utils.principal import decode_principal
 
 router = APIRouter()
 
@@ -25,10 +30,10 @@ manager = ConnectionManager()
 async def websocket_queues(websocket: WebSocket):
     await manager.connect(websocket)
     try:
-        async def kafka_callback(event_data: dict) -> None:
+        async def event_callback(event_data: dict) -> None:
             await manager.broadcast(event_data)
 
-        consumer_task = asyncio.create_task(kafka_consumer_loop(kafka_callback))
+        consumer_task = asyncio.create_task(consume_events(event_callback))
 
         while True:
             # Keep the connection alive; no incoming messages are processed here by default.
@@ -37,3 +42,90 @@ async def websocket_queues(websocket: WebSocket):
     except WebSocketDisconnect:
         manager.disconnect(websocket)
         consumer_task.cancel()
+
+class UserConnectionManager:
+    """
+    WebSocket connections grouped by user. One event consumer per process reads
+    the notification topic and forwards each event to its user's connections only.
+    """
+    def __init__(self) -> None:
+        self.connections: Dict[int, Set[WebSocket]] = {}
+        self.consumer_task: Optional[asyncio.Task] = None
+
+    async def connect(self, user_id: int, websocket: WebSocket) -> None:
+        await websocket.accept()
+        self.connections.setdefault(user_id, set()).add(websocket)
+        if self.consumer_task is None or self.consumer_task.done():
+            self.consumer_task = asyncio.create_task(
+                consume_events(self.dispatch, topic=TOPIC_NOTIFICATIONS, group_id=None)
+            )
+
+    def disconnect(self, user_id: int, websocket: WebSocket) -> None:
+        sockets = self.connections.get(user_id)
+        if sockets:
+            sockets.discard(websocket)
+            if not sockets:
+                del self.connections[user_id]
+        if not self.connections and self.consumer_task:
+            self.consumer_task.cancel()
+            self.consumer_task = None
+
+    async def send_to_user(self, user_id: int, message: dict) -> None:
+        for connection in list(self.connections.get(user_id, ())):
+            try:
+                await connection.send_json(message)
+            except Exception:
+                self.disconnect(user_id, connection)
+
+    async def dispatch(self, event: dict) -> None:
+        payload = event.get("payload") or {}
+        if "recipients" in payload:
+            # Batched fan-out: deliver each connected recipient its own entry.
+            shared = {key: value for key, value in payload.items() if key != "recipients"}
+            for recipient in payload["recipients"]:
+                if recipient.get("user_id") in self.connections:
+                    await self.send_to_user(recipient["user_id"], {
+                        "event_type": event.get("event_type"),
+                        "payload": {**shared, **recipient}
+                    })
+            return
+        user_id = payload.get("user_id")
+        if user_id is not None:
+            await self.send_to_user(user_id, event)
+
+user_manager = UserConnectionManager()
+
+def _user_id_from_token(token: str) -> Optional[int]:
+    principal = decode_principal(token)
+    return principal.id if principal else None
+
+@router.websocket("/ws/notifications")
+async def websocket_notifications(websocket: WebSocket, token: str = Query(...)):
+    """
+    Per-user channel for unread notification counts. Browsers can't set headers on
+    WebSockets, so the access token is passed as a query parameter. The current
+    count is sent right after connecting, then again whenever it changes.
+    """
+    user_id = _user_id_from_token(token)
+    db = SessionLocal()
+    try:
+        user = crud.get_user(db, user_id=user_id) if user_id is not None else None
+        unread = crud.get_unread_count(db, user_id) if user else 0
+    finally:
+        db.close()
+    if not user:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await user_manager.connect(user_id, websocket)
+    try:
+        await websocket.send_json({
+            "event_type": UNREAD_COUNT_EVENT,
+            "payload": {"user_id": user_id, "unread_count": unread}
+        })
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        user_manager.disconnect(user_id, websocket)
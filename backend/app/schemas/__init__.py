@@ -2,12 +2,18 @@
 from .queue_item import QueueItemCreate, QueueItemRead
 from .user import UserBase, UserCreate, UserUpdate, UserRead, UserList
 from .membership import MembershipBase, MembershipCreate, MembershipUpdate, MembershipRead
-from .token import Token, TokenData
+from .token import Token, TokenData, RefreshTokenRequest
 from .service import ServiceBase, ServiceCreate, ServiceUpdate, ServiceRead
 from .queue import QueueBase, QueueCreate, QueueUpdate, QueueRead
 from .organization import OrganizationBase, OrganizationCreate, OrganizationUpdate, OrganizationRead, OrganizationShort
 from .queue_history import QueueHistoryRead, QueueHistoryBase, QueueHistoryCreate
-from .notification import NotificationCreate, NotificationUpdate, NotificationRead
+from .notification import (
+    NotificationCreate, NotificationUpdate, NotificationRead,
+    BulkInviteRow, BulkInviteResult, BulkInviteResponse,
+    QueueUpdateNotice, QueueUpdateNoticeResult,
+    InviteData, QueueUpdateData, SystemNotificationData, EXTRA_DATA_SCHEMAS
+)
+from .sync import SyncChange, SyncBatch, SyncAck
 
 __all__ = [
     "OrganizationBase",
@@ -35,13 +41,26 @@ __all__ = [
     "MembershipRead",
     "Token",
     "TokenData",
+    "RefreshTokenRequest",
     "QueueHistoryRead",
     "QueueHistoryCreate",
     "QueueHistoryBase",
     "NotificationCreate",
     "NotificationUpdate",
     "NotificationRead",
+    "BulkInviteRow",
+    "BulkInviteResult",
+    "BulkInviteResponse",
+    "QueueUpdateNotice",
+    "QueueUpdateNoticeResult",
+    "InviteData",
+    "QueueUpdateData",
+    "SystemNotificationData",
+    "EXTRA_DATA_SCHEMAS",
     "UserList",
+    "SyncChange",
+    "SyncBatch",
+    "SyncAck",
 ]
 
 # Now rebuild models; by this time, ServiceRead is imported and defined.
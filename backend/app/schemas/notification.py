@@ -1,7 +1,39 @@
-from pydantic import BaseModel
-from typing import Optional, Dict, Any
+import json
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
+from typing import Optional, Dict, Any, List, Type
 from datetime import datetime
 from ..models.notification import NotificationType, NotificationStatus
+from ..models.user import UserRole
+
+class InviteData(BaseModel):
+    """extra_data of ORGANIZATION_INVITE, QUEUE_INVITE and SERVICE_INVITE."""
+    model_config = ConfigDict(extra="forbid")
+
+    role: str = UserRole.USER.value
+
+    @field_validator("role", mode="before")
+    @classmethod
+    def normalize_role(cls, value):
+        role = str(value).strip().lower()
+        if role not in {member.value for member in UserRole}:
+            raise ValueError(f"Unknown role '{value}'")
+        return role
+
+class QueueUpdateData(BaseModel):
+    """extra_data of QUEUE_UPDATE."""
+    model_config = ConfigDict(extra="allow")
+
+class SystemNotificationData(BaseModel):
+    """extra_data of SYSTEM_NOTIFICATION; free-form."""
+    model_config = ConfigDict(extra="allow")
+
+EXTRA_DATA_SCHEMAS: Dict[NotificationType, Type[BaseModel]] = {
+    NotificationType.ORGANIZATION_INVITE: InviteData,
+    NotificationType.QUEUE_INVITE: InviteData,
+    NotificationType.SERVICE_INVITE: InviteData,
+    NotificationType.QUEUE_UPDATE: QueueUpdateData,
+    NotificationType.SYSTEM_NOTIFICATION: SystemNotificationData,
+}
 
 class NotificationBase(BaseModel):
     type: NotificationType
@@ -10,11 +42,26 @@ class NotificationBase(BaseModel):
     organization_id: Optional[int] = None
     queue_id: Optional[int] = None
     service_id: Optional[int] = None
-    extra_data: Optional[str] = None
+    extra_data: Optional[Dict[str, Any]] = None
+
+    @field_validator("extra_data", mode="before")
+    @classmethod
+    def parse_extra_data(cls, value):
+        # Older clients send extra_data as a JSON-encoded string.
+        if isinstance(value, str):
+            value = json.loads(value) if value.strip() else None
+        return value
 
 class NotificationCreate(NotificationBase):
     user_id: int
 
+    @model_validator(mode="after")
+    def validate_extra_data(self):
+        schema = EXTRA_DATA_SCHEMAS.get(self.type)
+        if schema is not None and (self.extra_data is not None or schema is InviteData):
+            self.extra_data = schema.model_validate(self.extra_data or {}).model_dump()
+        return self
+
 class NotificationUpdate(BaseModel):
     status: NotificationStatus
     read_at: Optional[datetime] = None
@@ -27,4 +74,25 @@ class NotificationRead(NotificationBase):
     read_at: Optional[datetime] = None
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True 
+class BulkInviteRow(BaseModel):
+    email: str
+    role: str = "user"
+
+class BulkInviteResult(BaseModel):
+    row: int
+    email: str
+    status: str
+    notification_id: Optional[int] = None
+    detail: Optional[str] = None
+
+class BulkInviteResponse(BaseModel):
+    invited: int
+    results: List[BulkInviteResult]
+
+class QueueUpdateNotice(BaseModel):
+    title: str = "Queue update"
+    message: str
+
+class QueueUpdateNoticeResult(BaseModel):
+    notified: int
@@ -0,0 +1,22 @@
+# backend/app/schemas/sync.py
+
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal
+
+
+class SyncChange(BaseModel):
+    id: int
+    entity: Literal["queue", "queue_item", "queue_history"]
+    op: Literal["insert", "update", "upsert", "delete"]
+    payload: Dict[str, Any]
+
+
+class SyncBatch(BaseModel):
+    node_id: str = Field(..., min_length=1, max_length=64)
+    changes: List[SyncChange] = Field(..., max_length=5000)
+
+
+class SyncAck(BaseModel):
+    # Highest change id applied so far; the node may drop everything up to it
+    acknowledged: int
+    applied: int
@@ -0,0 +1,480 @@
+# backend/app/utils/archive.py
+#
+# Cold storage for queue_history. Rows older than a cutoff are moved out of the
+# database into zstd-compressed Arrow IPC files laid out as
+#   <archive_dir>/org=<organization_id|none>/month=<YYYY-MM>/part-<uuid>.arrow
+# and read back through memory maps for aggregate queries. The organization is the
+# queue's at archive time; the manifest maps each queue to the organization
+# directories holding its rows. Every file has a <file>.stats.json sidecar with the
+# removed_at and queue_id range of each record batch, so scans skip whole batches.
+
+import json
+import logging
+import os
+import threading
+import uuid
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.config import settings
+from ..crud.queue_history import EXPORT_COLUMNS
+from ..crud.queue_history_rollup import empty_histogram
+from ..models.queue_history_rollup import HISTOGRAM_EDGES
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+STATS_SUFFIX = ".stats.json"
+NO_ORGANIZATION = "none"
+
+# archive_dir -> ((manifest mtime, inode), horizon). Keyed on the file rather than a
+# TTL, so every process sees a new horizon as soon as the manifest is replaced.
+_horizons: Dict[str, Tuple[Tuple[int, int], Optional[datetime]]] = {}
+_horizons_lock = threading.Lock()
+
+
+def _require_arrow():
+    try:
+        import pyarrow  # noqa: F401
+        import numpy  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("The queue history archive requires the 'pyarrow' and 'numpy' packages") from exc
+
+
+def _schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("queue_id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("joined_at", pa.timestamp("us")),
+        ("removed_at", pa.timestamp("us")),
+        ("waiting_time", pa.float64()),
+    ])
+
+
+def read_manifest(archive_dir: str) -> Dict:
+    path = os.path.join(archive_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def archive_horizon(archive_dir: Optional[str] = None) -> Optional[datetime]:
+    """
+    Everything removed before the returned moment lives in the archive, not in the database.
+    """
+    archive_dir = archive_dir or settings.HISTORY_ARCHIVE_DIR
+    try:
+        stat = os.stat(os.path.join(archive_dir, MANIFEST_NAME))
+    except FileNotFoundError:
+        return None
+    version = (stat.st_mtime_ns, stat.st_ino)
+    with _horizons_lock:
+        cached = _horizons.get(archive_dir)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    horizon = read_manifest(archive_dir).get("horizon")
+    horizon = datetime.fromisoformat(horizon) if horizon else None
+    with _horizons_lock:
+        _horizons[archive_dir] = (version, horizon)
+    return horizon
+
+
+def _index_existing_files(archive_dir: str) -> Dict[str, List[str]]:
+    # Archives from before the queue index: read the queue_id column of every file once.
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    index: Dict[str, set] = {}
+    options = pa.ipc.IpcReadOptions(included_fields=[_schema().names.index("queue_id")])
+    for path in _partition_files(archive_dir, None, None, None, None):
+        org_dir = os.path.basename(os.path.dirname(os.path.dirname(path)))
+        with pa.memory_map(path, "r") as source:
+            queue_ids = pc.unique(pa.ipc.open_file(source, options=options).read_all()["queue_id"])
+        for queue_id in queue_ids.to_pylist():
+            index.setdefault(str(queue_id), set()).add(org_dir)
+    return {queue_id: sorted(orgs) for queue_id, orgs in index.items()}
+
+
+def _write_manifest(archive_dir: str, horizon: Optional[datetime], queue_orgs: Dict[int, set]) -> None:
+    manifest = read_manifest(archive_dir)
+    previous = manifest.get("horizon")
+    if horizon is not None and (not previous or datetime.fromisoformat(previous) < horizon):
+        manifest["horizon"] = horizon.isoformat()
+    if "queues" not in manifest:
+        manifest["queues"] = _index_existing_files(archive_dir)
+    queues = manifest["queues"]
+    for queue_id, orgs in queue_orgs.items():
+        queues[str(queue_id)] = sorted(set(queues.get(str(queue_id), [])) | orgs)
+    tmp_path = os.path.join(archive_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_path, os.path.join(archive_dir, MANIFEST_NAME))
+
+
+def _org_dir(organization_id: Optional[Union[int, str]]) -> str:
+    return f"org={NO_ORGANIZATION if organization_id is None else organization_id}"
+
+
+def _partition_dir(archive_dir: str, organization_id: Optional[int], removed_at: datetime) -> str:
+    return os.path.join(archive_dir, _org_dir(organization_id), f"month={removed_at:%Y-%m}")
+
+
+class _PartitionWriter:
+    """Writes one Arrow IPC file, renamed into place only once it is complete."""
+
+    def __init__(self, directory: str, batch_rows: int):
+        import pyarrow as pa
+
+        os.makedirs(directory, exist_ok=True)
+        self.final_path = os.path.join(directory, f"part-{uuid.uuid4().hex}.arrow")
+        self.tmp_path = self.final_path + ".tmp"
+        self.stats_path = self.final_path + STATS_SUFFIX
+        self.batch_stats: List[List] = []
+        self.schema = _schema()
+        self.batch_rows = batch_rows
+        self.rows: List[Tuple] = []
+        self.sink = pa.OSFile(self.tmp_path, "wb")
+        self.writer = pa.ipc.new_file(self.sink, self.schema,
+                                      options=pa.ipc.IpcWriteOptions(compression="zstd"))
+
+    def add(self, row: Tuple) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+
+        if not self.rows:
+            return
+        arrays = [pa.array([row[i] for row in self.rows], type=field.type)
+                  for i, field in enumerate(self.schema)]
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        removed = [row[4] for row in self.rows]
+        queues = [row[1] for row in self.rows]
+        self.batch_stats.append([min(removed).isoformat(), max(removed).isoformat(), min(queues), max(queues)])
+        self.rows.clear()
+
+    def close(self) -> str:
+        self._flush()
+        self.writer.close()
+        self.sink.close()
+        # The sidecar goes first: a file in place always has its batch stats.
+        with open(self.stats_path, "w", encoding="utf-8") as fh:
+            json.dump({"batches": self.batch_stats}, fh)
+        os.replace(self.tmp_path, self.final_path)
+        return self.final_path
+
+    def discard(self) -> None:
+        self.writer.close()
+        self.sink.close()
+        os.remove(self.tmp_path)
+
+
+def archive_queue_history(
+    db: Session,
+    older_than_days: Optional[int] = None,
+    archive_dir: Optional[str] = None,
+    batch_rows: int = 50000,
+) -> int:
+    """
+    Move queue_history rows removed more than ``older_than_days`` ago into the archive.
+    Files are fully written before the rows are deleted; if the delete fails the new
+    files are removed again. Only the ids that were written are deleted: rows that
+    commit below the cutoff while the archive runs stay for the next run.
+    Commits; returns the number of rows archived.
+    """
+    _require_arrow()
+    archive_dir = archive_dir or settings.HISTORY_ARCHIVE_DIR
+    older_than_days = settings.HISTORY_ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    os.makedirs(archive_dir, exist_ok=True)
+
+    history = models.QueueHistory.__table__
+    queues = models.Queue.__table__
+    query = select(queues.c.organization_id, *[history.c[name] for name in EXPORT_COLUMNS])\
+        .join(queues, queues.c.id == history.c.queue_id)\
+        .where(history.c.removed_at < cutoff)\
+        .order_by(queues.c.organization_id, history.c.removed_at)
+
+    writer = None
+    written_files: List[str] = []
+    current_partition = None
+    archived_ids = array("q")
+    queue_orgs: Dict[int, set] = {}
+    try:
+        result = db.execute(query.execution_options(stream_results=True, yield_per=batch_rows))
+        for organization_id, *row in result:
+            partition = _partition_dir(archive_dir, organization_id, row[4])
+            if partition != current_partition:
+                if writer:
+                    written_files.append(writer.close())
+                writer = _PartitionWriter(partition, batch_rows)
+                current_partition = partition
+            writer.add(tuple(row))
+            queue_orgs.setdefault(row[1], set()).add(_org_dir(organization_id))
+            archived_ids.append(row[0])
+        if writer:
+            written_files.append(writer.close())
+            writer = None
+
+        if archived_ids:
+            # Index the new files before their rows leave the database.
+            _write_manifest(archive_dir, None, queue_orgs)
+            for offset in range(0, len(archived_ids), batch_rows):
+                chunk = archived_ids[offset:offset + batch_rows].tolist()
+                db.execute(history.delete().where(history.c.removed_at < cutoff, history.c.id.in_(chunk)))
+        db.commit()
+    except Exception:
+        db.rollback()
+        if writer:
+            writer.discard()
+        for path in written_files:
+            os.remove(path)
+            os.remove(path + STATS_SUFFIX)
+        raise
+
+    _write_manifest(archive_dir, cutoff, {})
+    logger.info("Archived %s queue_history rows removed before %s into %s files",
+                len(archived_ids), cutoff.isoformat(), len(written_files))
+    return len(archived_ids)
+
+
+def _org_dirs(archive_dir: str, queue_ids: Optional[List[int]],
+              organization_id: Optional[Union[int, str]]) -> List[str]:
+    org_dirs = sorted(d for d in os.listdir(archive_dir) if d.startswith("org="))
+    if organization_id is not None:
+        org_dirs = [d for d in org_dirs if d == _org_dir(organization_id)]
+    if queue_ids is not None:
+        index = read_manifest(archive_dir).get("queues")
+        # Archives written before the queue index existed are scanned in full.
+        if index is not None:
+            wanted = set()
+            for queue_id in queue_ids:
+                wanted.update(index.get(str(queue_id), ()))
+            org_dirs = [d for d in org_dirs if d in wanted]
+    return org_dirs
+
+
+def _partition_files(archive_dir: str, queue_ids: Optional[List[int]],
+                     organization_id: Optional[Union[int, str]],
+                     start: Optional[datetime], end: Optional[datetime]) -> Iterator[str]:
+    """
+    Yield archive files whose partition can hold rows for the given queues, organization and range.
+    """
+    if not os.path.isdir(archive_dir):
+        return
+    start_month = f"{start:%Y-%m}" if start else None
+    end_month = f"{end:%Y-%m}" if end else None
+    for org_dir in _org_dirs(archive_dir, queue_ids, organization_id):
+        org_path = os.path.join(archive_dir, org_dir)
+        if not os.path.isdir(org_path):
+            continue
+        for month_dir in sorted(os.listdir(org_path)):
+            month = month_dir[len("month="):]
+            if (start_month and month < start_month) or (end_month and month > end_month):
+                continue
+            month_path = os.path.join(org_path, month_dir)
+            for name in sorted(os.listdir(month_path)):
+                if name.endswith(".arrow"):
+                    yield os.path.join(month_path, name)
+
+
+def _wanted_batches(path: str, num_batches: int, queue_ids: Optional[List[int]],
+                    start: Optional[datetime], end: Optional[datetime], include_end: bool) -> Iterator[int]:
+    try:
+        with open(path + STATS_SUFFIX, "r", encoding="utf-8") as fh:
+            stats = json.load(fh)["batches"]
+    except FileNotFoundError:
+        yield from range(num_batches)
+        return
+    low_queue = min(queue_ids) if queue_ids else None
+    high_queue = max(queue_ids) if queue_ids else None
+    for index, (first, last, min_queue, max_queue) in enumerate(stats):
+        if start is not None and datetime.fromisoformat(last) < start:
+            continue
+        if end is not None:
+            first = datetime.fromisoformat(first)
+            if first > end or (first == end and not include_end):
+                continue
+        if low_queue is not None and (max_queue < low_queue or min_queue > high_queue):
+            continue
+        yield index
+
+
+def scan_archive(
+    queue_ids: Optional[Iterable[int]] = None,
+    organization_id: Optional[Union[int, str]] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    archive_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    include_end: bool = False,
+):
+    """
+    Yield pyarrow Tables of archived rows removed in [start, end) (or [start, end]
+    with ``include_end``) matching the filters, one per record batch read. Batches
+    whose stats rule them out are skipped, and only ``columns`` (default all) plus
+    the filter columns are decompressed. Queues are found through the manifest, in
+    whichever organization they belonged to when archived. Pass NO_ORGANIZATION as
+    ``organization_id`` to read only rows of queues that had no organization.
+    """
+    _require_arrow()
+    import pyarrow as pa
+    import pyarrow.compute as pc
+
+    archive_dir = archive_dir or settings.HISTORY_ARCHIVE_DIR
+    queue_ids = list(queue_ids) if queue_ids is not None else None
+    if queue_ids is not None and not queue_ids:
+        return
+    names = _schema().names
+    columns = list(columns) if columns is not None else names
+    needed = set(columns)
+    if queue_ids is not None:
+        needed.add("queue_id")
+    if start is not None or end is not None:
+        needed.add("removed_at")
+    options = pa.ipc.IpcReadOptions(included_fields=[names.index(name) for name in names if name in needed])
+
+    for path in _partition_files(archive_dir, queue_ids, organization_id, start, end):
+        with pa.memory_map(path, "r") as source:
+            reader = pa.ipc.open_file(source, options=options)
+            for index in _wanted_batches(path, reader.num_record_batches, queue_ids, start, end, include_end):
+                table = pa.Table.from_batches([reader.get_batch(index)])
+                mask = None
+                if queue_ids is not None:
+                    mask = pc.is_in(table["queue_id"], value_set=pa.array(queue_ids, type=pa.int64()))
+                if start is not None:
+                    condition = pc.greater_equal(table["removed_at"], pa.scalar(start, type=pa.timestamp("us")))
+                    mask = condition if mask is None else pc.and_(mask, condition)
+                if end is not None:
+                    compare = pc.less_equal if include_end else pc.less
+                    condition = compare(table["removed_at"], pa.scalar(end, type=pa.timestamp("us")))
+                    mask = condition if mask is None else pc.and_(mask, condition)
+                if mask is not None:
+                    table = table.filter(mask)
+                if table.num_rows:
+                    yield table.select(columns)
+
+
+def iter_archived_rows(
+    queue_ids: Iterable[int],
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    archive_dir: Optional[str] = None,
+) -> Iterator[Tuple]:
+    """
+    Yield archived rows of the given queues removed in [start, end) as tuples ordered
+    like EXPORT_COLUMNS, sorted by removed_at and id. Goes month by month, holding
+    one month of matching rows in memory.
+    """
+    _require_arrow()
+    import pyarrow as pa
+
+    archive_dir = archive_dir or settings.HISTORY_ARCHIVE_DIR
+    queue_ids = list(queue_ids)
+    months = sorted({os.path.basename(os.path.dirname(path))[len("month="):]
+                     for path in _partition_files(archive_dir, queue_ids, None, start, end)})
+    for month in months:
+        month_start = datetime.strptime(month, "%Y-%m")
+        month_end = (month_start + timedelta(days=32)).replace(day=1)
+        tables = list(scan_archive(
+            queue_ids,
+            start=max(start, month_start) if start else month_start,
+            end=min(end, month_end) if end else month_end,
+            archive_dir=archive_dir,
+            columns=EXPORT_COLUMNS,
+        ))
+        if not tables:
+            continue
+        table = pa.concat_tables(tables).sort_by([("removed_at", "ascending"), ("id", "ascending")])
+        for batch in table.to_batches():
+            yield from zip(*[column.to_pylist() for column in batch.columns])
+
+
+def aggregate_waits(waits) -> Dict:
+    """
+    Vectorized count/sum/sum of squares/min/max/histogram over a NumPy array of waits,
+    in the accumulator shape used by crud.queue_history_rollup.
+    """
+    import numpy as np
+
+    waits = np.asarray(waits, dtype=np.float64)
+    if not waits.size:
+        return {"count": 0, "total": 0.0, "sum_sq": 0.0, "min": None, "max": None,
+                "histogram": empty_histogram()}
+    bins = np.searchsorted(np.asarray(HISTOGRAM_EDGES, dtype=np.float64), waits, side="right")
+    return {
+        "count": int(waits.size),
+        "total": float(waits.sum()),
+        "sum_sq": float(np.dot(waits, waits)),
+        "min": float(waits.min()),
+        "max": float(waits.max()),
+        "histogram": np.bincount(bins, minlength=len(HISTOGRAM_EDGES) + 1).tolist(),
+    }
+
+
+def merge_aggregates(left: Dict, right: Dict) -> Dict:
+    if not right["count"]:
+        return left
+    if not left["count"]:
+        return right
+    return {
+        "count": left["count"] + right["count"],
+        "total": left["total"] + right["total"],
+        "sum_sq": left["sum_sq"] + right["sum_sq"],
+        "min": min(left["min"], right["min"]),
+        "max": max(left["max"], right["max"]),
+        "histogram": [a + b for a, b in zip(left["histogram"], right["histogram"])],
+    }
+
+
+def aggregate_history_span(
+    db: Session,
+    queue_id: int,
+    start: datetime,
+    end: Optional[datetime] = None,
+    include_end: bool = False,
+    archive_dir: Optional[str] = None,
+) -> Dict:
+    """
+    Aggregate waiting times for one queue over [start, end) across both the hot
+    queue_history table and, when the range reaches past the archive horizon,
+    the memory-mapped archive.
+    """
+    history = models.QueueHistory
+    upper = None
+    if end is not None:
+        upper = history.removed_at <= end if include_end else history.removed_at < end
+    query = db.query(history.waiting_time).filter(history.queue_id == queue_id, history.removed_at >= start)
+    if upper is not None:
+        query = query.filter(upper)
+    hot = [row[0] for row in query.all()]
+
+    import numpy as np
+
+    result = aggregate_waits(np.fromiter(hot, dtype=np.float64, count=len(hot)))
+
+    horizon = archive_horizon(archive_dir)
+    if horizon is None or start >= horizon:
+        return result
+
+    if end is not None and end < horizon:
+        archive_end, archive_include_end = end, include_end
+    else:
+        archive_end, archive_include_end = horizon, False
+    for table in scan_archive([queue_id], start=start, end=archive_end, archive_dir=archive_dir,
+                              columns=["waiting_time"], include_end=archive_include_end):
+        result = merge_aggregates(result, aggregate_waits(table["waiting_time"].to_numpy()))
+    return result
@@ -0,0 +1,45 @@
+# backend/app/utils/bloom.py
+
+import hashlib
+import math
+from typing import Iterable
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter over strings. ``might_contain`` never returns a
+    false negative; false positives happen at about ``error_rate`` once
+    ``capacity`` items have been added. Items cannot be removed, so callers
+    rebuild the filter when its contents go stale.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.size = max(8, int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str):
+        # Double hashing: k positions from the two halves of one 128-bit digest.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (first + i * second) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def update(self, items: Iterable[str]) -> None:
+        for item in items:
+            self.add(item)
+
+    def might_contain(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __contains__(self, item: str) -> bool:
+        return self.might_contain(item)
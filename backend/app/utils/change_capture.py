@@ -0,0 +1,55 @@
+# backend/app/utils/change_capture.py
+#
+# Change capture on edge nodes. SQLite triggers copy every change to queue items,
+# queue history and queues into sync_outbox within the same transaction, so no
+# code path can change a row without it reaching the central server; the sync
+# agent (utils/sync_agent.py) ships the outbox. Users are referred to by email,
+# which is stable across databases, rather than by id.
+#
+# Queue items are captured as whole-row upserts keyed by join_hash, so the
+# central server converges on the latest state however many updates it missed.
+
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+_QUEUE_ITEM_ROW = """json_object(
+    'join_hash', NEW.join_hash, 'queue_id', NEW.queue_id,
+    'user_email', (SELECT email FROM users WHERE id = NEW.user_id),
+    'token_number', NEW.token_number, 'status', NEW.status,
+    'joined_at', NEW.joined_at, 'called_at', NEW.called_at, 'served_at', NEW.served_at,
+    'waiting_time', NEW.waiting_time)"""
+
+_OUTBOX = "INSERT INTO sync_outbox (entity, op, payload, created_at) VALUES ('{entity}', '{op}', {payload}, CURRENT_TIMESTAMP)"
+
+TRIGGERS = {
+    "sync_queue_items_insert": ("AFTER INSERT ON queue_items",
+                                _OUTBOX.format(entity="queue_item", op="upsert", payload=_QUEUE_ITEM_ROW)),
+    "sync_queue_items_update": ("AFTER UPDATE ON queue_items",
+                                _OUTBOX.format(entity="queue_item", op="upsert", payload=_QUEUE_ITEM_ROW)),
+    "sync_queue_items_delete": ("AFTER DELETE ON queue_items",
+                                _OUTBOX.format(entity="queue_item", op="delete", payload=(
+                                    "json_object('join_hash', OLD.join_hash, 'queue_id', OLD.queue_id)"))),
+    "sync_queue_history_insert": ("AFTER INSERT ON queue_history",
+                                  _OUTBOX.format(entity="queue_history", op="insert", payload="""json_object(
+    'queue_id', NEW.queue_id,
+    'user_email', (SELECT email FROM users WHERE id = NEW.user_id),
+    'joined_at', NEW.joined_at, 'removed_at', NEW.removed_at, 'waiting_time', NEW.waiting_time)""")),
+    "sync_queues_update": ("AFTER UPDATE OF name, description, status, max_capacity ON queues",
+                           _OUTBOX.format(entity="queue", op="update", payload="""json_object(
+    'id', NEW.id, 'name', NEW.name, 'description', NEW.description,
+    'status', NEW.status, 'max_capacity', NEW.max_capacity)""")),
+}
+
+
+def install_change_capture(engine: Engine) -> None:
+    """Create the capture triggers if they don't exist yet. SQLite only."""
+    if engine.dialect.name != "sqlite":
+        raise RuntimeError("Change capture is only supported on SQLite edge nodes")
+    with engine.begin() as connection:
+        for name, (timing, statement) in TRIGGERS.items():
+            connection.execute(text(f"CREATE TRIGGER IF NOT EXISTS {name} {timing} BEGIN {statement}; END"))
+    logger.info("Edge change capture installed")
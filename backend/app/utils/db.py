@@ -0,0 +1,54 @@
+from typing import Any, Dict, Iterable, List, Union
+from sqlalchemy.orm import Session
+
+
+def _insert_for(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upserts are not supported on {dialect}")
+    return insert
+
+
+def upsert(
+    db: Session,
+    model,
+    values: Union[Dict[str, Any], List[Dict[str, Any]]],
+    index_elements: Iterable[str],
+    set_: Dict[str, Any],
+    returning: Iterable[Any] = (),
+):
+    """
+    INSERT ... ON CONFLICT DO UPDATE for Postgres and SQLite.
+    Expressions in ``set_`` that reference ``model`` columns refer to the existing row.
+    ``values`` may be a list of rows, which are upserted in one statement.
+    With ``returning`` columns, returns the rows as they are after the upsert.
+    Does not commit.
+    """
+    insert = _insert_for(db)
+    stmt = insert(model).values(values).on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_=set_,
+    )
+    returning = list(returning)
+    if returning:
+        return db.execute(stmt.returning(*returning)).all()
+    db.execute(stmt)
+
+
+def insert_ignore(
+    db: Session,
+    model,
+    values: Dict[str, Any],
+    index_elements: Iterable[str],
+) -> int:
+    """
+    INSERT ... ON CONFLICT DO NOTHING for Postgres and SQLite. Does not commit.
+    Returns the number of rows inserted (0 on conflict).
+    """
+    insert = _insert_for(db)
+    stmt = insert(model).values(**values).on_conflict_do_nothing(index_elements=list(index_elements))
+    return db.execute(stmt).rowcount
@@ -1,40 +1,65 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
-from ..core.config import settings
+# backend/app/utils/email.py
+#
+# Emails are not sent from request handlers: they are queued in the email_jobs
+# table and delivered by the worker in utils/email_worker.py.
+
+from functools import lru_cache
 from pathlib import Path
-import json
+from typing import TYPE_CHECKING, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from ..core.config import settings
+from ..crud.email_job import enqueue_email
+from ..models.email_job import EmailJob
+
+if TYPE_CHECKING:
+    from jinja2 import Environment
+
+TEMPLATE_FOLDER = Path(__file__).parent.parent / 'templates' / 'email'
+
 
-async def send_organization_invite_email(
+@lru_cache(maxsize=1)
+def template_environment() -> "Environment":
+    # Only the email worker renders; the API just queues jobs, so jinja2 is
+    # imported on first use.
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+    # Templates don't change at runtime; compile each one once per process.
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATE_FOLDER)),
+        autoescape=select_autoescape(["html"]),
+        auto_reload=False,
+        cache_size=-1,
+    )
+
+
+def render_email(template_name: str, context: Dict) -> str:
+    return template_environment().get_template(template_name).render(**context)
+
+
+def enqueue_organization_invite_email(
+    db: Session,
     email_to: str,
     organization_name: str,
     invite_token: str,
-    role: str
-):
+    role: str,
+    commit: bool = True
+) -> Optional[EmailJob]:
     """
-    Send organization invitation email
+    Queue an organization invitation email. Returns None when email is disabled.
+    With ``commit=False`` the job joins the caller's transaction.
     """
-    conf = ConnectionConfig(
-        MAIL_USERNAME=settings.SMTP_USER,
-        MAIL_PASSWORD=settings.SMTP_PASSWORD,
-        MAIL_FROM=settings.SMTP_FROM_EMAIL,
-        MAIL_PORT=settings.SMTP_PORT,
-        MAIL_SERVER=settings.SMTP_HOST,
-        MAIL_FROM_NAME=settings.SMTP_FROM_NAME,
-        MAIL_STARTTLS=True,
-        MAIL_SSL_TLS=False,
-        USE_CREDENTIALS=True,
-        TEMPLATE_FOLDER=Path(__file__).parent.parent / 'templates' / 'email'
-    )
-
-    message = MessageSchema(
+    if not settings.EMAIL_ENABLED:
+        return None
+    return enqueue_email(
+        db,
+        to_address=email_to,
         subject=f"Invitation to join {organization_name}",
-        recipients=[email_to],
-        template_body={
+        template="organization_invite.html",
+        context={
             "organization_name": organization_name,
             "role": role,
             "invite_link": f"{settings.FRONTEND_URL}/invite/accept/{invite_token}"
         },
-        subtype="html"
+        commit=commit
     )
-    
-    fm = FastMail(conf)
-    await fm.send_message(message, template_name="organization_invite.html") 
\ No newline at end of file
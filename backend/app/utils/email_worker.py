@@ -0,0 +1,161 @@
+# backend/app/utils/email_worker.py
+#
+# Delivery worker for the email_jobs table. Run it next to the API:
+#   python -m app.cli email-worker
+# Each sender keeps one SMTP connection open across batches and reconnects only
+# after the server drops it, so the TLS and AUTH handshakes are paid once.
+
+import asyncio
+import logging
+from email.message import EmailMessage
+from email.utils import formataddr
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+
+from .. import crud
+from ..core.config import settings
+from ..database import SessionLocal
+from .email import render_email
+
+logger = logging.getLogger(__name__)
+
+
+def build_message(job: Dict) -> EmailMessage:
+    message = EmailMessage()
+    message["From"] = formataddr((settings.SMTP_FROM_NAME, settings.SMTP_FROM_EMAIL))
+    message["To"] = job["to_address"]
+    message["Subject"] = job["subject"]
+    message.set_content("This message requires an HTML capable email client.")
+    message.add_alternative(render_email(job["template"], job["context"]), subtype="html")
+    return message
+
+
+def is_permanent(error: Exception) -> bool:
+    """5xx replies and refused recipients won't succeed on a retry."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= refused.code < 600 for refused in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 500 <= error.code < 600
+    return False
+
+
+class SMTPSender:
+    """Owns one persistent SMTP connection."""
+
+    def __init__(self) -> None:
+        self.client: Optional[aiosmtplib.SMTP] = None
+
+    async def _connection(self) -> aiosmtplib.SMTP:
+        if self.client is not None and self.client.is_connected:
+            return self.client
+        client = aiosmtplib.SMTP(
+            hostname=settings.SMTP_HOST,
+            port=settings.SMTP_PORT,
+            timeout=settings.SMTP_TIMEOUT_SECONDS,
+            use_tls=settings.SMTP_SSL_TLS,
+            start_tls=settings.SMTP_STARTTLS and not settings.SMTP_SSL_TLS,
+        )
+        await client.connect()
+        if settings.SMTP_USER:
+            await client.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        self.client = client
+        return client
+
+    async def close(self) -> None:
+        if self.client is not None and self.client.is_connected:
+            try:
+                await self.client.quit()
+            except aiosmtplib.SMTPException:
+                self.client.close()
+        self.client = None
+
+    async def send_batch(self, jobs: List[Dict]) -> Tuple[List[int], List[Tuple[int, str, bool]]]:
+        sent, failures = [], []
+        for job in jobs:
+            try:
+                message = build_message(job)
+            except Exception as exc:
+                # Broken template or context; retrying won't help.
+                logger.exception("Could not render email job %s", job["id"])
+                failures.append((job["id"], f"{type(exc).__name__}: {exc}", True))
+                continue
+            try:
+                client = await self._connection()
+                await client.send_message(message)
+                sent.append(job["id"])
+            except (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPConnectError,
+                    aiosmtplib.SMTPTimeoutError, OSError) as exc:
+                # The connection is gone; reconnect for the next job.
+                self.client = None
+                failures.append((job["id"], f"{type(exc).__name__}: {exc}", False))
+            except aiosmtplib.SMTPException as exc:
+                failures.append((job["id"], f"{type(exc).__name__}: {exc}", is_permanent(exc)))
+                if isinstance(exc, aiosmtplib.SMTPResponseException) and exc.code == 421:
+                    await self.close()
+        return sent, failures
+
+
+def _claim(limit: int) -> List[Dict]:
+    db = SessionLocal()
+    try:
+        return crud.claim_email_jobs(db, limit)
+    finally:
+        db.close()
+
+
+def _complete(sent: List[int], failures: List[Tuple[int, str, bool]]) -> None:
+    db = SessionLocal()
+    try:
+        crud.complete_email_jobs(db, sent, failures)
+    finally:
+        db.close()
+
+
+class EmailWorker:
+    def __init__(self, connections: Optional[int] = None, batch_size: Optional[int] = None,
+                 poll_seconds: Optional[float] = None) -> None:
+        self.senders = [SMTPSender() for _ in range(connections or settings.EMAIL_WORKER_CONNECTIONS)]
+        self.batch_size = batch_size or settings.EMAIL_WORKER_BATCH_SIZE
+        self.poll_seconds = settings.EMAIL_WORKER_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self._stopping = asyncio.Event()
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    async def run_once(self) -> int:
+        """
+        Deliver one batch, spread over the senders. Returns the number of jobs handled.
+        """
+        jobs = await asyncio.to_thread(_claim, self.batch_size)
+        if not jobs:
+            return 0
+        chunks = [jobs[index::len(self.senders)] for index in range(len(self.senders))]
+        results = await asyncio.gather(*(
+            sender.send_batch(chunk) for sender, chunk in zip(self.senders, chunks) if chunk
+        ))
+        sent = [job_id for batch_sent, _ in results for job_id in batch_sent]
+        failures = [failure for _, batch_failures in results for failure in batch_failures]
+        await asyncio.to_thread(_complete, sent, failures)
+        if failures:
+            logger.warning("Email batch: %s sent, %s failed", len(sent), len(failures))
+        return len(jobs)
+
+    async def run(self, once: bool = False) -> None:
+        """
+        Deliver until stopped. With ``once`` return as soon as the queue is empty.
+        """
+        try:
+            while not self._stopping.is_set():
+                handled = await self.run_once()
+                if handled:
+                    continue
+                if once:
+                    return
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            for sender in self.senders:
+                await sender.close()
@@ -0,0 +1,147 @@
+# backend/app/utils/events.py
+#
+# Event publishing and consumption for the WebSocket fan-out. With
+# EVENT_BUS=kafka (the default) events go through Kafka as before; with
+# EVENT_BUS=memory (the edge profile) they are delivered to the consumers in
+# this process only, which is all a single-process edge node has.
+#
+# Kafka is optional at runtime: start() connects in the background, retrying
+# with backoff, so the API serves requests while Kafka is down. Until it is
+# connected events are dropped (they are live UI updates; clients catch up on
+# their next fetch) and consumers keep retrying.
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from ..core.config import settings
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+TOPIC_QUEUE_UPDATES = "queue-updates"
+# Per-user events; never broadcast to the public queue WebSocket.
+TOPIC_NOTIFICATIONS = "notification-updates"
+
+_QUEUE_SIZE = 1000
+_RETRY_FIRST_SECONDS = 1.0
+
+_dropped = metrics.counter("events_dropped_total", "Events not published because the event bus was unavailable.")
+
+
+class InProcessBus:
+    """Every subscriber of a topic receives every event published to it."""
+
+    def __init__(self) -> None:
+        self.subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def publish(self, topic: str, event: dict) -> None:
+        for queue in list(self.subscribers.get(topic, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # A stalled consumer loses events rather than blocking publishers.
+                logger.warning("Dropping %s event for a slow consumer", topic)
+
+    async def consume(self, topic: str, callback: Callable[[dict], Awaitable[None]]) -> None:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        self.subscribers[topic].add(queue)
+        try:
+            while True:
+                await callback(await queue.get())
+        finally:
+            self.subscribers[topic].discard(queue)
+
+
+bus = InProcessBus()
+
+
+def _in_process() -> bool:
+    return settings.EVENT_BUS == "memory"
+
+
+_connector: Optional[asyncio.Task] = None
+
+
+def status() -> str:
+    """"memory", "connected" or "connecting" (Kafka unreachable so far)."""
+    if _in_process():
+        return "memory"
+    from . import kafka
+    return "connected" if kafka.producer is not None else "connecting"
+
+
+metrics.gauge("event_bus_connected", "1 while events can be published.",
+              callback=lambda: 0 if _connector is not None and status() == "connecting" else 1)
+
+
+async def _connect_kafka() -> None:
+    from . import kafka
+    delay = _RETRY_FIRST_SECONDS
+    while True:
+        try:
+            await kafka.init_kafka_producer()
+            logger.info("Connected to Kafka")
+            return
+        except Exception as exc:
+            logger.warning("Kafka unavailable, events are dropped until it is back; retrying in %.0fs: %s",
+                           delay, exc)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.EVENT_BUS_RETRY_MAX_SECONDS)
+
+
+def start() -> None:
+    """Connect the event bus in the background; never waits for Kafka."""
+    global _connector
+    if _in_process() or _connector is not None:
+        return
+    _connector = asyncio.create_task(_connect_kafka())
+
+
+async def stop() -> None:
+    global _connector
+    if _connector is None:
+        return
+    _connector.cancel()
+    _connector = None
+    from . import kafka
+    await kafka.shutdown_kafka_producer()
+
+
+async def publish_event(event_type: str, payload: dict, topic: str = TOPIC_QUEUE_UPDATES) -> None:
+    if _in_process():
+        bus.publish(topic, {"event_type": event_type, "payload": payload})
+        return
+    from . import kafka
+    if kafka.producer is None and _connector is not None:
+        # Started, but not connected yet.
+        _dropped.inc()
+        return
+    try:
+        await kafka.publish_event(event_type, payload, topic=topic)
+    except Exception:
+        _dropped.inc()
+        logger.warning("Could not publish %s to Kafka", event_type, exc_info=True)
+
+
+async def consume_events(callback: Callable[[dict], Awaitable[None]], topic: str = TOPIC_QUEUE_UPDATES,
+                         group_id: Optional[str] = "websocket_group") -> None:
+    """
+    Feed events of ``topic`` to ``callback`` until cancelled. ``group_id`` only
+    applies to Kafka (None gives every consumer every event). Reconnects after
+    Kafka errors.
+    """
+    if _in_process():
+        await bus.consume(topic, callback)
+        return
+    from . import kafka
+    delay = _RETRY_FIRST_SECONDS
+    while True:
+        try:
+            await kafka.kafka_consumer_loop(callback, topic=topic, group_id=group_id)
+            return
+        except Exception as exc:
+            logger.warning("Kafka consumer for %s failed, retrying in %.0fs: %s", topic, delay, exc)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, settings.EVENT_BUS_RETRY_MAX_SECONDS)
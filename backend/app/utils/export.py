@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+
+def _jsonable(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def ndjson_chunks(rows: Iterable[Tuple], columns: Sequence[str], rows_per_chunk: int = 1000) -> Iterator[bytes]:
+    """
+    Encode rows as newline-delimited JSON, yielding one bytes chunk per ``rows_per_chunk`` rows.
+    """
+    buffer: List[str] = []
+    for row in rows:
+        buffer.append(json.dumps({name: _jsonable(value) for name, value in zip(columns, row)}))
+        if len(buffer) >= rows_per_chunk:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+def csv_chunks(rows: Iterable[Tuple], columns: Sequence[str], rows_per_chunk: int = 1000) -> Iterator[bytes]:
+    """
+    Encode rows as CSV with a header line, yielding one bytes chunk per ``rows_per_chunk`` rows.
+    """
+    out = io.StringIO()
+    writer = csv.writer(out)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_jsonable(value) for value in row])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield out.getvalue().encode("utf-8")
+            out.seek(0)
+            out.truncate(0)
+            pending = 0
+    if out.tell():
+        yield out.getvalue().encode("utf-8")
+
+
+def _history_arrow_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("queue_id", pa.int64()),
+        ("user_id", pa.int64()),
+        ("joined_at", pa.timestamp("us")),
+        ("removed_at", pa.timestamp("us")),
+        ("waiting_time", pa.float64()),
+    ])
+
+
+def write_parquet(rows: Iterable[Tuple], columns: Sequence[str], path: str, row_group_size: int = 50000) -> int:
+    """
+    Write rows to a Parquet file one row group at a time, so only ``row_group_size``
+    rows are held in memory. Requires pyarrow. Returns the number of rows written.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("Parquet export requires the 'pyarrow' package") from exc
+
+    schema = _history_arrow_schema()
+    written = 0
+    batch: List[Tuple] = []
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        def flush():
+            arrays = [pa.array([row[i] for row in batch], type=schema.field(name).type)
+                      for i, name in enumerate(columns)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= row_group_size:
+                flush()
+                written += len(batch)
+                batch.clear()
+        if batch:
+            flush()
+            written += len(batch)
+    return written
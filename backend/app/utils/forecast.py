@@ -0,0 +1,80 @@
+# backend/app/utils/forecast.py
+#
+# Vectorized hour-of-week profile math. Timestamps are naive UTC, as stored in
+# the database, and handled as numpy datetime64[us] arrays.
+
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+import numpy as np
+
+from ..models.queue_forecast import HOURS_PER_WEEK
+
+_US_PER_HOUR = 3600 * 1_000_000
+# 1970-01-01 was a Thursday; shift so that slot 0 is Monday 00:00.
+_EPOCH_WEEKDAY = 3
+
+
+def to_datetime64(values: Iterable[datetime]) -> np.ndarray:
+    return np.array(list(values), dtype="datetime64[us]")
+
+
+def hour_of_week(timestamps: np.ndarray) -> np.ndarray:
+    hours = timestamps.astype("datetime64[us]").astype(np.int64) // _US_PER_HOUR
+    return (hours + _EPOCH_WEEKDAY * 24) % HOURS_PER_WEEK
+
+
+def count_by_hour_of_week(timestamps: np.ndarray) -> np.ndarray:
+    if not timestamps.size:
+        return np.zeros(HOURS_PER_WEEK, dtype=np.float64)
+    return np.bincount(hour_of_week(timestamps), minlength=HOURS_PER_WEEK).astype(np.float64)
+
+
+def slot_occurrences(start: datetime, end: datetime) -> np.ndarray:
+    """
+    How many times each hour-of-week slot occurs in [start, end), counting partial hours as whole.
+    """
+    first = int(np.datetime64(start, "us").astype(np.int64) // _US_PER_HOUR)
+    last = int((np.datetime64(end, "us").astype(np.int64) - 1) // _US_PER_HOUR) + 1
+    total = max(last - first, 0)
+    occurrences = np.full(HOURS_PER_WEEK, total // HOURS_PER_WEEK, dtype=np.float64)
+    remainder = total % HOURS_PER_WEEK
+    if remainder:
+        first_slot = (first + _EPOCH_WEEKDAY * 24) % HOURS_PER_WEEK
+        occurrences[(first_slot + np.arange(remainder)) % HOURS_PER_WEEK] += 1
+    return occurrences
+
+
+def rates(counts: np.ndarray, start: Optional[datetime], end: Optional[datetime]) -> np.ndarray:
+    """
+    Average events per hour for every hour-of-week slot.
+    """
+    if start is None or end is None:
+        return np.zeros(HOURS_PER_WEEK, dtype=np.float64)
+    occurrences = slot_occurrences(start, end)
+    return np.divide(counts, occurrences, out=np.zeros_like(counts), where=occurrences > 0)
+
+
+def pack(values: np.ndarray) -> bytes:
+    return np.asarray(values, dtype="<f8").tobytes()
+
+
+def unpack(blob: Optional[bytes]) -> np.ndarray:
+    if not blob:
+        return np.zeros(HOURS_PER_WEEK, dtype=np.float64)
+    return np.frombuffer(blob, dtype="<f8").copy()
+
+
+def as_week_matrix(values: np.ndarray) -> List[List[float]]:
+    """
+    Reshape a 168-slot profile into 7 rows (Monday first) of 24 hourly values.
+    """
+    return np.round(values.reshape(7, 24), 4).tolist()
+
+
+def upcoming(values: np.ndarray, start: datetime, hours: int) -> List[float]:
+    """
+    Profile values for the ``hours`` hours starting with the hour that contains ``start``.
+    """
+    first_slot = int(hour_of_week(np.array([start], dtype="datetime64[us]"))[0])
+    return np.round(values[(first_slot + np.arange(hours)) % HOURS_PER_WEEK], 4).tolist()
@@ -1,22 +1,30 @@
 from aiokafka import AIOKafkaProducer, AIOKafkaConsumer
 import json
+from typing import Optional
+
+from .events import TOPIC_QUEUE_UPDATES, TOPIC_NOTIFICATIONS
 
 KAFKA_BOOTSTRAP_SERVERS = "kafka:9092"
-TOPIC_QUEUE_UPDATES = "queue-updates"
 
 producer = None
 
 async def init_kafka_producer() -> None:
     global producer
-    producer = AIOKafkaProducer(bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS)
-    await producer.start()
+    started = AIOKafkaProducer(bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS)
+    try:
+        await started.start()
+    except Exception:
+        await started.stop()
+        raise
+    producer = started
 
 async def shutdown_kafka_producer() -> None:
     global producer
     if producer:
         await producer.stop()
+        producer = None
 
-async def publish_event(event_type: str, payload: dict) -> None:
+async def publish_event(event_type: str, payload: dict, topic: str = TOPIC_QUEUE_UPDATES) -> None:
     global producer
     if not producer:
         await init_kafka_producer()
@@ -24,13 +32,18 @@ async def publish_event(event_type: str, payload: dict) -> None:
         "event_type": event_type,
         "payload": payload
     }).encode("utf-8")
-    await producer.send_and_wait(TOPIC_QUEUE_UPDATES, message)
+    await producer.send_and_wait(topic, message)
 
-async def kafka_consumer_loop(callback) -> None:
+async def kafka_consumer_loop(callback, topic: str = TOPIC_QUEUE_UPDATES,
+                              group_id: Optional[str] = "websocket_group") -> None:
+    """
+    Feed decoded events of ``topic`` to ``callback``. With ``group_id=None`` every
+    consumer receives every event, which is what per-process fan-out needs.
+    """
     consumer = AIOKafkaConsumer(
-        TOPIC_QUEUE_UPDATES,
+        topic,
         bootstrap_servers=KAFKA_BOOTSTRAP_SERVERS,
-        group_id="websocket_group"
+        group_id=group_id
     )
     await consumer.start()
     try:
@@ -0,0 +1,90 @@
+# backend/app/utils/load_shedding.py
+#
+# Adaptive load shedding. Request latencies (recorded by the HTTP middleware)
+# and connection pool waits (recorded by the pool in database.py) are kept for
+# the last LOAD_SHED_WINDOW_SECONDS. While the p99 of either is above its
+# threshold, sheddable endpoints answer 503 with Retry-After instead of adding
+# more work. Samples age out of the window, so shedding stops on its own once
+# the slow requests are gone. With fewer than LOAD_SHED_MIN_SAMPLES samples in
+# the window there is no meaningful p99 (a single slow cold start would decide
+# it), so nothing is shed.
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from ..core.config import settings
+from . import metrics
+
+_MAX_SAMPLES = 10000
+_P99_REFRESH_SECONDS = 1.0
+
+
+class _Window:
+    """Timestamped samples of the last ``seconds`` with a p99 recomputed at most once a second."""
+
+    def __init__(self, seconds: float, min_samples: int):
+        self.seconds = seconds
+        self.min_samples = min_samples
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=_MAX_SAMPLES)
+        self._lock = threading.Lock()
+        self._p99 = 0.0
+        self._computed_at = 0.0
+
+    def record(self, value: float, now: float) -> None:
+        with self._lock:
+            self._samples.append((now, value))
+
+    def p99(self, now: float) -> float:
+        with self._lock:
+            if now - self._computed_at < _P99_REFRESH_SECONDS:
+                return self._p99
+            while self._samples and self._samples[0][0] < now - self.seconds:
+                self._samples.popleft()
+            values = sorted(value for _, value in self._samples)
+            if len(values) < max(1, self.min_samples):
+                self._p99 = 0.0
+            else:
+                self._p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+            self._computed_at = now
+            return self._p99
+
+
+class LoadShedder:
+    def __init__(self, p99_ms: float, pool_wait_ms: float, window_seconds: float, retry_after: int,
+                 min_samples: int = 0):
+        self.p99_seconds = p99_ms / 1000
+        self.pool_wait_seconds = pool_wait_ms / 1000
+        self.retry_after_seconds = retry_after
+        self.latency = _Window(window_seconds, min_samples)
+        self.pool_wait = _Window(window_seconds, min_samples)
+        self.shed = metrics.counter("load_shed_total", "Requests rejected with 503 by load shedding.")
+        metrics.gauge("request_latency_p99_seconds", "p99 request latency over the load shedding window.",
+                      callback=lambda: self.latency.p99(time.monotonic()))
+        metrics.gauge("db_pool_wait_p99_seconds", "p99 connection pool wait over the load shedding window.",
+                      callback=lambda: self.pool_wait.p99(time.monotonic()))
+
+    def record_latency(self, seconds: float) -> None:
+        self.latency.record(seconds, time.monotonic())
+
+    def record_pool_wait(self, seconds: float) -> None:
+        self.pool_wait.record(seconds, time.monotonic())
+
+    def retry_after(self) -> Optional[int]:
+        """Seconds the client should wait when the process is overloaded, else None."""
+        now = time.monotonic()
+        if (self.p99_seconds and self.latency.p99(now) > self.p99_seconds) or \
+                (self.pool_wait_seconds and self.pool_wait.p99(now) > self.pool_wait_seconds):
+            self.shed.inc()
+            return self.retry_after_seconds
+        return None
+
+
+shedder = LoadShedder(
+    p99_ms=settings.LOAD_SHED_P99_MS,
+    pool_wait_ms=settings.LOAD_SHED_POOL_WAIT_MS,
+    window_seconds=settings.LOAD_SHED_WINDOW_SECONDS,
+    retry_after=settings.LOAD_SHED_RETRY_AFTER_SECONDS,
+    min_samples=settings.LOAD_SHED_MIN_SAMPLES,
+)
@@ -0,0 +1,117 @@
+# backend/app/utils/metrics.py
+#
+# A minimal per-process metrics registry rendered in the Prometheus text format
+# by GET /metrics. Counters and gauges are plain thread-safe numbers; gauges can
+# also be backed by a callback that is read at scrape time. Histograms count
+# observations into fixed cumulative buckets. A metric name may be registered
+# once per set of labels.
+
+import bisect
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    labels = {**labels, **extra}
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+
+class Metric:
+    def __init__(self, name: str, help: str, kind: str, callback: Optional[Callable[[], float]] = None,
+                 labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.help = help
+        self.kind = kind
+        self.callback = callback
+        self.labels = labels or {}
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = value
+
+    @property
+    def value(self) -> float:
+        if self.callback is not None:
+            return self.callback()
+        return self._value
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels)} {self.value:g}"]
+
+
+class Histogram(Metric):
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Optional[Dict[str, str]] = None):
+        super().__init__(name, help, "histogram", labels=labels)
+        self.buckets = sorted(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            counts, total = list(self._counts), self._sum
+        lines, cumulative = [], 0
+        for bound, count in zip(self.buckets + [float("inf")], counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else f"{bound:g}"
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, le=le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {total:g}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {cumulative}")
+        return lines
+
+
+_registry: Dict[Tuple[str, tuple], Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _register(name: str, labels: Optional[Dict[str, str]], factory: Callable[[], Metric]) -> Metric:
+    key = (name, tuple(sorted((labels or {}).items())))
+    with _registry_lock:
+        metric = _registry.get(key)
+        if metric is None:
+            metric = _registry[key] = factory()
+        return metric
+
+
+def counter(name: str, help: str, labels: Optional[Dict[str, str]] = None) -> Metric:
+    return _register(name, labels, lambda: Metric(name, help, "counter", labels=labels))
+
+
+def gauge(name: str, help: str, callback: Optional[Callable[[], float]] = None,
+          labels: Optional[Dict[str, str]] = None) -> Metric:
+    return _register(name, labels, lambda: Metric(name, help, "gauge", callback, labels=labels))
+
+
+def histogram(name: str, help: str, buckets: Sequence[float], labels: Optional[Dict[str, str]] = None) -> Histogram:
+    return _register(name, labels, lambda: Histogram(name, help, buckets, labels=labels))
+
+
+def render() -> str:
+    lines: List[str] = []
+    with _registry_lock:
+        metrics = sorted(_registry.items())
+    described = set()
+    for (name, _), metric in metrics:
+        if name not in described:
+            described.add(name)
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,82 @@
+# backend/app/utils/notifications.py
+#
+# Pushes notification events to the users' WebSocket channels. The CRUD
+# layer is synchronous and runs either on the event loop (async endpoints) or
+# in a worker thread (sync endpoints), so publishing is scheduled accordingly
+# and never blocks or fails the request.
+
+import asyncio
+import logging
+from typing import Dict, List
+
+import anyio.from_thread
+
+from . import events
+from ..core.config import settings
+
+logger = logging.getLogger(__name__)
+
+UNREAD_COUNT_EVENT = "NOTIFICATION_UNREAD_COUNT"
+# One event carries a batch of recipients; the WebSocket router splits it per user.
+QUEUE_UPDATE_EVENT = "NOTIFICATION_QUEUE_UPDATE"
+
+_pending = set()
+
+
+async def _publish(event_type: str, payload: Dict) -> None:
+    try:
+        await events.publish_event(event_type, payload, topic=events.TOPIC_NOTIFICATIONS)
+    except Exception:
+        logger.warning("Could not publish %s", event_type, exc_info=True)
+
+
+def _schedule(event_type: str, payload: Dict) -> None:
+    task = asyncio.get_running_loop().create_task(_publish(event_type, payload))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+def _push(event_type: str, payload: Dict) -> None:
+    """
+    Publish an event without waiting for delivery. Outside of the web app
+    (CLI jobs, scripts) there is no loop and nothing is pushed.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        pass
+    else:
+        _schedule(event_type, payload)
+        return
+    try:
+        anyio.from_thread.run_sync(_schedule, event_type, payload)
+    except RuntimeError:
+        logger.debug("No event loop to push %s", event_type)
+
+
+def push_unread_count(user_id: int, unread: int) -> None:
+    """
+    Publish a user's new unread count.
+    """
+    _push(UNREAD_COUNT_EVENT, {"user_id": user_id, "unread_count": unread})
+
+
+def push_queue_update(
+    queue_id: int,
+    title: str,
+    message: str,
+    recipients: List[Dict],
+    batch_size: int = None,
+) -> None:
+    """
+    Publish a queue update to many users, ``batch_size`` recipients per event.
+    Each recipient is a dict with user_id, notification_id and unread_count.
+    """
+    batch_size = batch_size or settings.NOTIFICATION_PUSH_BATCH_SIZE
+    for start in range(0, len(recipients), batch_size):
+        _push(QUEUE_UPDATE_EVENT, {
+            "queue_id": queue_id,
+            "title": title,
+            "message": message,
+            "recipients": recipients[start:start + batch_size],
+        })
@@ -0,0 +1,142 @@
+# backend/app/utils/partitions.py
+#
+# Monthly range partitions of queue_history on Postgres. The table is converted
+# by the "partition queue_history by month" migration; these helpers keep future
+# partitions in place and drop expired ones. On other databases (SQLite in
+# development) retention falls back to plain batched deletes.
+
+import logging
+import re
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .. import models
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "queue_history"
+DEFAULT_PARTITION = "queue_history_default"
+PARTITION_PATTERN = re.compile(r"^queue_history_y(\d{4})m(\d{2})$")
+
+
+def month_start(moment: date) -> date:
+    return date(moment.year, moment.month, 1)
+
+
+def next_month(moment: date) -> date:
+    return date(moment.year + moment.month // 12, moment.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"queue_history_y{month.year:04d}m{month.month:02d}"
+
+
+def is_partitioned(db: Session) -> bool:
+    if db.get_bind().dialect.name != "postgresql":
+        return False
+    return bool(db.execute(text(
+        "SELECT 1 FROM pg_partitioned_table pt "
+        "JOIN pg_class c ON c.oid = pt.partrelid "
+        "WHERE c.relname = :name"
+    ), {"name": PARENT_TABLE}).scalar())
+
+
+def list_partitions(db: Session) -> List[Tuple[str, date]]:
+    """
+    Return (name, month) for every monthly partition, oldest first.
+    """
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :name"
+    ), {"name": PARENT_TABLE}).scalars().all()
+    partitions = []
+    for name in names:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda item: item[1])
+
+
+def create_partition_sql(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} "
+        f"PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    )
+
+
+def ensure_history_partitions(db: Session, months_ahead: int = 3) -> List[str]:
+    """
+    Create the partitions for the current month and the next ``months_ahead`` months.
+    Commits; returns the names of partitions that did not exist before.
+    """
+    if not is_partitioned(db):
+        return []
+    existing = {name for name, _ in list_partitions(db)}
+    month = month_start(datetime.utcnow().date())
+    created = []
+    for _ in range(months_ahead + 1):
+        name = partition_name(month)
+        if name not in existing:
+            db.execute(text(create_partition_sql(month)))
+            created.append(name)
+        month = next_month(month)
+    db.commit()
+    if created:
+        logger.info("Created queue_history partitions: %s", ", ".join(created))
+    return created
+
+
+def drop_history_partitions_before(db: Session, cutoff: datetime) -> List[str]:
+    """
+    Detach and drop every monthly partition that lies entirely before ``cutoff``.
+    Commits; returns the dropped partition names.
+    """
+    if not is_partitioned(db):
+        return []
+    dropped = []
+    for name, month in list_partitions(db):
+        if datetime.combine(next_month(month), datetime.min.time()) > cutoff:
+            break
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        dropped.append(name)
+    db.commit()
+    if dropped:
+        logger.info("Dropped queue_history partitions: %s", ", ".join(dropped))
+    return dropped
+
+
+def delete_history_before(db: Session, cutoff: datetime, batch_size: int = 10000) -> int:
+    """
+    Retention for unpartitioned tables: delete rows removed before ``cutoff`` in
+    batches so no single transaction grows unbounded. Returns the rows deleted.
+    """
+    history = models.QueueHistory
+    deleted = 0
+    while True:
+        ids = db.query(history.id).filter(history.removed_at < cutoff).limit(batch_size).subquery()
+        count = db.query(history).filter(history.id.in_(db.query(ids.c.id)))\
+            .delete(synchronize_session=False)
+        db.commit()
+        deleted += count
+        if count < batch_size:
+            return deleted
+
+
+def apply_history_retention(db: Session, keep_days: int) -> str:
+    """
+    Remove queue_history older than ``keep_days``: whole partitions are dropped when
+    the table is partitioned, rows are deleted otherwise. Rollups are kept.
+    """
+    cutoff = datetime.utcnow() - timedelta(days=keep_days)
+    if is_partitioned(db):
+        dropped = drop_history_partitions_before(db, cutoff)
+        return f"Dropped {len(dropped)} queue_history partitions before {cutoff:%Y-%m-%d}."
+    deleted = delete_history_before(db, cutoff)
+    return f"Deleted {deleted} queue_history rows before {cutoff:%Y-%m-%d}."
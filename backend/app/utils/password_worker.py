@@ -0,0 +1,34 @@
+# backend/app/utils/password_worker.py
+#
+# The functions run by the password hashing pool (utils.passwords). Pool
+# processes are spawned fresh and import only this module, so it must not import
+# the app's settings: a child inherits the parent's os.environ, which
+# load_dotenv() may have changed after the parent read its settings.
+
+from typing import Dict, Optional, Tuple
+
+from passlib.context import CryptContext
+
+_contexts: Dict[int, CryptContext] = {}
+
+
+def _context(rounds: int) -> CryptContext:
+    context = _contexts.get(rounds)
+    if context is None:
+        # min == max == rounds, so any other cost is reported as needing an update.
+        context = _contexts[rounds] = CryptContext(
+            schemes=["bcrypt"],
+            deprecated="auto",
+            bcrypt__rounds=rounds,
+            bcrypt__min_rounds=rounds,
+            bcrypt__max_rounds=rounds,
+        )
+    return context
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return _context(rounds).hash(password)
+
+
+def verify_password(password: str, hashed: str, rounds: int) -> Tuple[bool, Optional[str]]:
+    return _context(rounds).verify_and_update(password, hashed)
@@ -0,0 +1,190 @@
+# backend/app/utils/passwords.py
+#
+# bcrypt runs in a dedicated process pool, so a burst of logins neither holds
+# the API process's GIL nor ties up the request thread pool. At most
+# PASSWORD_HASH_MAX_PENDING jobs may be queued or running; past that callers get
+# PasswordHasherBusy (503) instead of waiting behind everyone else.
+#
+# Hashes are created with BCRYPT_ROUNDS. A successful verification against a
+# hash of any other cost also returns a replacement hash, so changing the cost
+# migrates users as they log in.
+#
+# Workers are spawned with a blank __main__ and run utils.password_worker, so
+# they import neither the launching script nor the app's settings. A pool broken
+# by a dead worker is replaced and the job retried once.
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+from ..core.config import settings
+from . import metrics
+from .password_worker import hash_password as _hash, verify_password as _verify
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool already has PASSWORD_HASH_MAX_PENDING jobs."""
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Password hashing is at capacity")
+        self.retry_after = retry_after
+
+
+_pending = metrics.gauge("password_hash_pending", "Password hashing jobs queued or running.")
+_jobs = metrics.counter("password_hash_jobs_total", "Password hashing jobs completed.")
+_rejected = metrics.counter("password_hash_rejected_total", "Password hashing jobs rejected at capacity.")
+_seconds = metrics.counter("password_hash_seconds_total", "Time from submission to completion of hashing jobs.")
+_rehashed = metrics.counter("password_rehash_total", "Passwords rehashed on login after a cost change.")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_MAX_PENDING)
+
+
+@contextmanager
+def _blank_main():
+    # spawn re-runs the parent's __main__ in every child (as __mp_main__); the
+    # workers need none of it. Processes are started inside pool.submit().
+    main = sys.modules["__main__"]
+    sys.modules["__main__"] = types.ModuleType("__main__")
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _start(fn, args) -> Tuple[ProcessPoolExecutor, Future]:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+            # spawn rather than fork: the API process has threads (and an event loop) running.
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            logger.info("Started password hashing pool with %d workers", workers)
+        pool = _pool
+        try:
+            with _blank_main():
+                return pool, pool.submit(fn, *args)
+        except BrokenProcessPool:
+            pass
+    _discard(pool)
+    raise BrokenProcessPool("A process in the password hashing pool terminated abruptly")
+
+
+def _discard(broken: ProcessPoolExecutor) -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not broken:
+            return  # Already replaced by another caller.
+        _pool = None
+    logger.warning("Password hashing pool is broken (a worker died); starting a new one")
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _run(fn, args, retries: int = 1) -> Future:
+    """
+    Submit to the pool, replacing a broken pool and retrying once, whether it
+    breaks before the job is accepted or while it runs.
+    """
+    try:
+        pool, inner = _start(fn, args)
+    except BrokenProcessPool:
+        if not retries:
+            raise
+        return _run(fn, args, retries - 1)
+
+    outer: Future = Future()
+
+    def retry(done: Future) -> None:
+        if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool) and retries:
+            _discard(pool)
+            try:
+                _run(fn, args, retries - 1).add_done_callback(relay)
+            except BaseException as exc:
+                outer.set_exception(exc)
+        else:
+            relay(done)
+
+    def relay(done: Future) -> None:
+        if outer.done():
+            return  # Cancelled by the caller.
+        if done.cancelled():
+            outer.cancel()
+            return
+        error = done.exception()
+        if error is not None:
+            outer.set_exception(error)
+        else:
+            outer.set_result(done.result())
+
+    inner.add_done_callback(retry)
+    outer.add_done_callback(lambda done: done.cancelled() and inner.cancel())
+    return outer
+
+
+def _submit(fn, *args) -> Future:
+    if not _slots.acquire(blocking=False):
+        _rejected.inc()
+        raise PasswordHasherBusy()
+    started = time.monotonic()
+    _pending.inc()
+
+    def finished(_future: Future) -> None:
+        _slots.release()
+        _pending.dec()
+        _jobs.inc()
+        _seconds.inc(time.monotonic() - started)
+
+    try:
+        future = _run(fn, args)
+    except BaseException:
+        _slots.release()
+        _pending.dec()
+        raise
+    future.add_done_callback(finished)
+    return future
+
+
+def _verified(result: Tuple[bool, Optional[str]]) -> Tuple[bool, Optional[str]]:
+    if result[1] is not None:
+        _rehashed.inc()
+    return result
+
+
+def hash_password(password: str) -> str:
+    return _submit(_hash, password, settings.BCRYPT_ROUNDS).result()
+
+
+def verify_password(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    Return (matches, new_hash). ``new_hash`` is set when the password matched a
+    hash of a different cost and should be stored in place of the old one.
+    """
+    return _verified(_submit(_verify, password, hashed, settings.BCRYPT_ROUNDS).result())
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.wrap_future(_submit(_hash, password, settings.BCRYPT_ROUNDS))
+
+
+async def verify_password_async(password: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    return _verified(await asyncio.wrap_future(_submit(_verify, password, hashed, settings.BCRYPT_ROUNDS)))
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -0,0 +1,82 @@
+# backend/app/utils/pool.py
+#
+# Connection pool configuration and telemetry. Engines are built with the
+# DB_POOL_* settings and a QueuePool subclass that times every checkout, feeding
+# the load shedder and the /metrics pool histogram, and counts overflow
+# connections and checkout timeouts.
+#
+# DB_POOL_PROFILE=pgbouncer is for a PgBouncer in transaction pooling mode in
+# front of Postgres: consecutive transactions of one client connection may run
+# on different server connections, so server-side prepared statements are
+# turned off (psycopg 3 would otherwise prepare repeated queries).
+
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import QueuePool
+
+from ..core.config import settings
+from . import metrics
+from .load_shedding import shedder
+
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def instrumented_pool_class(name: str) -> type:
+    """
+    A QueuePool subclass reporting to metrics labelled ``pool=name``. A class
+    rather than an instance attribute, since engines recreate their pool on dispose.
+    """
+    labels = {"pool": name}
+    wait = metrics.histogram("db_pool_wait_seconds", "Time spent waiting to check out a connection.",
+                             WAIT_BUCKETS, labels=labels)
+    overflow = metrics.counter("db_pool_overflow_total", "Connections opened beyond pool_size.", labels=labels)
+    timeouts = metrics.counter("db_pool_timeouts_total", "Checkouts that gave up after DB_POOL_TIMEOUT.",
+                               labels=labels)
+
+    class InstrumentedQueuePool(QueuePool):
+        def _do_get(self):
+            started = time.perf_counter()
+            overflow_before = self._overflow
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                timeouts.inc()
+                raise
+            finally:
+                waited = time.perf_counter() - started
+                wait.observe(waited)
+                shedder.record_pool_wait(waited)
+            if self._overflow > overflow_before and self._overflow > 0:
+                overflow.inc()
+            return connection
+
+    InstrumentedQueuePool.__name__ = f"InstrumentedQueuePool[{name}]"
+    return InstrumentedQueuePool
+
+
+def engine_options(url: str, name: str) -> Dict[str, Any]:
+    """create_engine keyword arguments for ``url`` from the DB_POOL_* settings."""
+    options: Dict[str, Any] = {
+        "poolclass": instrumented_pool_class(name),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if settings.DB_POOL_PROFILE == "pgbouncer" and make_url(url).get_driver_name() == "psycopg":
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+def register_pool_metrics(engine: Engine, name: str) -> None:
+    labels = {"pool": name}
+    metrics.gauge("db_pool_checked_out", "Connections currently checked out.",
+                  callback=lambda: engine.pool.checkedout(), labels=labels)
+    metrics.gauge("db_pool_size", "Connections kept open in the pool.",
+                  callback=lambda: engine.pool.size(), labels=labels)
+    metrics.gauge("db_pool_overflow", "Connections currently open beyond pool_size.",
+                  callback=lambda: max(engine.pool.overflow(), 0), labels=labels)
@@ -0,0 +1,75 @@
+# backend/app/utils/principal.py
+#
+# Per-process caches behind the authentication dependencies. Decoded access
+# tokens are cached until they expire (or AUTH_CACHE_SECONDS), and user rows
+# as detached snapshots for AUTH_CACHE_SECONDS. crud.user drops a user's entry
+# on update and delete; other processes catch up when their entry expires.
+
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from ..core.config import settings
+from ..models.user import UserRole
+from .cache import TTLCache
+
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as carried by the access token claims."""
+    id: int
+    role: Optional[UserRole] = None
+
+
+token_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_SECONDS)
+user_cache = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_SECONDS)
+
+
+def decode_principal(token: str) -> Optional[Principal]:
+    """
+    Verify an access token and return its principal, or None when it is invalid.
+    Valid tokens are cached, never beyond their own expiry.
+    """
+    principal = token_cache.get(token, _MISSING)
+    if principal is not _MISSING:
+        return principal
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
+        return None
+    user_id = payload.get("sub")
+    if user_id is None or payload.get("typ") == "refresh":
+        # Refresh tokens are only accepted by /auth/refresh.
+        return None
+    try:
+        role = UserRole(payload["role"]) if payload.get("role") else None
+    except ValueError:
+        role = None
+    principal = Principal(id=int(user_id), role=role)
+
+    ttl = settings.AUTH_CACHE_SECONDS
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        token_cache.set(token, principal, ttl=ttl)
+    return principal
+
+
+def cached_user(user_id: int, default=None):
+    """The cached user snapshot; None if the user is known to be deleted, ``default`` if not cached."""
+    return user_cache.get(user_id, default)
+
+
+def invalidate_user(user_id: int, deleted: bool = False) -> None:
+    """
+    Drop a user's cached snapshot. A deleted user is remembered as None so
+    tokens issued to them are rejected without a lookup.
+    """
+    if deleted:
+        user_cache.set(user_id, None)
+    else:
+        user_cache.invalidate(user_id)
@@ -0,0 +1,138 @@
+# backend/app/utils/ratelimit.py
+#
+# Token buckets for rate limiting. A bucket holds up to ``burst`` tokens and
+# refills at ``rate`` tokens per second; each request takes one. Buckets live in
+# a backend:
+#
+#   memory  a dict in this process (limits apply per worker)
+#   shared  a memory-mapped table under /dev/shm shared by every worker on the host
+#
+# or any class named as "package.module:Class" that implements ``take``.
+
+import fcntl
+import hashlib
+import importlib
+import mmap
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List
+
+from ..core.config import settings
+
+
+@dataclass(frozen=True)
+class Rate:
+    """``requests`` per ``seconds``, with bursts of up to ``requests``."""
+    requests: int
+    seconds: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "Rate":
+        """Parse "<requests>/<seconds>", e.g. "10/60"."""
+        requests, _, seconds = spec.partition("/")
+        return cls(int(requests), float(seconds or 1))
+
+    @property
+    def per_second(self) -> float:
+        return self.requests / self.seconds
+
+
+def _take(tokens: float, updated: float, rate: Rate, now: float):
+    """Refill and take one token. Returns (tokens left, seconds until a token is available)."""
+    tokens = min(float(rate.requests), tokens + (now - updated) * rate.per_second)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate.per_second
+
+
+class MemoryBackend:
+    """Buckets in a dict, bounded to ``maxsize`` keys (the oldest are dropped)."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._buckets: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if len(self._buckets) >= self.maxsize:
+                    del self._buckets[next(iter(self._buckets))]
+                bucket = self._buckets[key] = [float(rate.requests), now]
+            bucket[0], wait = _take(bucket[0], bucket[1], rate, now)
+            bucket[1] = now
+            return wait
+
+
+class SharedMemoryBackend:
+    """
+    Buckets in a fixed table of ``slots`` entries in a memory-mapped file, so every
+    worker on the host sees the same counts. Keys are stored as 64-bit hashes with
+    linear probing over a few slots; when all of them are taken the stalest bucket
+    is recycled. A file lock serializes updates across processes.
+    """
+
+    _slot = struct.Struct("<Qdd")  # key hash, tokens, updated at
+    _probes = 8
+
+    def __init__(self, path: str, slots: int = 65536):
+        self.slots = slots
+        size = slots * self._slot.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        self._lock = threading.Lock()
+
+    def take(self, key: str, rate: Rate, now: float) -> float:
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        first = key_hash % self.slots
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                stalest, stalest_at = None, None
+                for probe in range(self._probes):
+                    offset = (first + probe) % self.slots * self._slot.size
+                    slot_hash, tokens, updated = self._slot.unpack_from(self._map, offset)
+                    if slot_hash == key_hash:
+                        break
+                    if slot_hash == 0:
+                        tokens, updated = float(rate.requests), now
+                        break
+                    if stalest_at is None or updated < stalest_at:
+                        stalest, stalest_at = offset, updated
+                else:
+                    offset, tokens, updated = stalest, float(rate.requests), now
+                tokens, wait = _take(tokens, updated, rate, now)
+                self._slot.pack_into(self._map, offset, key_hash, tokens, now)
+                return wait
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+def create_backend(name: str):
+    if name == "memory":
+        return MemoryBackend()
+    if name == "shared":
+        return SharedMemoryBackend(settings.RATE_LIMIT_SHARED_PATH, slots=settings.RATE_LIMIT_SHARED_SLOTS)
+    module, _, attribute = name.partition(":")
+    return getattr(importlib.import_module(module), attribute)()
+
+
+class RateLimiter:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def hit(self, name: str, key, rate: Rate) -> float:
+        """
+        Take a token from the ``name`` bucket of ``key``. Returns 0 when allowed,
+        otherwise the seconds until the next token.
+        """
+        return self.backend.take(f"{name}:{key}", rate, time.time())
+
+
+limiter = RateLimiter(create_backend(settings.RATE_LIMIT_BACKEND))
@@ -0,0 +1,102 @@
+# backend/app/utils/replicas.py
+#
+# Routing of read-only sessions to replicas. get_read_db picks a replica in
+# round robin among those whose replication lag is within REPLICA_MAX_LAG_SECONDS
+# and falls back to the primary when none is. A user who just changed something
+# reads from the primary for READ_YOUR_WRITES_SECONDS so they see their own write
+# (tracked per process; requests of the same user on another worker may still
+# hit a replica).
+#
+# Lag is measured on Postgres standbys from the WAL replay position, at most
+# every REPLICA_LAG_CHECK_SECONDS per replica. Other databases (two SQLite files
+# in development) report no lag. A replica that cannot be reached counts as
+# lagging until its next check.
+
+import itertools
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from ..core.config import settings
+from . import metrics
+from .cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() "
+    "OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine):
+        self.name = name
+        self.engine = engine
+        self.lag = 0.0
+        self.checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        metrics.gauge("db_replica_lag_seconds", "Replication lag at the last check (-1 if unreachable).",
+                      callback=lambda: self.lag if self.lag != float("inf") else -1, labels={"replica": name})
+
+    def current_lag(self) -> float:
+        now = time.monotonic()
+        if self.checked_at is not None and now - self.checked_at < settings.REPLICA_LAG_CHECK_SECONDS:
+            return self.lag
+        # One request re-checks; others use the previous value meanwhile.
+        if not self._lock.acquire(blocking=False):
+            return self.lag
+        try:
+            self.lag = self._measure()
+            self.checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self.lag
+
+    def _measure(self) -> float:
+        if self.engine.dialect.name != "postgresql":
+            return 0.0
+        try:
+            with self.engine.connect() as connection:
+                return float(connection.execute(_LAG_QUERY).scalar() or 0)
+        except Exception:
+            logger.warning("Replica %s is unreachable; reading from the primary", self.name, exc_info=True)
+            return float("inf")
+
+
+class ReadRouter:
+    def __init__(self, primary: Engine, replicas: List[Replica]):
+        self.primary = primary
+        self.replicas = replicas
+        self._next = itertools.count()
+        self._recent_writers = TTLCache(maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.READ_YOUR_WRITES_SECONDS)
+        self._routed = {
+            target: metrics.counter("db_read_sessions_total", "Read-only sessions by where they were routed.",
+                                    labels={"target": target})
+            for target in ("replica", "primary_sticky", "primary_fallback")
+        }
+
+    def note_write(self, user_id: int) -> None:
+        """Send this user's reads to the primary for READ_YOUR_WRITES_SECONDS."""
+        if self.replicas:
+            self._recent_writers.set(user_id, True)
+
+    def engine_for(self, user_id: Optional[int] = None) -> Engine:
+        if not self.replicas:
+            return self.primary
+        if user_id is not None and self._recent_writers.get(user_id):
+            self._routed["primary_sticky"].inc()
+            return self.primary
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.current_lag() <= settings.REPLICA_MAX_LAG_SECONDS:
+                self._routed["replica"].inc()
+                return replica.engine
+        self._routed["primary_fallback"].inc()
+        return self.primary
@@ -0,0 +1,116 @@
+# backend/app/utils/revocation.py
+#
+# Refresh token revocation. The revoked_tokens table is the source of truth;
+# each process mirrors the unexpired token ids in a Bloom filter, so checking a
+# token that was never revoked (nearly all of them) needs no query. A filter hit
+# is confirmed against the table. Revocations from other processes are pulled
+# in by id every REFRESH_REVOCATION_SYNC_SECONDS, and the filter is rebuilt from
+# the table when it fills up. Ids are not committed in order, so each sync also
+# re-reads the revocations of the last REFRESH_REVOCATION_RESCAN_SECONDS.
+#
+# So a revocation made by another process (a logout) is seen here within
+# REFRESH_REVOCATION_SYNC_SECONDS; one made by this process is seen at once.
+# Reuse of a rotated token needs no filter: revoke() reports it atomically.
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session
+
+from .. import models
+from ..core.config import settings
+from .bloom import BloomFilter
+from .db import insert_ignore
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_filter: Optional[BloomFilter] = None
+_last_id = 0
+_synced_at = 0.0
+# Ids already in the filter that the next rescan will return again.
+_recent: Set[int] = set()
+
+
+def _unexpired_since(db: Session, last_id: Optional[int], since: datetime):
+    """
+    Unexpired revocations with an id above ``last_id`` or revoked at or after
+    ``since``; all of them when ``last_id`` is None.
+    """
+    revoked = models.RevokedToken
+    query = select(revoked.id, revoked.token_id, revoked.revoked_at).where(revoked.expires_at > datetime.utcnow())
+    if last_id is not None:
+        query = query.where(or_(revoked.id > last_id, revoked.revoked_at >= since))
+    return db.execute(query.order_by(revoked.id)).all()
+
+
+def _sync(db: Session) -> BloomFilter:
+    global _filter, _last_id, _synced_at, _recent
+    with _lock:
+        if _filter is not None and time.monotonic() - _synced_at < settings.REFRESH_REVOCATION_SYNC_SECONDS:
+            return _filter
+        since = datetime.utcnow() - timedelta(seconds=settings.REFRESH_REVOCATION_RESCAN_SECONDS)
+        rows = _unexpired_since(db, _last_id if _filter is not None else None, since)
+        new = [row for row in rows if row.id not in _recent] if _filter is not None else rows
+        if _filter is None or _filter.count + len(new) > _filter.capacity:
+            if _filter is not None:
+                # Full: start over from the revocations that have not expired yet.
+                rows = new = _unexpired_since(db, None, since)
+            _filter = BloomFilter(
+                capacity=max(settings.REFRESH_REVOCATION_FILTER_CAPACITY, 2 * len(rows)),
+                error_rate=settings.REFRESH_REVOCATION_FILTER_ERROR_RATE,
+            )
+            logger.info("Rebuilt refresh token revocation filter with %d entries", len(rows))
+        _filter.update(row.token_id for row in new)
+        if rows:
+            _last_id = max(_last_id, rows[-1].id)
+        _recent = {row.id for row in rows if row.revoked_at >= since}
+        _synced_at = time.monotonic()
+        return _filter
+
+
+def revoked(db: Session, *token_ids: str) -> Set[str]:
+    """
+    The subset of ``token_ids`` that is revoked. Queries only for ids that hit
+    the filter, so another process's revocation may be missed until the next sync.
+    """
+    bloom = _sync(db)
+    candidates = [token_id for token_id in token_ids if bloom.might_contain(token_id)]
+    if not candidates:
+        return set()
+    revoked_tokens = models.RevokedToken
+    return set(db.execute(
+        select(revoked_tokens.token_id).where(revoked_tokens.token_id.in_(candidates))
+    ).scalars().all())
+
+
+def revoke(db: Session, token_id: str, expires_at: datetime, user_id: Optional[int] = None) -> bool:
+    """
+    Revoke a token id until ``expires_at``. Commits. Returns False when it was
+    already revoked, which makes revoke-then-reissue an atomic rotation: of two
+    requests presenting the same token, only one gets True.
+    """
+    inserted = insert_ignore(db, models.RevokedToken, {
+        "token_id": token_id,
+        "user_id": user_id,
+        "expires_at": expires_at,
+        "revoked_at": datetime.utcnow(),
+    }, index_elements=["token_id"])
+    db.commit()
+    bloom = _sync(db)
+    with _lock:
+        bloom.add(token_id)
+    return bool(inserted)
+
+
+def purge_expired(db: Session) -> int:
+    """
+    Delete revocations whose tokens have all expired. Commits; returns the rows deleted.
+    """
+    result = db.execute(delete(models.RevokedToken).where(models.RevokedToken.expires_at <= datetime.utcnow()))
+    db.commit()
+    return result.rowcount
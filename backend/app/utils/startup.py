@@ -0,0 +1,52 @@
+# backend/app/utils/startup.py
+#
+# Startup profile. main.py marks the end of each phase of importing and starting
+# the app; the report is logged once the app is ready, exported as
+# startup_phase_seconds and printed by `python -m app.cli startup-profile`.
+# Times start when this module is first imported, which main.py does first.
+
+import logging
+import time
+from typing import List, Tuple
+
+from . import metrics
+
+# Next to uvicorn's own "Application startup complete" line.
+logger = logging.getLogger("uvicorn.error")
+
+_started = time.perf_counter()
+_last = _started
+phases: List[Tuple[str, float]] = []
+
+
+def mark(phase: str) -> None:
+    """Record the time since the previous mark as ``phase``."""
+    global _last
+    now = time.perf_counter()
+    phases.append((phase, now - _last))
+    metrics.gauge("startup_phase_seconds", "Time spent in each phase of the last startup.",
+                  labels={"phase": phase}).set(now - _last)
+    _last = now
+
+
+def report() -> str:
+    lines = [f"  {phase:<28} {seconds * 1000:8.1f} ms" for phase, seconds in phases]
+    lines.append(f"  {'total':<28} {(_last - _started) * 1000:8.1f} ms")
+    return "Startup profile:\n" + "\n".join(lines)
+
+
+def log_report() -> None:
+    logger.info(report())
+
+
+def profile_app() -> None:
+    """Import the app and run its startup and shutdown once, then print the report."""
+    import asyncio
+    from ..main import app
+
+    async def cycle():
+        async with app.router.lifespan_context(app):
+            pass
+
+    asyncio.run(cycle())
+    print(report())
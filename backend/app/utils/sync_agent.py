@@ -0,0 +1,141 @@
+# backend/app/utils/sync_agent.py
+#
+# Ships an edge node's sync_outbox to the central server. Run it next to the
+# edge API:
+#   python -m app.cli sync-agent
+# Changes are sent oldest first in batches of SYNC_BATCH_SIZE and deleted once
+# the central server acknowledges them. While the link is down the outbox just
+# grows and the agent retries with exponential backoff; when it returns the
+# backlog drains batch by batch. A batch whose response was lost is sent again
+# and skipped by the central server, which tracks the last id applied per node.
+
+import asyncio
+import json
+import logging
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+from ..core.config import settings
+from ..database import SessionLocal
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SyncRejected(Exception):
+    """The central server refused the batch; retrying unchanged won't help."""
+
+
+def _read_batch(limit: int) -> List[Dict]:
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            text("SELECT id, entity, op, payload FROM sync_outbox ORDER BY id LIMIT :limit"), {"limit": limit}
+        ).all()
+        return [{"id": row.id, "entity": row.entity, "op": row.op, "payload": json.loads(row.payload)}
+                for row in rows]
+    finally:
+        db.close()
+
+
+def _drop_through(change_id: int) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(text("DELETE FROM sync_outbox WHERE id <= :id"), {"id": change_id})
+        db.commit()
+    finally:
+        db.close()
+
+
+def _backlog() -> int:
+    db = SessionLocal()
+    try:
+        return db.execute(text("SELECT COUNT(*) FROM sync_outbox")).scalar()
+    finally:
+        db.close()
+
+
+class SyncAgent:
+    def __init__(self, central_url: Optional[str] = None, token: Optional[str] = None,
+                 node_id: Optional[str] = None, batch_size: Optional[int] = None,
+                 poll_seconds: Optional[float] = None) -> None:
+        self.central_url = (central_url or settings.SYNC_CENTRAL_URL).rstrip("/")
+        self.token = token or settings.SYNC_TOKEN
+        self.node_id = node_id or settings.SYNC_NODE_ID
+        if not (self.central_url and self.token and self.node_id):
+            raise ValueError("SYNC_CENTRAL_URL, SYNC_TOKEN and SYNC_NODE_ID must be set")
+        self.batch_size = batch_size or settings.SYNC_BATCH_SIZE
+        self.poll_seconds = settings.SYNC_POLL_SECONDS if poll_seconds is None else poll_seconds
+        self._stopping = asyncio.Event()
+        self._sent = metrics.counter("sync_changes_sent_total", "Outbox changes acknowledged by the central server.")
+        self._failures = metrics.counter("sync_failures_total", "Batches that could not be delivered.")
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def _post(self, changes: List[Dict]) -> int:
+        request = urllib.request.Request(
+            f"{self.central_url}/sync/ingest",
+            data=json.dumps({"node_id": self.node_id, "changes": changes}).encode(),
+            headers={"Content-Type": "application/json", "X-Sync-Token": self.token},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=settings.SYNC_TIMEOUT_SECONDS) as response:
+                return json.loads(response.read())["acknowledged"]
+        except urllib.error.HTTPError as exc:
+            if 400 <= exc.code < 500 and exc.code not in (408, 429):
+                raise SyncRejected(f"{exc.code}: {exc.read()[:500]!r}") from exc
+            raise
+
+    async def run_once(self) -> int:
+        """
+        Ship one batch. Returns the number of changes acknowledged; raises when
+        the central server can't be reached or refuses the batch.
+        """
+        changes = await asyncio.to_thread(_read_batch, self.batch_size)
+        if not changes:
+            return 0
+        acknowledged = await asyncio.to_thread(self._post, changes)
+        done = sum(1 for change in changes if change["id"] <= acknowledged)
+        if acknowledged < changes[-1]["id"]:
+            # Only happens if the central server stopped part-way; resend the rest.
+            logger.warning("Central server acknowledged %s of %s changes", done, len(changes))
+        await asyncio.to_thread(_drop_through, acknowledged)
+        self._sent.inc(done)
+        return done
+
+    async def run(self, once: bool = False) -> None:
+        """
+        Sync until stopped. With ``once`` return when the outbox is empty or the
+        central server is unreachable.
+        """
+        failures = 0
+        while not self._stopping.is_set():
+            try:
+                shipped = await self.run_once()
+            except (urllib.error.URLError, OSError, SyncRejected, ValueError) as exc:
+                self._failures.inc()
+                if once:
+                    raise
+                failures += 1
+                delay = min(max(self.poll_seconds, 1) * 2 ** (failures - 1), settings.SYNC_RETRY_MAX_SECONDS)
+                if isinstance(exc, SyncRejected):
+                    delay = settings.SYNC_RETRY_MAX_SECONDS
+                backlog = await asyncio.to_thread(_backlog)
+                logger.warning("Sync to %s failed (%s changes pending), retrying in %.0fs: %s",
+                               self.central_url, backlog, delay, exc)
+            else:
+                failures = 0
+                if shipped:
+                    continue
+                if once:
+                    return
+                delay = self.poll_seconds
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
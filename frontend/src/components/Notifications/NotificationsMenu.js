@@ -37,12 +37,51 @@ const NotificationsMenu = () => {
         }
     };
 
+    const fetchNotificationList = async () => {
+        try {
+            const response = await axios.get('/notifications/');
+            setNotifications(response.data);
+        } catch (error) {
+            console.error('Error fetching notifications:', error);
+        }
+    };
+
     useEffect(() => {
-        if (authToken) {
-            fetchNotifications();
-            const interval = setInterval(fetchNotifications, 30000);
-            return () => clearInterval(interval);
+        if (!authToken) {
+            return;
         }
+        fetchNotifications();
+
+        // The unread count is pushed on connect and whenever it changes.
+        let ws;
+        let retryTimer;
+        let closed = false;
+        const connect = () => {
+            ws = new WebSocket(`ws://localhost:8000/ws/notifications?token=${encodeURIComponent(authToken)}`);
+            ws.onmessage = (event) => {
+                try {
+                    const data = JSON.parse(event.data);
+                    if (data.event_type === 'NOTIFICATION_UNREAD_COUNT' || data.event_type === 'NOTIFICATION_QUEUE_UPDATE') {
+                        setUnreadCount(data.payload.unread_count);
+                        fetchNotificationList();
+                    }
+                } catch (err) {
+                    console.error('WebSocket parse error:', err);
+                }
+            };
+            ws.onclose = () => {
+                if (!closed) {
+                    retryTimer = setTimeout(connect, 5000);
+                }
+            };
+        };
+        connect();
+
+        return () => {
+            closed = true;
+            clearTimeout(retryTimer);
+            ws.close();
+        };
     }, [authToken]);
 
     const handleAccept = async (notificationId) => {
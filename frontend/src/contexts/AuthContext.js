@@ -2,7 +2,7 @@
 
 import React, { createContext, useState, useContext, useEffect } from 'react';
 import { jwtDecode } from 'jwt-decode'; // Named import for version 4.x
-import axios from '../utils/axios';
+import axios, { onAccessTokenChange } from '../utils/axios';
 
 export const AuthContext = createContext(null);
 
@@ -35,6 +35,9 @@ export const AuthProvider = ({ children }) => {
         }
     }, [authToken]);
 
+    // Tokens refreshed by the axios interceptor.
+    useEffect(() => onAccessTokenChange(setAuthToken), []);
+
     const loginUser = async (email, password) => {
         try {
             const response = await axios.post('/auth/login', new URLSearchParams({
@@ -46,6 +49,7 @@ export const AuthProvider = ({ children }) => {
                 },
             });
 
+            localStorage.setItem('refreshToken', response.data.refresh_token);
             setAuthToken(response.data.access_token);
             return { success: true };
         } catch (error) {
@@ -77,6 +81,11 @@ export const AuthProvider = ({ children }) => {
     };
 
     const logoutUser = () => {
+        const refreshToken = localStorage.getItem('refreshToken');
+        if (refreshToken) {
+            axios.post('/auth/logout', { refresh_token: refreshToken }).catch(() => {});
+            localStorage.removeItem('refreshToken');
+        }
         setAuthToken(null);
     };
 
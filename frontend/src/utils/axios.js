@@ -20,4 +20,68 @@ instance.interceptors.request.use(
     }
 );
 
+// On a 401, exchange the refresh token for a new access token once and retry.
+// Concurrent failures share one refresh request, since each refresh token can
+// only be used once.
+let refreshing = null;
+
+// AuthContext keeps the access token in state; it subscribes here so a refreshed
+// token (or null, once the refresh token is rejected) reaches the UI as well.
+const tokenListeners = new Set();
+
+export const onAccessTokenChange = (listener) => {
+    tokenListeners.add(listener);
+    return () => tokenListeners.delete(listener);
+};
+
+const notifyAccessToken = (token) => {
+    tokenListeners.forEach((listener) => listener(token));
+};
+
+const refreshAccessToken = () => {
+    if (!refreshing) {
+        const refreshToken = localStorage.getItem('refreshToken');
+        refreshing = axios
+            .post(`${instance.defaults.baseURL}/auth/refresh`, { refresh_token: refreshToken })
+            .then((response) => {
+                localStorage.setItem('authToken', response.data.access_token);
+                localStorage.setItem('refreshToken', response.data.refresh_token);
+                notifyAccessToken(response.data.access_token);
+                return response.data.access_token;
+            })
+            .catch((error) => {
+                localStorage.removeItem('refreshToken');
+                if (error.response?.status === 401) {
+                    notifyAccessToken(null);
+                }
+                throw error;
+            })
+            .finally(() => {
+                refreshing = null;
+            });
+    }
+    return refreshing;
+};
+
+instance.interceptors.response.use(
+    (response) => response,
+    async (error) => {
+        const original = error.config;
+        const isAuthCall = original?.url?.startsWith('/auth/');
+        if (error.response?.status === 401 && original && !original._retried && !isAuthCall
+            && localStorage.getItem('refreshToken')) {
+            original._retried = true;
+            let token;
+            try {
+                token = await refreshAccessToken();
+            } catch (refreshError) {
+                return Promise.reject(error);
+            }
+            original.headers['Authorization'] = `Bearer ${token}`;
+            return instance(original);
+        }
+        return Promise.reject(error);
+    }
+);
+
 export default instance;
@@ -0,0 +1,130 @@
+"""
+Email delivery pipeline check.
+
+Runs a local SMTP server (aiosmtpd) and a scratch SQLite database, queues
+invitation emails through enqueue_organization_invite_email and delivers them
+with the email worker, checking that:
+
+  - delivered jobs are SENT and the server received the rendered message,
+  - 5xx rejections fail the job at once, 4xx rejections are retried later,
+  - the batch goes over at most one SMTP connection per sender,
+  - SENDING jobs whose lease expired are claimed again, unless they already
+    used EMAIL_MAX_ATTEMPTS, in which case they are FAILED.
+
+    python test_scripts/test_email_pipeline.py
+"""
+import asyncio
+import os
+import socket
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+WORK_DIR = tempfile.mkdtemp(prefix='timewait-email-')
+SMTP_PORT = free_port()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'email.db')}"
+os.environ['SMTP_HOST'] = '127.0.0.1'
+os.environ['SMTP_PORT'] = str(SMTP_PORT)
+os.environ['SMTP_USER'] = ''
+os.environ['SMTP_STARTTLS'] = 'false'
+os.environ['EMAIL_ENABLED'] = 'true'
+os.environ['EMAIL_MAX_ATTEMPTS'] = '3'
+# Settings are read from .env in the working directory; keep the developer's out.
+os.chdir(WORK_DIR)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from aiosmtpd.controller import Controller
+
+from app import crud
+from app.core.config import settings
+from app.database import Base, SessionLocal, engine
+from app.models.email_job import EmailJob, EmailJobStatus
+from app.utils.email import enqueue_organization_invite_email
+from app.utils.email_worker import EmailWorker
+
+CONNECTIONS = 2
+
+
+class RecordingHandler:
+    """Accepts mail except for bounce@ (550) and later@ (451) recipients."""
+
+    def __init__(self):
+        self.messages = []
+        self.peers = set()
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith('bounce@'):
+            return '550 No such user'
+        if address.startswith('later@'):
+            return '451 Try again later'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.peers.add(session.peer)
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode('utf-8', 'replace')))
+        return '250 Message accepted'
+
+
+def status_of(db, job_id):
+    db.expire_all()
+    job = db.get(EmailJob, job_id)
+    return job.status, job.attempts
+
+
+def test_email_pipeline():
+    Base.metadata.create_all(bind=engine)
+    handler = RecordingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=SMTP_PORT)
+    controller.start()
+    db = SessionLocal()
+    try:
+        def enqueue(address):
+            return enqueue_organization_invite_email(db, email_to=address, organization_name='Pipeline Org',
+                                                     invite_token=f'token-{address}', role='USER').id
+
+        delivered = [enqueue(f'user{index}@example.com') for index in range(10)]
+        bounced = enqueue('bounce@example.com')
+        deferred = enqueue('later@example.com')
+
+        asyncio.run(EmailWorker(connections=CONNECTIONS, batch_size=50).run(once=True))
+
+        for job_id in delivered:
+            assert status_of(db, job_id) == (EmailJobStatus.SENT, 1), status_of(db, job_id)
+        assert len(handler.messages) == len(delivered), len(handler.messages)
+        assert any('token-user0@example.com' in content for _, content in handler.messages)
+        assert status_of(db, bounced) == (EmailJobStatus.FAILED, 1), status_of(db, bounced)
+        assert status_of(db, deferred) == (EmailJobStatus.PENDING, 1), status_of(db, deferred)
+        assert len(handler.peers) <= CONNECTIONS, handler.peers
+        print(f'OK: {len(delivered)} sent over {len(handler.peers)} connections, 550 failed, 451 deferred')
+
+        # A worker died holding these leases.
+        past = datetime.utcnow() - timedelta(seconds=1)
+        retried = enqueue('retried@example.com')
+        exhausted = enqueue('exhausted@example.com')
+        db.query(EmailJob).filter(EmailJob.id == retried).update(
+            {'status': EmailJobStatus.SENDING, 'attempts': 1, 'next_attempt_at': past})
+        db.query(EmailJob).filter(EmailJob.id == exhausted).update(
+            {'status': EmailJobStatus.SENDING, 'attempts': settings.EMAIL_MAX_ATTEMPTS, 'next_attempt_at': past})
+        db.commit()
+
+        claimed = crud.claim_email_jobs(db, limit=50)
+        assert [job['id'] for job in claimed] == [retried], claimed
+        assert status_of(db, exhausted) == (EmailJobStatus.FAILED, settings.EMAIL_MAX_ATTEMPTS)
+        assert status_of(db, retried) == (EmailJobStatus.SENDING, 2)
+        print('OK: expired lease reclaimed, exhausted lease failed')
+    finally:
+        db.close()
+        controller.stop()
+
+
+if __name__ == '__main__':
+    test_email_pipeline()
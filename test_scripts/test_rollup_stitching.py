@@ -0,0 +1,117 @@
+"""
+Queue history rollup stitching check.
+
+Seeds a scratch SQLite database with queue history spread over a few days,
+written through record_history_rollups, and checks that aggregate_history
+(raw head and tail stitched with day, hour and minute buckets) returns the same
+count, total, min, max and histogram as a scan of the raw rows, for:
+
+  - ranges ending now and ranges with an explicit end in the past,
+  - ranges on and off minute, hour and day boundaries,
+  - ranges reaching past the minute rollup horizon, before and after the old
+    minute buckets are pruned.
+
+    python test_scripts/test_rollup_stitching.py
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+WORK_DIR = tempfile.mkdtemp(prefix='timewait-rollups-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(WORK_DIR, 'rollups.db')}"
+os.environ['HISTORY_MINUTE_ROLLUP_DAYS'] = '1'
+# Settings are read from .env in the working directory; keep the developer's out.
+os.chdir(WORK_DIR)
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from app import crud, models
+from app.crud.queue_history_rollup import empty_histogram, histogram_bin
+from app.database import Base, SessionLocal, engine
+
+HISTORY_ROWS = 3000
+DAYS = 4
+RANGES = 300
+
+
+def seed(db, now):
+    user = models.User(name='Rollups', email='rollups@example.com', hashed_password='x')
+    organization = models.Organization(name='Rollups Org')
+    queue = models.Queue(name='Rollups Queue', organization=organization, user=user)
+    db.add_all([user, organization, queue])
+    db.commit()
+
+    for _ in range(HISTORY_ROWS):
+        removed_at = now - timedelta(seconds=random.uniform(0, DAYS * 24 * 3600))
+        waiting_time = random.expovariate(1 / 20)
+        db.add(models.QueueHistory(queue_id=queue.id, user_id=user.id,
+                                   joined_at=removed_at - timedelta(minutes=waiting_time),
+                                   removed_at=removed_at, waiting_time=waiting_time))
+        crud.record_history_rollups(db, queue.id, removed_at, waiting_time)
+    # A row exactly on a minute boundary, as the end of a range below.
+    boundary = (now - timedelta(hours=5)).replace(second=0, microsecond=0)
+    db.add(models.QueueHistory(queue_id=queue.id, user_id=user.id, joined_at=boundary,
+                               removed_at=boundary, waiting_time=3.0))
+    crud.record_history_rollups(db, queue.id, boundary, 3.0)
+    db.commit()
+    return queue.id, boundary
+
+
+def brute_force(rows, start, end):
+    waits = [wait for removed_at, wait in rows if start <= removed_at <= end]
+    histogram = empty_histogram()
+    for wait in waits:
+        histogram[histogram_bin(wait)] += 1
+    return len(waits), sum(waits), min(waits, default=None), max(waits, default=None), histogram
+
+
+def check(db, queue_id, rows, start, end):
+    got = crud.aggregate_history(db, queue_id, start, end)
+    count, total, low, high, histogram = brute_force(rows, start, end if end is not None else datetime.utcnow())
+    label = f'[{start}, {end}]'
+    assert got['count'] == count, f"{label}: count {got['count']} != {count}"
+    assert abs(got['total'] - total) < 1e-6, f"{label}: total {got['total']} != {total}"
+    assert got['min'] == low and got['max'] == high, f"{label}: min/max differ"
+    assert got['histogram'] == histogram, f"{label}: histogram differs"
+
+
+def test_rollup_stitching():
+    random.seed(7)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        now = datetime.utcnow()
+        queue_id, boundary = seed(db, now)
+        rows = db.query(models.QueueHistory.removed_at, models.QueueHistory.waiting_time).all()
+
+        def ranges():
+            yield now - timedelta(days=DAYS + 1), None
+            yield now - timedelta(hours=30), None
+            yield now - timedelta(minutes=90), None
+            yield now - timedelta(seconds=20), None
+            yield boundary - timedelta(hours=2), boundary
+            yield boundary.replace(minute=0), boundary.replace(minute=0) + timedelta(hours=3)
+            yield (now - timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0), now - timedelta(days=1)
+            for _ in range(RANGES):
+                start = now - timedelta(seconds=random.uniform(0, (DAYS + 1) * 24 * 3600))
+                end = start + timedelta(seconds=random.uniform(0, 2 * 24 * 3600))
+                yield start, min(end, now) if random.random() < 0.8 else None
+
+        checked = list(ranges())
+        for start, end in checked:
+            check(db, queue_id, rows, start, end)
+        print(f'OK: {len(checked)} ranges match the raw rows')
+
+        pruned = crud.prune_minute_rollups(db)
+        assert pruned, 'expected minute buckets older than the horizon'
+        for start, end in checked:
+            check(db, queue_id, rows, start, end)
+        print(f'OK: still matching after pruning {pruned} minute buckets')
+    finally:
+        db.close()
+
+
+if __name__ == '__main__':
+    test_rollup_stitching()